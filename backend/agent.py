@@ -1,9 +1,86 @@
 from pathlib import Path
 import google.generativeai as genai
+import json
+import os
 import re
-import requests
+import threading
+from concurrent.futures import as_completed
+from cache import create_cache
+from log_config import get_logger
+from metrics import metrics
+from list_parser import IncrementalListParser, parse_rows, parse_suggestion_rows
+from places import get_places_client, maps_link
+from prompts import prompt_registry
+from resilience import Upstream
+from singleflight import SingleFlight
 from config import google_api_key, google_places_api_key, model_name
 
+logger = get_logger(__name__)
+
+# Generated text is cached per (media type, subject, prompt template), so popular
+# names are answered without calling Gemini. Editing a prompt file changes its hash
+# and therefore misses the old entries.
+LLM_CACHE_TTLS = {
+    "details": int(os.environ.get('LLM_CACHE_DETAILS_TTL', 7 * 24 * 3600)),
+    "themes": int(os.environ.get('LLM_CACHE_THEMES_TTL', 7 * 24 * 3600)),
+    "suggestions": int(os.environ.get('LLM_CACHE_SUGGESTIONS_TTL', 24 * 3600)),
+}
+llm_cache = create_cache(
+    max_entries=int(os.environ.get('LLM_CACHE_SIZE', 1024)),
+    ttl=LLM_CACHE_TTLS["details"],
+    disk_path=os.environ.get('LLM_CACHE_DB', str(Path(__file__).parent / "cache" / "llm_cache.sqlite3"))
+)
+
+# Suggestions come back as schema-constrained JSON: an array of SUGGESTION_COUNT rows,
+# each an array of strings with at least the columns the cards use. A short or
+# malformed answer is topped up by up to SUGGESTION_REPAIR_ATTEMPTS follow-up calls
+# that ask only for the missing rows.
+SUGGESTION_COUNT = 6
+SUGGESTION_COLUMNS = {"artwork": 5, "food": 4, "architecture": 5}
+SUGGESTION_REPAIR_ATTEMPTS = int(os.environ.get('SUGGESTION_REPAIR_ATTEMPTS', 1))
+
+def suggestion_rows_schema(columns):
+    return {
+        "type": "array",
+        "items": {"type": "array", "items": {"type": "string"}, "min_items": columns},
+        "max_items": SUGGESTION_COUNT
+    }
+
+SUGGESTION_CONFIGS = {
+    media_type: genai.GenerationConfig(response_mime_type="application/json",
+                                       response_schema=suggestion_rows_schema(columns))
+    for media_type, columns in SUGGESTION_COLUMNS.items()
+}
+SINGLE_SHOT_CONFIG = genai.GenerationConfig(response_mime_type="application/json")
+
+# Concurrent misses for the same cache key (endpoint kind, subject, location, prompt)
+# wait on one in-flight generation and share its result or its error
+llm_flights = SingleFlight()
+
+# Gemini calls give up after GEMINI_DEADLINE seconds. One still running past the recent
+# p95 for its kind of call is hedged with an identical request (GEMINI_HEDGE=0 turns
+# that off), and after repeated failures the circuit opens and calls fail fast.
+GEMINI_DEADLINE = float(os.environ.get('GEMINI_DEADLINE', 30))
+GEMINI_HEDGE = int(os.environ.get('GEMINI_HEDGE', 1))
+gemini_upstream = Upstream('gemini', GEMINI_DEADLINE, hedge=bool(GEMINI_HEDGE),
+                           max_workers=int(os.environ.get('GEMINI_CONCURRENCY', 32)))
+
+_model = None
+_model_lock = threading.Lock()
+
+def normalize_subject(name):
+    return " ".join(name.lower().split())
+
+def get_model():
+    """Configure Gemini once per process and share one GenerativeModel across requests"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                genai.configure(api_key=google_api_key)
+                _model = genai.GenerativeModel(model_name)
+    return _model
+
 class Agent:
     # API Keys loaded from config
     google_api_key = google_api_key
@@ -13,159 +90,371 @@ class Agent:
     model_name = model_name
 
     def __init__(self, media_type, name: str = ""):
-        current_file = Path(__file__)
-        current_directory = current_file.parent
-        prompts = current_directory / "Prompts"
-        if media_type == "artwork":
-            self.__artwork = name
-
-            #Gathering files
-            self.__extracting_themes_prompt = (prompts / "Artworks_Extracting_Themes_Prompt.txt").read_text(
-                encoding="utf-8")
-            self.__get_suggestions_prompt = (prompts/ "Artworks_Get_Suggestions_Prompt.txt").read_text(
-                encoding="utf-8")
-            self.__get_details_prompt = (prompts/"Artworks_Get_Details_Prompt.txt").read_text(
-                encoding="utf-8")
-        elif media_type == "food":
-            self.__dish_name = name
-
-            #Gathering files
-            self.__extracting_themes_prompt = (prompts / "Food_Extracting_Themes_Prompt.txt").read_text(
-                encoding="utf-8")
-            self.__get_details_prompt = (prompts / "Food_Get_Details_Prompt.txt").read_text(encoding="utf-8")
-            self.__get_suggestions_prompt = (prompts / "Food_Get_Suggestions_Prompt.txt").read_text(encoding="utf-8")
-        elif media_type == "architecture":
-            self.__artwork = name
-
-            # Gathering files
-            self.__extracting_themes_prompt = (prompts / "Architecture_Extracting_Themes_Prompt.txt").read_text(
-                encoding="utf-8")
-            self.__get_details_prompt = (prompts / "Architecture_Get_Details_Prompt.txt").read_text(encoding="utf-8")
-            self.__get_suggestions_prompt = (prompts / "Architecture_Get_Suggestions_Prompt.txt").read_text(encoding="utf-8")
-
-        # Configure the API key
-        genai.configure(api_key=Agent.google_api_key)
-        self.__model = genai.GenerativeModel(Agent.model_name)
+        self.__media_type = media_type
+        self.__name = name
+        self.__location = ""
+
+        # Templates are loaded and parsed once by the registry, not per request
+        self.__themes_template = prompt_registry.get(media_type, "themes")
+        self.__details_template = prompt_registry.get(media_type, "details")
+        self.__suggestions_template = prompt_registry.get(media_type, "suggestions")
+        self.__extracting_themes_prompt = None
+        self.__get_details_prompt = None
+
+        # Template digests key the LLM cache, so entries follow prompt file edits
+        self.__themes_hash = self.__themes_template.digest
+        self.__details_hash = self.__details_template.digest
+        self.__suggestions_hash = self.__themes_template.digest + self.__suggestions_template.digest
+        self.__single_shot_template = prompt_registry.get("shared", "single_shot")
+        self.__single_shot_hash = self.__suggestions_hash + self.__single_shot_template.digest
+        self.__repair_template = prompt_registry.get("shared", "repair")
+        self.__suggestions_config = SUGGESTION_CONFIGS[media_type]
+
+        self.__model = get_model()
 
     def add_artwork_to_prompt(self):
-        lines = self.__extracting_themes_prompt.splitlines()
-        lines[1] += f" {self.__artwork}"
-        self.__extracting_themes_prompt = "\n".join(lines)
-        lines = self.__get_details_prompt.splitlines()
-        lines[0] += f" {self.__artwork}"
-        self.__get_details_prompt = "\n".join(lines)
-        lines = self.__get_suggestions_prompt.splitlines()
-        lines[0] = lines[0].replace("{artwork}", self.__artwork)
-        self.__get_suggestions_prompt = "\n".join(lines)
+        self.__extracting_themes_prompt = self.__themes_template.render(name=self.__name)
+        self.__get_details_prompt = self.__details_template.render(name=self.__name)
 
     def add_food_to_prompt(self, location):
-        lines = self.__extracting_themes_prompt.splitlines()
-        lines[1] += f" {self.__dish_name}"
-        self.__extracting_themes_prompt = "\n".join(lines)
-        lines = self.__get_details_prompt.splitlines()
-        lines[0] += f" {self.__dish_name}"
-        self.__get_details_prompt = "\n".join(lines)
-        lines = self.__get_suggestions_prompt.splitlines()
-        lines[1] = lines[1].replace("{food}", self.__dish_name)
-        lines[0] += f" {location}"
-        self.__get_suggestions_prompt = "\n".join(lines)
+        self.__location = location
+        self.__extracting_themes_prompt = self.__themes_template.render(name=self.__name)
+        self.__get_details_prompt = self.__details_template.render(name=self.__name)
 
     def add_architecture_to_prompt(self):
-        lines = self.__extracting_themes_prompt.splitlines()
-        lines[1] += f" {self.__artwork}"
-        self.__extracting_themes_prompt = "\n".join(lines)
-        lines = self.__get_details_prompt.splitlines()
-        lines[0] += f" {self.__artwork}"
-        self.__get_details_prompt = "\n".join(lines)
-        lines = self.__get_suggestions_prompt.splitlines()
-        lines[0] += f" {self.__artwork}"
-        self.__get_suggestions_prompt = "\n".join(lines)
+        self.__extracting_themes_prompt = self.__themes_template.render(name=self.__name)
+        self.__get_details_prompt = self.__details_template.render(name=self.__name)
+
+    def __suggestions_prompt(self, themes):
+        return self.__suggestions_template.render(name=self.__name, location=self.__location, themes=themes)
+
+    def _cache_key(self, kind, template_hash, extra=""):
+        return f"{self.__media_type}:{kind}:{normalize_subject(self.__name)}:{normalize_subject(extra)}:{template_hash}"
+
+    def _cached(self, kind, template_hash, generate, extra=""):
+        key = self._cache_key(kind, template_hash, extra)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        # Identical requests arriving together share one generation instead of each calling Gemini
+        return llm_flights.do(key, lambda: self._generate_and_cache(key, kind, generate))
+
+    @staticmethod
+    def _generate_and_cache(key, kind, generate):
+        # A call that finished just before this one started has already filled the cache
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        value = generate()
+        llm_cache.set(key, value, LLM_CACHE_TTLS[kind])
+        return value
+
+    def _generate(self, call, prompt, **kwargs):
+        """One Gemini call, timed per kind of call, with a deadline and hedging"""
+        with metrics.time('gemini', call=call, media_type=self.__media_type):
+            return gemini_upstream.call(
+                lambda timeout: self.__model.generate_content(prompt, request_options={"timeout": timeout}, **kwargs),
+                kind=call)
+
+    def _generate_stream(self, call, prompt, **kwargs):
+        """Streamed Gemini call; only the waits for Gemini are timed, not the work between chunks"""
+        open_stream = lambda timeout: self.__model.generate_content(
+            prompt, stream=True, request_options={"timeout": timeout}, **kwargs)
+        return metrics.time_iter('gemini', lambda: gemini_upstream.stream(open_stream),
+                                 call=call, media_type=self.__media_type)
 
     def get_themes(self):
-        response = self.__model.generate_content(self.__extracting_themes_prompt)
+        return self._cached("themes", self.__themes_hash, self._generate_themes)
+
+    def _generate_themes(self):
+        response = self._generate("themes", self.__extracting_themes_prompt)
         return response.text
 
     def get_details(self):
-        response = self.__model.generate_content(self.__get_details_prompt)
+        return self._cached("details", self.__details_hash, self._generate_details)
+
+    def _generate_details(self):
+        response = self._generate("details", self.__get_details_prompt)
         return response.text
 
+    def stream_details(self):
+        """Yield the details text in chunks as Gemini generates it (one chunk on a cache hit)
+
+        A call for details already being generated, streamed or not, waits for
+        that generation and then yields its text in one chunk.
+        """
+        key = self._cache_key("details", self.__details_hash)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        yield from llm_flights.stream(key, lambda: self._stream_and_cache_details(key), lambda text: [text])
+
+    def _stream_and_cache_details(self, key):
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield cached
+            return cached
+
+        parts = []
+        for chunk in self._generate_stream("details_stream", self.__get_details_prompt):
+            # Chunks without candidates (e.g. trailing metadata) carry no text
+            if not chunk.parts:
+                continue
+            parts.append(chunk.text)
+            yield chunk.text
+        text = "".join(parts)
+        if not text:
+            # e.g. a safety block; raise rather than cache an empty description
+            raise ValueError("Gemini returned no text")
+        llm_cache.set(key, text, LLM_CACHE_TTLS["details"])
+        return text
+
     def artwork_suggestions(self, themes):
-        lines = self.__get_suggestions_prompt.splitlines()
-        lines[-1] += themes
-        self.__get_suggestions_prompt = "\n".join(lines)
-        response = self.__model.generate_content(self.__get_suggestions_prompt)
-        gemini_list = eval(re.sub(r'```python\n?|```\n?', '', response.text.strip()))
-        suggestion_list = []
-        for innerList in gemini_list:
-            if type(innerList) is list:
-                suggestion_list.append(
-                    {"Name": innerList[0], "Artist": innerList[1], "Year": innerList[2],
-                     "Current Location": innerList[3], "Wikipedia": innerList[4]
-                     })
-        return suggestion_list
+        return self._cached("suggestions", self.__suggestions_hash, lambda: self._generate_artwork_suggestions(themes))
+
+    def _generate_artwork_suggestions(self, themes):
+        return self._generate_suggestion_cards(self.__suggestions_prompt(themes))
+
+    @staticmethod
+    def _artwork_card(innerList):
+        if type(innerList) is not list or len(innerList) < 5:
+            return None
+        return {"Name": innerList[0], "Artist": innerList[1], "Year": innerList[2],
+                "Current Location": innerList[3], "Wikipedia": innerList[4]}
 
     def food_suggestions(self, location, themes):
-        lines = self.__get_suggestions_prompt.splitlines()
-        lines[-1] += themes
-        self.__get_suggestions_prompt = "\n".join(lines)
-        response = self.__model.generate_content(self.__get_suggestions_prompt)
-        gemini_list = eval(re.sub(r'```python\n?|```\n?', '', response.text.strip()))
-        suggestion_list = []
-        for innerList in gemini_list:
-            if type(innerList) is list:
-                append_this = {"Restaurant Name": innerList[0], "Cuisine": innerList[1], "Average Costs": innerList[2],
-                     "Yelp Stars": innerList[3]}
-
-                # Get Google Maps info
-                url = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
-                params = {
-                    "input": f"{append_this["Restaurant Name"]} in {location}",
-                    "inputtype": "textquery",
-                    "fields": "place_id,name,formatted_address,rating",
-                    "key": Agent.google_places_api_key
-                }
-                response = requests.get(url, params=params).json()
-                
-                if response.get("candidates") and len(response["candidates"]) > 0:
-                    place_info = response["candidates"][0]
-                    place_id = place_info["place_id"]
-                    usable_link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-                    append_this["Address"] = usable_link
-                    # Get actual Google rating if Yelp stars are Unknown
-                    if innerList[3] == "Unknown" and "rating" in place_info:
-                        append_this["Yelp Stars"] = f"{place_info['rating']} (Google)"
-                    else:
-                        append_this["Yelp Stars"] = innerList[3]
-                suggestion_list.append(append_this)
+        return self._cached("suggestions", self.__suggestions_hash,
+                            lambda: self._generate_food_suggestions(location, themes), extra=location)
+
+    def _generate_food_suggestions(self, location, themes):
+        suggestion_list = self._generate_suggestion_cards(self.__suggestions_prompt(themes))
+        return self._add_food_places(suggestion_list, location)
+
+    def _add_food_places(self, suggestion_list, location):
+        # Get Google Maps info for every restaurant at once
+        places = get_places_client(Agent.google_places_api_key).find_places(
+            [(suggestion["Restaurant Name"], location) for suggestion in suggestion_list])
+        for suggestion, place_info in zip(suggestion_list, places):
+            self._apply_food_place(suggestion, place_info)
         return suggestion_list
 
+    @staticmethod
+    def _food_card(innerList):
+        if type(innerList) is not list or len(innerList) < 4:
+            return None
+        return {"Restaurant Name": innerList[0], "Cuisine": innerList[1],
+                "Average Costs": innerList[2], "Yelp Stars": innerList[3]}
+
+    @staticmethod
+    def _apply_food_place(suggestion, place_info):
+        """Add Google Maps info to a restaurant card; returns the fields that changed"""
+        fields = {}
+        if place_info:
+            fields["Address"] = maps_link(place_info["place_id"])
+            # Get actual Google rating if Yelp stars are Unknown
+            if suggestion["Yelp Stars"] == "Unknown" and "rating" in place_info:
+                fields["Yelp Stars"] = f"{place_info['rating']} (Google)"
+        suggestion.update(fields)
+        return fields
+
     def architecture_suggestions(self, themes):
-        lines = self.__get_suggestions_prompt.splitlines()
-        lines[-1] += themes
-        self.__get_suggestions_prompt = "\n".join(lines)
-        response = self.__model.generate_content(self.__get_suggestions_prompt)
-        gemini_list = eval(re.sub(r'```python\n?|```\n?', '', response.text.strip()))
-        suggestion_list = []
-        for innerList in gemini_list:
-            if type(innerList) is list:
-                append_this = {"Name": innerList[0], "Location": innerList[1], "Type Of Architecture": innerList[2],
-                 "Era": innerList[3],"Wikipedia": innerList[4]
-                }
-                # Get Google Maps info
-                url = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
-                params = {
-                    "input": f"{append_this["Name"]} in {append_this["Location"]}",
-                    "inputtype": "textquery",
-                    "fields": "place_id,name,formatted_address,rating",
-                    "key": Agent.google_places_api_key
-                }
-                response = requests.get(url, params=params).json()
-
-                if response.get("candidates") and len(response["candidates"]) > 0:
-                    place_info = response["candidates"][0]
-                    place_id = place_info["place_id"]
-                    usable_link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-                    append_this["Address"] = usable_link
-                suggestion_list.append(append_this)
+        return self._cached("suggestions", self.__suggestions_hash,
+                            lambda: self._generate_architecture_suggestions(themes))
+
+    def _generate_architecture_suggestions(self, themes):
+        suggestion_list = self._generate_suggestion_cards(self.__suggestions_prompt(themes))
+        return self._add_architecture_places(suggestion_list)
+
+    def _add_architecture_places(self, suggestion_list):
+        # Get Google Maps info for every building at once
+        places = get_places_client(Agent.google_places_api_key).find_places(
+            [(suggestion["Name"], suggestion["Location"]) for suggestion in suggestion_list])
+        for suggestion, place_info in zip(suggestion_list, places):
+            self._apply_architecture_place(suggestion, place_info)
         return suggestion_list
 
+    @staticmethod
+    def _architecture_card(innerList):
+        if type(innerList) is not list or len(innerList) < 5:
+            return None
+        return {"Name": innerList[0], "Location": innerList[1],
+                "Type Of Architecture": innerList[2], "Era": innerList[3],
+                "Wikipedia": innerList[4]}
+
+    @staticmethod
+    def _apply_architecture_place(suggestion, place_info):
+        fields = {"Address": maps_link(place_info["place_id"])} if place_info else {}
+        suggestion.update(fields)
+        return fields
+
+    def _build_card(self, row):
+        if self.__media_type == "food":
+            return self._food_card(row)
+        if self.__media_type == "architecture":
+            return self._architecture_card(row)
+        return self._artwork_card(row)
+
+    def _cards_from_rows(self, rows):
+        return [card for card in map(self._build_card, rows) if card is not None]
+
+    def _generate_suggestion_cards(self, prompt):
+        """Suggestion cards from one schema-constrained generation, topped up by a repair if short"""
+        response = self._generate("suggestions", prompt, generation_config=self.__suggestions_config)
+        with metrics.time('suggestion_parse'):
+            cards = self._cards_from_rows(parse_suggestion_rows(response.text))
+        cards += self._repair_suggestion_cards(prompt, cards)
+        if not cards:
+            # Raise rather than return (and cache) an empty list
+            raise ValueError("Gemini returned no usable suggestions")
+        return cards
+
+    def _repair_suggestion_cards(self, prompt, cards):
+        """Ask again for only the suggestions that were missing or malformed, a bounded number of times
+
+        The usable cards are listed in the repair prompt so they are not repeated,
+        and only the missing count is requested, instead of regenerating everything.
+        """
+        repaired = []
+        for _ in range(SUGGESTION_REPAIR_ATTEMPTS):
+            missing = SUGGESTION_COUNT - len(cards) - len(repaired)
+            if missing <= 0:
+                break
+            logger.info("🔧 Repairing %d missing suggestion(s) for %s", missing, self.__name)
+            repair_prompt = self.__repair_template.render(
+                suggestions_prompt=prompt,
+                existing=json.dumps([list(card.values()) for card in cards + repaired], ensure_ascii=False),
+                count=missing
+            )
+            try:
+                response = self._generate("repair", repair_prompt, generation_config=self.__suggestions_config)
+            except Exception as e:
+                logger.warning("⚠️ Suggestion repair failed: %s", e)
+                break
+            seen = {str(next(iter(card.values()))).lower() for card in cards + repaired}
+            with metrics.time('suggestion_parse'):
+                rows = parse_suggestion_rows(response.text)
+            for card in self._cards_from_rows(rows):
+                name = str(next(iter(card.values()))).lower()
+                if name not in seen and len(repaired) < SUGGESTION_COUNT - len(cards):
+                    seen.add(name)
+                    repaired.append(card)
+        return repaired
+
+    def stream_suggestions(self, themes):
+        """Yield suggestion cards as Gemini writes them, then their Places enrichment
+
+        Yields ("suggestion", index, card) as soon as each row is parsed from the
+        streamed output, and ("patch", index, fields) when that card's Places
+        lookup comes back with something to add. The finished list is cached like
+        the *_suggestions() methods; a cache hit yields every card at once, and
+        so does a call arriving while the same suggestions are being generated,
+        once they are done.
+        """
+        key = self._cache_key("suggestions", self.__suggestions_hash, self.__location)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield from self._replay_suggestions(cached)
+            return
+        yield from llm_flights.stream(key, lambda: self._stream_and_cache_suggestions(key, themes),
+                                      self._replay_suggestions)
+
+    @staticmethod
+    def _replay_suggestions(cards):
+        for index, card in enumerate(cards):
+            yield "suggestion", index, card
+
+    def _stream_and_cache_suggestions(self, key, themes):
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield from self._replay_suggestions(cached)
+            return cached
+
+        if self.__media_type == "food":
+            apply_place = self._apply_food_place
+            place_query = lambda card: (card["Restaurant Name"], self.__location)
+        elif self.__media_type == "architecture":
+            apply_place = self._apply_architecture_place
+            place_query = lambda card: (card["Name"], card["Location"])
+        else:
+            apply_place, place_query = None, None
+
+        places_client = get_places_client(Agent.google_places_api_key) if place_query else None
+        parser = IncrementalListParser()
+        cards = []
+        generated = []  # copies of the cards as parsed, before Places patches them in place
+        lookups = {}  # future -> card index, for lookups not yet reported
+
+        def add_card(card):
+            cards.append(card)
+            generated.append(dict(card))
+            if places_client:
+                lookups[places_client.submit(*place_query(card))] = len(cards) - 1
+            return "suggestion", len(cards) - 1, card
+
+        def finished_patches(block):
+            done = list(as_completed(lookups)) if block else [future for future in lookups if future.done()]
+            for future in done:
+                index = lookups.pop(future)
+                fields = apply_place(cards[index], future.result())
+                if fields:
+                    yield "patch", index, fields
+
+        prompt = self.__suggestions_prompt(themes)
+        for chunk in self._generate_stream("suggestions_stream", prompt, generation_config=self.__suggestions_config):
+            if not chunk.parts:
+                continue
+            with metrics.time('suggestion_parse'):
+                rows = parser.feed(chunk.text)
+            for card in self._cards_from_rows(rows):
+                yield add_card(card)
+            yield from finished_patches(block=False)
+        # The repair prompt lists the existing rows, which must not include Maps links or ratings
+        for card in self._repair_suggestion_cards(prompt, list(generated)):
+            yield add_card(card)
+        yield from finished_patches(block=True)
+
+        if not cards:
+            # Raise rather than return (and cache) an empty list, as _generate_suggestion_cards does
+            raise ValueError("Gemini returned no usable suggestions")
+        llm_cache.set(key, cards, LLM_CACHE_TTLS["suggestions"])
+        return cards
+
+    def themes_and_suggestions(self):
+        """Themes and suggestions from one structured generation instead of two sequential calls
+
+        Returns (themes, suggestions) in the same shapes as get_themes() and the
+        *_suggestions() methods.
+        """
+        result = self._cached("suggestions", self.__single_shot_hash, self._generate_themes_and_suggestions,
+                              extra=self.__location)
+        return result["themes"], result["suggestions"]
+
+    def _generate_themes_and_suggestions(self):
+        suggestions_prompt = self.__suggestions_prompt("")
+        prompt = self.__single_shot_template.render(
+            themes_prompt=self.__extracting_themes_prompt,
+            suggestions_prompt=suggestions_prompt
+        )
+        response = self._generate("single_shot", prompt, generation_config=SINGLE_SHOT_CONFIG)
+        try:
+            with metrics.time('suggestion_parse'):
+                result = json.loads(re.sub(r'```(?:json|python)?\n?', '', response.text.strip()))
+            themes = result.get("themes", "")
+            rows = [row for row in result.get("suggestions") or [] if isinstance(row, list)]
+        except (ValueError, AttributeError):
+            # Keep whichever suggestion rows did come through; the repair fills in the rest
+            logger.warning("⚠️ Single-shot response for %s was not valid JSON, salvaging rows", self.__name)
+            themes, rows = "", parse_rows(response.text)
+        if not isinstance(themes, str):
+            themes = json.dumps(themes, indent=2, ensure_ascii=False)
+
+        suggestions = self._cards_from_rows(rows)
+        suggestions += self._repair_suggestion_cards(suggestions_prompt, suggestions)
+        if not suggestions:
+            raise ValueError("Gemini returned no usable suggestions")
+        if self.__media_type == "food":
+            suggestions = self._add_food_places(suggestions, self.__location)
+        elif self.__media_type == "architecture":
+            suggestions = self._add_architecture_places(suggestions)
+        return {"themes": themes, "suggestions": suggestions}
@@ -1,19 +1,65 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 import os
+import json
 import uuid
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from google.cloud import vision
-import io
-from agent import Agent
+from functools import partial
+import mimetypes
+import queue
+import threading
+from agent import Agent, gemini_upstream, llm_cache, llm_flights
+from places import places_cache, places_upstream
+from vision_client import create_vision_manager
+from cache import SQLiteCache, create_cache
+from jobs import JobManager
+from assets import AssetPipeline
+from upload_store import create_upload_store
+from image_preprocessing import prepare_for_vision
+from log_config import get_logger, log_stats
+from metrics import metrics
+from art_classification import (
+    ARTIST_NAMES_IN_TITLES, art_label_matcher, artist_hint_matcher, artist_name_in_title_matcher,
+    classify_web_entities
+)
+
+logger = get_logger(__name__)
 
 # Set Google Cloud credentials explicitly
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = os.path.join(os.path.dirname(__file__), 'service-account-key.json')
-print(f"Google Cloud credentials set to: {os.environ['GOOGLE_APPLICATION_CREDENTIALS']}")
-print(f"Credentials file exists: {os.path.exists(os.environ['GOOGLE_APPLICATION_CREDENTIALS'])}")
+logger.info("Google Cloud credentials set to: %s", os.environ['GOOGLE_APPLICATION_CREDENTIALS'])
+logger.info("Credentials file exists: %s", os.path.exists(os.environ['GOOGLE_APPLICATION_CREDENTIALS']))
+
+# One Vision client per worker process, shared by every request
+vision_clients = create_vision_manager(os.environ['GOOGLE_APPLICATION_CREDENTIALS'])
 
 app = Flask(__name__)
 
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON encoding, with serialization timed as its own stage"""
+
+    def dumps(self, obj, **kwargs):
+        with metrics.time('json_serialize'):
+            return super().dumps(obj, **kwargs)
+
+app.json = TimedJSONProvider(app)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    # For streamed responses this is the time until the stream starts
+    if request.endpoint and 'request_start' in g:
+        metrics.observe('request', time.perf_counter() - g.request_start,
+                        error=response.status_code >= 500, endpoint=request.endpoint)
+    return response
+
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx', 'zip', 'rar'}
@@ -24,55 +70,309 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-def cleanup_old_images(max_images=20):
-    """Keep only the most recent images, delete the oldest ones"""
+# Images from one upload are analyzed concurrently on a bounded pool
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 8))
+ANALYSIS_TIMEOUT = float(os.environ.get('ANALYSIS_TIMEOUT', 60))  # seconds for a whole upload
+analysis_pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='vision-analysis')
+
+# Frontend files are served from memory, precompressed, with ETags and fingerprinted URLs
+frontend_assets = AssetPipeline()
+UPLOAD_CACHE_MAX_AGE = 7 * 24 * 3600  # uploads are evicted long before browsers would need to recheck
+
+# Uploaded images are analyzed from memory; their display copies are written to
+# UPLOAD_FOLDER in the background, and the oldest are evicted past these quotas
+upload_store = create_upload_store(
+    UPLOAD_FOLDER,
+    max_images=int(os.environ.get('UPLOAD_MAX_IMAGES', 20)),
+    max_bytes=int(os.environ.get('UPLOAD_MAX_BYTES', 200 * 1024 * 1024)),
+    writers=int(os.environ.get('IMAGE_WRITERS', 2))
+)
+
+# Uploads sent with ?async=1 return a job ID at once and are analyzed on this pool.
+# Job state is mirrored to SQLite so any worker process can answer /jobs/<id>.
+JOB_TTL = int(os.environ.get('JOB_TTL', 600))
+upload_jobs = JobManager(
+    max_workers=int(os.environ.get('JOB_WORKERS', 4)),
+    ttl=JOB_TTL,
+    store=SQLiteCache(
+        os.environ.get('JOB_DB', os.path.join(os.path.dirname(__file__), 'cache', 'jobs.sqlite3')),
+        max_entries=10000, ttl=JOB_TTL
+    )
+)
+JOB_EVENTS_KEEPALIVE = 15  # seconds between SSE comments while a job is quiet
+
+# "two_step" asks Gemini for themes, then suggestions; "single_shot" gets both in one call
+SUGGESTIONS_MODE = os.environ.get('SUGGESTIONS_MODE', 'two_step')
+
+# /analyze/<media_type> recognizes one image and then generates its description and
+# its suggestions side by side in a single request: the description on the request
+# thread, the suggestions on this pool, so one pool thread per request thread
+PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', os.environ.get('WEB_THREADS', 16)))
+pipeline_pool = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix='analyze-pipeline')
+
+# Vision results keyed by the SHA-256 of the uploaded bytes, so re-uploads of the
+# same image skip the Vision call. Set ANALYSIS_CACHE_DB to keep them across restarts.
+analysis_cache = create_cache(
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_SIZE', 512)),
+    ttl=int(os.environ.get('ANALYSIS_CACHE_TTL', 24 * 3600)),
+    disk_path=os.environ.get('ANALYSIS_CACHE_DB'),
+    disk_ttl=int(os.environ.get('ANALYSIS_CACHE_DISK_TTL', 30 * 24 * 3600))
+)
+
+def save_upload_async(file_path, content):
+    """Write an uploaded image to disk off the request path"""
+    upload_store.save_async(os.path.basename(file_path), content)
+
+def run_image_analyses(images, analyze, error_result, on_result=None):
+    """Run analyze(content) for every (name, content) image on the analysis pool, returning results in input order
+
+    A failing or slow image only affects its own entry: exceptions and timeouts
+    are turned into error_result(message) for that image. on_result(count), if
+    given, is called after each image with the number finished so far.
+    """
+    futures = [analysis_pool.submit(analyze, content) for _, content in images]
+    deadline = time.monotonic() + ANALYSIS_TIMEOUT
+    results = []
+    for (image_name, _), future in zip(images, futures):
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FuturesTimeoutError:
+            future.cancel()
+            logger.error("❌ Analysis timed out for %s", image_name)
+            results.append(error_result('Analysis timed out'))
+        except Exception as e:
+            logger.exception("❌ Error analyzing image %s: %s", image_name, e)
+            results.append(error_result(str(e)))
+        if on_result:
+            on_result(len(results))
+    return results
+
+def complete_upload(uploaded_files, failed_uploads, image_jobs, analyze, error_result, result_key, job=None):
+    """Analyze an upload's saved images and build the response body
+
+    Runs inside the request for a normal upload, or on the job pool for ?async=1,
+    in which case the job's progress is updated as each image finishes.
+    """
+    on_result = None
+    if job is not None:
+        job.update(progress={'completed': 0, 'total': len(image_jobs)})
+        on_result = lambda completed: job.update(progress={'completed': completed, 'total': len(image_jobs)})
+
+    # Analyze all images of this upload concurrently, results map back in order
+    analysis_results = run_image_analyses(
+        [(file_info['saved_name'], content) for file_info, content in image_jobs], analyze, error_result, on_result
+    )
+    for (file_info, _), analysis_result in zip(image_jobs, analysis_results):
+        file_info[result_key] = analysis_result
+    
+    response_data = {
+        'message': 'Upload completed',
+        'uploadedCount': len(uploaded_files),
+        'uploadedFiles': uploaded_files
+    }
+    
+    if failed_uploads:
+        response_data['failedFiles'] = failed_uploads
+        response_data['message'] += f' ({len(failed_uploads)} files failed)'
+    
+    return response_data
+
+def wants_async_upload():
+    """Uploads run in the background when sent with ?async=1 (or an async form field)"""
+    return (request.args.get('async') or request.form.get('async', '')).lower() in ('1', 'true', 'yes')
+
+def respond_to_upload(kind, finish, uploaded_files, failed_uploads):
+    """Run finish() now, or queue it as a job and answer 202 with where to follow it"""
+    if not wants_async_upload():
+        return jsonify(finish())
+
+    # Snapshot the file list before the job starts filling in analysis results
+    response_data = {
+        'message': 'Upload accepted',
+        'uploadedCount': len(uploaded_files),
+        'uploadedFiles': [dict(file_info) for file_info in uploaded_files]
+    }
+    if failed_uploads:
+        response_data['failedFiles'] = failed_uploads
+        response_data['message'] += f' ({len(failed_uploads)} files failed)'
+
+    job = upload_jobs.submit(kind, lambda job: finish(job=job))
+    response_data.update({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/jobs/{job.id}',
+        'events_url': f'/jobs/{job.id}/events'
+    })
+    logger.info("📥 Queued %s job %s for %s files", kind, job.id, len(uploaded_files))
+    return jsonify(response_data), 202
+
+def use_single_shot_suggestions():
+    """Suggestion routes take ?mode=single_shot|two_step, defaulting to SUGGESTIONS_MODE"""
+    return request.args.get('mode', SUGGESTIONS_MODE) == 'single_shot'
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    with metrics.time('json_serialize'):
+        payload = json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+def details_events(agent):
+    """(event, data) pairs for an Agent's details text, chunk by chunk as it is generated"""
+    for text in agent.stream_details():
+        yield 'chunk', {'text': text}
+
+def suggestion_events(agent, single_shot=False):
+    """(event, data) pairs for each suggestion card as it is parsed, then for its Places patch"""
+    if single_shot:
+        # One generation returns every card at once, already enriched
+        _, suggestions = agent.themes_and_suggestions()
+        for index, card in enumerate(suggestions):
+            yield 'suggestion', {'index': index, 'suggestion': card}
+        return
+    themes = agent.get_themes()
+    for event, index, data in agent.stream_suggestions(themes):
+        if event == 'suggestion':
+            yield 'suggestion', {'index': index, 'suggestion': data}
+        else:
+            yield 'patch', {'index': index, 'fields': data}
+
+def stream_agent_details(make_agent, subject):
+    """SSE response forwarding the details text of the Agent from make_agent() chunk by chunk
+
+    The Agent is built inside the stream, so a failure there reaches the client
+    as an error event rather than an HTML error page.
+    """
+    def generate():
+        try:
+            for event, data in details_events(make_agent()):
+                yield sse_event(event, data)
+            yield sse_event('done', {'success': True})
+        except Exception as e:
+            logger.exception("Error streaming details for %s: %s", subject, e)
+            yield sse_event('error', {'success': False, 'error': str(e)})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def stream_agent_suggestions(make_agent, subject):
+    """SSE response sending each suggestion card of the Agent from make_agent() as it is parsed, then its Places patch"""
+    def generate():
+        try:
+            count = 0
+            for event, data in suggestion_events(make_agent()):
+                count += event == 'suggestion'
+                yield sse_event(event, data)
+            yield sse_event('done', {'success': True, 'count': count})
+        except Exception as e:
+            logger.exception("Error streaming suggestions for %s: %s", subject, e)
+            yield sse_event('error', {'success': False, 'error': str(e)})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def wants_stream():
+    """/analyze streams its parts as Server-Sent Events when sent with ?stream=1"""
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+def forward_events(part, part_events, events, cancelled, subject):
+    """Drain one part of a streamed pipeline into the queue read by the response, until it ends or the client leaves"""
+    count = 0
     try:
-        # Get all image files in upload directory
-        image_files = []
-        for filename in os.listdir(UPLOAD_FOLDER):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-                # Get file modification time
-                mtime = os.path.getmtime(file_path)
-                image_files.append((filename, mtime))
-        
-        # Sort by modification time (newest first)
-        image_files.sort(key=lambda x: x[1], reverse=True)
-        
-        # Delete oldest files if we have more than max_images
-        if len(image_files) > max_images:
-            files_to_delete = image_files[max_images:]
-            for filename, _ in files_to_delete:
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-                try:
-                    os.remove(file_path)
-                    print(f"🗑️ Cleaned up old image: {filename}")
-                except Exception as e:
-                    print(f"⚠️ Could not delete old image {filename}: {e}")
-                    
-        print(f"📊 Image cleanup complete. Keeping {min(len(image_files), max_images)} images.")
-        
+        for event, data in part_events:
+            if cancelled.is_set():
+                return
+            count += event == 'suggestion'
+            events.put((event, data))
+        done = {'success': True, 'count': count} if part == 'suggestions' else {'success': True}
+        events.put((f'{part}_done', done))
     except Exception as e:
-        print(f"⚠️ Error during image cleanup: {e}")
+        logger.exception("Error streaming %s for %s: %s", part, subject, e)
+        events.put(('error', {'part': part, 'success': False, 'error': str(e)}))
+    finally:
+        # Stops the generation too if the client went away mid-stream
+        part_events.close()
+        events.put(None)
+
+def stream_pipeline(analysis_data, agent, subject, single_shot):
+    """SSE response with the image analysis, then the details and suggestion events interleaved as they arrive"""
+    def generate():
+        yield sse_event('analysis', analysis_data)
+        if agent is None:
+            yield sse_event('done', {'success': True})
+            return
+
+        # Suggestions are generated on the pool while this thread streams the details,
+        # passing on whatever suggestion events arrived between two details chunks
+        events = queue.Queue()
+        cancelled = threading.Event()
+        details = details_events(agent)
+        pipeline_pool.submit(forward_events, 'suggestions', suggestion_events(agent, single_shot),
+                             events, cancelled, subject)
+        failed = False
+        suggestions_open = True
+
+        def relay(block):
+            nonlocal failed, suggestions_open
+            while suggestions_open:
+                try:
+                    item = events.get(timeout=JOB_EVENTS_KEEPALIVE) if block else events.get_nowait()
+                except queue.Empty:
+                    if not block:
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    suggestions_open = False
+                    return
+                failed = failed or item[0] == 'error'
+                yield sse_event(*item)
+
+        try:
+            try:
+                for event, data in details:
+                    yield sse_event(event, data)
+                    yield from relay(block=False)
+                yield sse_event('details_done', {'success': True})
+            except Exception as e:
+                logger.exception("Error streaming details for %s: %s", subject, e)
+                failed = True
+                yield sse_event('error', {'part': 'details', 'success': False, 'error': str(e)})
+            yield from relay(block=True)
+            yield sse_event('done', {'success': not failed})
+        finally:
+            # Also reached when the client disconnects: stop generating for it
+            cancelled.set()
+            details.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def analysis_cache_key(content, analysis_type):
+    return f"{analysis_type}:{hashlib.sha256(content).hexdigest()}"
+
+# Set when the server starts shutting down, so /ready tells the load balancer to stop routing here
+shutting_down = threading.Event()
+
+def begin_shutdown():
+    shutting_down.set()
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def analyze_image_with_vision(image_path, analysis_type="artwork"):
+def analyze_image_with_vision(content, analysis_type="artwork"):
     """Analyze image using Google Vision API to detect artwork or architecture
     
     Args:
-        image_path: Path to the image file
+        content: The uploaded image bytes
         analysis_type: Type of analysis - "artwork" or "architecture"
     """
     try:
-        print(f"Starting analysis for: {image_path}")
+        logger.debug("Starting analysis for: %s bytes", len(content))
         
-        # Check if credentials file exists and is valid
-        creds_path = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
-        if not os.path.exists(creds_path) or 'placeholder' in open(creds_path).read():
-            print("⚠️ Google Cloud credentials not configured - returning mock analysis")
+        # Credentials are validated once at startup
+        if not vision_clients.credentials_configured:
+            logger.warning("⚠️ Google Cloud credentials not configured - returning mock analysis")
             return {
                 'artwork_name': 'Mock Artwork Analysis',
                 'artist_name': 'Unknown Artist',
@@ -82,29 +382,26 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
                 'mock_analysis': True
             }
         
-        # Initialize the Vision API client
-        client = vision.ImageAnnotatorClient()
-        print("Vision client created successfully")
-        
-        # Read the image file
-        with io.open(image_path, 'rb') as image_file:
-            content = image_file.read()
-        
-        print(f"Image file read successfully, size: {len(content)} bytes")
-        
-        image = vision.Image(content=content)
-        
-        # Perform label detection
-        print("Performing label detection...")
-        response = client.label_detection(image=image)
+        # Same bytes, same answer: skip Vision entirely on a cache hit
+        cache_key = analysis_cache_key(content, analysis_type)
+        cached_result = analysis_cache.get(cache_key)
+        if cached_result is not None:
+            logger.debug("♻️ Analysis cache hit for %s", cache_key)
+            return cached_result
+        
+        # Oriented, downscaled JPEG for Vision; the cache stays keyed by the uploaded bytes
+        with metrics.time('image_preprocess'):
+            vision_content = prepare_for_vision(content)
+        logger.debug("Prepared image for Vision: %s -> %s bytes", len(content), len(vision_content))
+        
+        # Label and web detection (for famous artwork) in a single request
+        logger.debug("Performing label and web detection...")
+        response = vision_clients.annotate(vision_content, analysis_type)
         labels = response.label_annotations
-        print(f"Found {len(labels)} labels")
-        
-        # Perform web detection for famous artwork
-        print("Performing web detection...")
-        web_response = client.web_detection(image=image)
-        web_entities = web_response.web_detection.web_entities if web_response.web_detection else []
-        print(f"Found {len(web_entities)} web entities")
+        logger.debug("Found %s labels", len(labels))
+        web_entities = response.web_detection.web_entities if response.web_detection else []
+        logger.debug("Found %s web entities", len(web_entities))
+        classification_start = time.perf_counter()
         
         # Look for art-related labels
         art_labels = []
@@ -115,91 +412,23 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
         # Check labels for art-related terms
         for label in labels:
             label_text = label.description.lower()
-            print(f"Checking label: {label.description} (confidence: {label.score})")
-            if any(term in label_text for term in ['art', 'painting', 'drawing', 'sculpture', 'artwork', 'portrait', 'landscape', 'still life', 'masterpiece']):
+            logger.debug("Checking label: %s (confidence: %s)", label.description, label.score)
+            if art_label_matcher.matches(label_text):
                 art_labels.append({
                     'description': label.description,
                     'confidence': label.score
                 })
-                print(f"Found art-related label: {label.description}")
+                logger.debug("Found art-related label: %s", label.description)
         
         # PRIORITIZE WEB ENTITIES - they're much more accurate for specific artwork
-        print("Checking web entities for artwork...")
-        
-        # Define famous artworks and artists for better classification
-        famous_artworks = [
-            'starry night', 'mona lisa', 'the scream', 'guernica', 'the persistence of memory',
-            'water lilies', 'the last supper', 'the birth of venus', 'american gothic', 'the great wave',
-            'david', 'the creation of adam', 'the sistine chapel', 'the school of athens',
-            'girl with a pearl earring', 'the night watch', 'the kiss', 'the thinker',
-            'les demoiselles d\'avignon', 'the blue rider', 'composition vii', 'no. 5',
-            'campbell\'s soup cans', 'marilyn diptych', 'the persistence of memory',
-            'the great wave off kanagawa', 'the birth of venus', 'girl before a mirror',
-            'the old guitarist', 'les demoiselles d\'avignon', 'guernica', 'the weeping woman',
-            'three musicians', 'the blue period', 'rose period', 'cubism'
-        ]
-        
-        famous_artists = [
-            'michelangelo', 'leonardo da vinci', 'vincent van gogh', 'pablo picasso',
-            'claude monet', 'edvard munch', 'salvador dali', 'rembrandt', 'andy warhol',
-            'jackson pollock', 'wassily kandinsky', 'henri matisse', 'auguste rodin',
-            'gustav klimt', 'paul gauguin', 'paul cezanne', 'edgar degas', 'mary cassatt',
-            'frida kahlo', 'georgia o\'keeffe', 'mark rothko', 'willem de kooning',
-            'leonardo', 'picasso', 'van gogh', 'monet', 'dali', 'warhol', 'pollock',
-            'kandinsky', 'matisse', 'rodin', 'klimt', 'gauguin', 'cezanne', 'degas'
-        ]
+        logger.debug("Checking web entities for artwork...")
         
         # Separate entities into artwork and artist candidates
-        artwork_candidates = []
-        artist_candidates = []
-        
         for entity in web_entities:
-            print(f"Web entity: {entity.description} (score: {entity.score})")
-            entity_desc = entity.description.lower()
-            
-            if entity.score > 0.2:  # Low threshold to catch everything
-                # Check if it's a famous artwork
-                is_famous_artwork = any(artwork in entity_desc for artwork in famous_artworks)
-                # Check if it's a famous artist
-                is_famous_artist = any(artist in entity_desc for artist in famous_artists)
-                
-                if is_famous_artwork and not is_famous_artist:
-                    artwork_candidates.append({
-                        'name': entity.description,
-                        'score': entity.score,
-                        'type': 'famous_artwork'
-                    })
-                    print(f"Found famous artwork: {entity.description}")
-                elif is_famous_artist and not is_famous_artwork:
-                    artist_candidates.append({
-                        'name': entity.description,
-                        'score': entity.score,
-                        'type': 'famous_artist'
-                    })
-                    print(f"Found famous artist: {entity.description}")
-                else:
-                    # Check for generic terms that we want to avoid
-                    generic_terms = ['painting', 'sculpture', 'artwork', 'masterpiece', 'statue', 'bust', 'portrait', 'landscape', 'still life', 'art', 'image', 'picture', 'photo', 'photograph', 'drawing', 'sketch', 'canvas', 'oil painting', 'watercolor', 'acrylic', 'mixed media', 'collage', 'print', 'etching', 'lithograph', 'fresco', 'mural', 'relief', 'installation', 'performance art', 'digital art', 'conceptual art', 'abstract art', 'figurative art', 'contemporary art', 'modern art', 'classical art', 'fine art', 'visual art', 'graphic art', 'decorative art', 'applied art', 'folk art', 'naive art', 'primitive art', 'cave painting', 'rock art', 'street art', 'graffiti', 'mosaic', 'tapestry', 'ceramic', 'pottery', 'glass art', 'metalwork', 'wood carving', 'stone carving', 'bronze', 'marble', 'plaster', 'clay', 'textile', 'fiber art', 'jewelry', 'furniture', 'architecture', 'design', 'illustration', 'poster', 'book cover', 'album cover', 'logo', 'symbol', 'icon', 'emblem', 'badge', 'medal', 'coin', 'stamp', 'postcard', 'calendar', 'magazine', 'newspaper', 'advertisement', 'billboard', 'sign', 'banner', 'flag', 'banner', 'pennant', 'streamer', 'decoration', 'ornament', 'accessory', 'gift', 'souvenir', 'keepsake', 'memento', 'relic', 'artifact', 'antique', 'vintage', 'collectible', 'curio', 'trinket', 'bauble', 'knickknack', 'bric-a-brac', 'gewgaw', 'gimcrack', 'novelty', 'toy', 'game', 'puzzle', 'model', 'miniature', 'replica', 'copy', 'reproduction', 'facsimile', 'duplicate', 'clone', 'imitation', 'fake', 'forgery', 'counterfeit', 'knockoff', 'bootleg', 'pirate', 'unauthorized', 'illegal', 'stolen', 'looted', 'smuggled', 'contraband', 'black market', 'underground', 'secret', 'hidden', 'concealed', 'camouflaged', 'disguised', 'masked', 'veiled', 'covered', 'wrapped', 'packaged', 'boxed', 'crated', 'shipped', 'delivered', 'transported', 'moved', 'relocated', 'transferred', 'sold', 'bought', 'purchased', 'acquired', 'obtained', 'gained', 'earned', 'won', 'lost', 'stolen', 'taken', 'removed', 'destroyed', 'damaged', 'broken', 'fixed', 'repaired', 'restored', 'conserved', 'preserved', 'maintained', 'cleaned', 'polished', 'refinished', 'refurbished', 'renovated', 'updated', 'modernized', 'improved', 'enhanced', 'upgraded', 'modified', 'altered', 'changed', 'transformed', 'converted', 'adapted', 'adjusted', 'customized', 'personalized', 'tailored', 'fitted', 'sized', 'scaled', 'proportioned', 'balanced', 'harmonized', 'coordinated', 'matched', 'paired', 'grouped', 'categorized', 'classified', 'sorted', 'organized', 'arranged', 'displayed', 'exhibited', 'shown', 'presented', 'demonstrated', 'explained', 'described', 'documented', 'recorded', 'catalogued', 'indexed', 'referenced', 'cited', 'quoted', 'mentioned', 'noted', 'observed', 'noticed', 'spotted', 'seen', 'viewed', 'looked', 'watched', 'studied', 'examined', 'analyzed', 'evaluated', 'assessed', 'judged', 'critiqued', 'reviewed', 'rated', 'ranked', 'scored', 'graded', 'marked', 'labeled', 'tagged', 'named', 'titled', 'captioned', 'subtitled', 'legend', 'inscription', 'text', 'writing', 'script', 'font', 'typeface', 'typography', 'calligraphy', 'handwriting', 'signature', 'autograph', 'monogram', 'initial', 'letter', 'word', 'phrase', 'sentence', 'paragraph', 'passage', 'excerpt', 'quote', 'citation', 'reference', 'footnote', 'endnote', 'bibliography', 'source', 'origin', 'provenance', 'history', 'background', 'context', 'setting', 'environment', 'atmosphere', 'mood', 'feeling', 'emotion', 'sentiment', 'attitude', 'opinion', 'viewpoint', 'perspective', 'angle', 'approach', 'method', 'technique', 'style', 'manner', 'way', 'fashion', 'trend', 'movement', 'school', 'tradition', 'convention', 'standard', 'norm', 'rule', 'principle', 'guideline', 'criterion', 'measure', 'yardstick', 'benchmark', 'reference point', 'baseline', 'starting point', 'foundation', 'basis', 'ground', 'reason', 'cause', 'purpose', 'goal', 'objective', 'aim', 'target', 'destination', 'end', 'result', 'outcome', 'consequence', 'effect', 'impact', 'influence', 'significance', 'importance', 'value', 'worth', 'merit', 'quality', 'excellence', 'superiority', 'greatness', 'brilliance', 'genius', 'talent', 'skill', 'ability', 'capability', 'competence', 'proficiency', 'expertise', 'mastery', 'virtuosity', 'artistry', 'craftsmanship', 'workmanship', 'technique', 'method', 'approach', 'style', 'manner', 'way', 'fashion', 'mode', 'form', 'format', 'structure', 'organization', 'arrangement', 'composition', 'design', 'layout', 'pattern', 'motif', 'theme', 'subject', 'topic', 'content', 'material', 'medium', 'substance', 'matter', 'stuff', 'thing', 'object', 'item', 'piece', 'work', 'creation', 'production', 'output', 'result', 'product', 'artifact', 'specimen', 'sample', 'example', 'instance', 'case', 'occurrence', 'event', 'happening', 'incident', 'episode', 'scene', 'moment', 'instant', 'second', 'minute', 'hour', 'day', 'week', 'month', 'year', 'decade', 'century', 'millennium', 'era', 'period', 'age', 'time', 'date', 'chronology', 'timeline', 'history', 'past', 'present', 'future', 'now', 'then', 'when', 'where', 'why', 'how', 'what', 'who', 'which', 'whose', 'whom', 'that', 'this', 'these', 'those', 'here', 'there', 'everywhere', 'nowhere', 'somewhere', 'anywhere', 'always', 'never', 'sometimes', 'often', 'rarely', 'usually', 'normally', 'typically', 'generally', 'commonly', 'frequently', 'occasionally', 'seldom', 'hardly', 'barely', 'scarcely', 'almost', 'nearly', 'quite', 'very', 'extremely', 'highly', 'greatly', 'significantly', 'substantially', 'considerably', 'remarkably', 'notably', 'particularly', 'especially', 'specifically', 'particularly', 'especially', 'specifically', 'particularly', 'especially', 'specifically']
-                    artist_terms = ['artist', 'painter', 'sculptor', 'creator', 'maker', 'designer', 'illustrator', 'draftsman', 'cartoonist', 'animator', 'photographer', 'filmmaker', 'director', 'producer', 'writer', 'author', 'poet', 'novelist', 'playwright', 'screenwriter', 'composer', 'musician', 'singer', 'performer', 'actor', 'actress', 'dancer', 'choreographer', 'architect', 'engineer', 'scientist', 'inventor', 'discoverer', 'explorer', 'adventurer', 'traveler', 'tourist', 'visitor', 'guest', 'host', 'owner', 'collector', 'curator', 'critic', 'reviewer', 'journalist', 'reporter', 'editor', 'publisher', 'agent', 'manager', 'dealer', 'gallery', 'museum', 'exhibition', 'show', 'display', 'collection', 'archive', 'library', 'database', 'catalog', 'inventory', 'stock', 'supply', 'store', 'shop', 'market', 'fair', 'auction', 'sale', 'purchase', 'buy', 'sell', 'trade', 'exchange', 'barter', 'negotiate', 'deal', 'contract', 'agreement', 'arrangement', 'plan', 'scheme', 'project', 'program', 'initiative', 'campaign', 'movement', 'organization', 'institution', 'foundation', 'trust', 'fund', 'endowment', 'grant', 'scholarship', 'award', 'prize', 'honor', 'recognition', 'accolade', 'commendation', 'praise', 'compliment', 'tribute', 'memorial', 'monument', 'statue', 'sculpture', 'bust', 'relief', 'plaque', 'inscription', 'epitaph', 'tombstone', 'gravestone', 'headstone', 'marker', 'sign', 'symbol', 'emblem', 'badge', 'medal', 'ribbon', 'certificate', 'diploma', 'degree', 'title', 'rank', 'position', 'status', 'standing', 'reputation', 'fame', 'celebrity', 'star', 'icon', 'legend', 'myth', 'hero', 'heroine', 'champion', 'winner', 'victor', 'conqueror', 'leader', 'ruler', 'king', 'queen', 'emperor', 'empress', 'president', 'prime minister', 'governor', 'mayor', 'chief', 'boss', 'manager', 'supervisor', 'director', 'executive', 'administrator', 'official', 'representative', 'ambassador', 'delegate', 'spokesperson', 'spokesman', 'spokeswoman', 'advocate', 'supporter', 'fan', 'follower', 'admirer', 'devotee', 'enthusiast', 'lover', 'friend', 'companion', 'partner', 'associate', 'colleague', 'teammate', 'ally', 'supporter', 'helper', 'assistant', 'aide', 'secretary', 'clerk', 'employee', 'worker', 'staff', 'personnel', 'crew', 'team', 'group', 'organization', 'company', 'corporation', 'business', 'enterprise', 'firm', 'agency', 'bureau', 'office', 'department', 'division', 'section', 'unit', 'branch', 'subsidiary', 'affiliate', 'partner', 'associate', 'member', 'participant', 'contributor', 'donor', 'sponsor', 'patron', 'benefactor', 'supporter', 'backer', 'investor', 'shareholder', 'stakeholder', 'owner', 'proprietor', 'landlord', 'tenant', 'resident', 'inhabitant', 'citizen', 'national', 'native', 'local', 'foreigner', 'immigrant', 'emigrant', 'refugee', 'exile', 'outcast', 'pariah', 'reject', 'failure', 'loser', 'victim', 'casualty', 'survivor', 'witness', 'observer', 'spectator', 'audience', 'crowd', 'mob', 'group', 'gang', 'band', 'crew', 'team', 'squad', 'unit', 'force', 'army', 'navy', 'air force', 'marines', 'coast guard', 'police', 'sheriff', 'marshal', 'detective', 'inspector', 'agent', 'officer', 'soldier', 'sailor', 'pilot', 'captain', 'commander', 'general', 'admiral', 'colonel', 'major', 'captain', 'lieutenant', 'sergeant', 'corporal', 'private', 'cadet', 'recruit', 'veteran', 'retiree', 'pensioner', 'senior', 'elder', 'adult', 'teenager', 'youth', 'child', 'baby', 'infant', 'toddler', 'preschooler', 'kindergartener', 'student', 'pupil', 'scholar', 'academic', 'professor', 'teacher', 'instructor', 'tutor', 'mentor', 'coach', 'trainer', 'guide', 'leader', 'director', 'manager', 'supervisor', 'boss', 'chief', 'head', 'president', 'chairman', 'chairwoman', 'chairperson', 'speaker', 'moderator', 'facilitator', 'mediator', 'arbitrator', 'judge', 'justice', 'magistrate', 'commissioner', 'administrator', 'executive', 'official', 'representative', 'delegate', 'ambassador', 'envoy', 'messenger', 'courier', 'delivery', 'mail', 'post', 'package', 'parcel', 'envelope', 'letter', 'note', 'message', 'communication', 'correspondence', 'email', 'text', 'call', 'phone', 'telephone', 'mobile', 'cell', 'smartphone', 'tablet', 'computer', 'laptop', 'desktop', 'server', 'network', 'internet', 'web', 'website', 'page', 'site', 'link', 'url', 'address', 'location', 'place', 'spot', 'point', 'position', 'coordinate', 'latitude', 'longitude', 'altitude', 'elevation', 'depth', 'height', 'width', 'length', 'size', 'dimension', 'measurement', 'scale', 'proportion', 'ratio', 'percentage', 'fraction', 'decimal', 'number', 'digit', 'figure', 'statistic', 'data', 'information', 'fact', 'detail', 'particular', 'specific', 'general', 'universal', 'global', 'worldwide', 'international', 'national', 'regional', 'local', 'municipal', 'city', 'town', 'village', 'hamlet', 'settlement', 'community', 'neighborhood', 'district', 'ward', 'precinct', 'zone', 'area', 'region', 'territory', 'country', 'nation', 'state', 'province', 'county', 'parish', 'borough', 'canton', 'department', 'prefecture', 'governorate', 'emirate', 'sultanate', 'kingdom', 'empire', 'republic', 'democracy', 'monarchy', 'dictatorship', 'autocracy', 'oligarchy', 'aristocracy', 'plutocracy', 'theocracy', 'anarchy', 'chaos', 'order', 'law', 'rule', 'regulation', 'policy', 'procedure', 'protocol', 'standard', 'norm', 'convention', 'tradition', 'custom', 'habit', 'practice', 'routine', 'ritual', 'ceremony', 'celebration', 'festival', 'holiday', 'vacation', 'break', 'rest', 'relaxation', 'leisure', 'entertainment', 'amusement', 'fun', 'enjoyment', 'pleasure', 'happiness', 'joy', 'delight', 'satisfaction', 'contentment', 'fulfillment', 'achievement', 'success', 'accomplishment', 'victory', 'triumph', 'conquest', 'domination', 'control', 'power', 'authority', 'influence', 'impact', 'effect', 'result', 'outcome', 'consequence', 'implication', 'significance', 'importance', 'value', 'worth', 'merit', 'quality', 'excellence', 'superiority', 'greatness', 'brilliance', 'genius', 'talent', 'skill', 'ability', 'capability', 'competence', 'proficiency', 'expertise', 'mastery', 'virtuosity', 'artistry', 'craftsmanship', 'workmanship', 'technique', 'method', 'approach', 'style', 'manner', 'way', 'fashion', 'mode', 'form', 'format', 'structure', 'organization', 'arrangement', 'composition', 'design', 'layout', 'pattern', 'motif', 'theme', 'subject', 'topic', 'content', 'material', 'medium', 'substance', 'matter', 'stuff', 'thing', 'object', 'item', 'piece', 'work', 'creation', 'production', 'output', 'result', 'product', 'artifact', 'specimen', 'sample', 'example', 'instance', 'case', 'occurrence', 'event', 'happening', 'incident', 'episode', 'scene', 'moment', 'instant', 'second', 'minute', 'hour', 'day', 'week', 'month', 'year', 'decade', 'century', 'millennium', 'era', 'period', 'age', 'time', 'date', 'chronology', 'timeline', 'history', 'past', 'present', 'future', 'now', 'then', 'when', 'where', 'why', 'how', 'what', 'who', 'which', 'whose', 'whom', 'that', 'this', 'these', 'those', 'here', 'there', 'everywhere', 'nowhere', 'somewhere', 'anywhere', 'always', 'never', 'sometimes', 'often', 'rarely', 'usually', 'normally', 'typically', 'generally', 'commonly', 'frequently', 'occasionally', 'seldom', 'hardly', 'barely', 'scarcely', 'almost', 'nearly', 'quite', 'very', 'extremely', 'highly', 'greatly', 'significantly', 'substantially', 'considerably', 'remarkably', 'notably', 'particularly', 'especially', 'specifically']
-                    
-                    is_generic = any(term in entity_desc for term in generic_terms)
-                    is_artist = any(term in entity_desc for term in artist_terms)
-                    
-                    # Only add to candidates if it's NOT generic and NOT clearly an artist
-                    if not is_generic and not is_artist and entity.score > 0.4:
-                        artwork_candidates.append({
-                            'name': entity.description,
-                            'score': entity.score,
-                            'type': 'unknown'
-                        })
-                        print(f"Found potential artwork: {entity.description}")
-                    elif is_artist and not is_generic and entity.score > 0.6:
-                        artist_candidates.append({
-                            'name': entity.description,
-                            'score': entity.score,
-                            'type': 'generic_artist'
-                        })
-                        print(f"Found generic artist: {entity.description}")
+            logger.debug("Web entity: %s (score: %s)", entity.description, entity.score)
+        artwork_candidates, artist_candidates = classify_web_entities(web_entities)
+        for candidate in artwork_candidates + artist_candidates:
+            logger.debug("Found %s candidate: %s", candidate['type'], candidate['name'])
         
         # Select the best artwork (highest confidence among artwork candidates)
         if artwork_candidates:
@@ -208,28 +437,28 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
             best_artwork = artwork_candidates[0]
             artwork_name = best_artwork['name']
             confidence = best_artwork['score']
-            print(f"Selected artwork: {artwork_name} (type: {best_artwork['type']}, score: {confidence})")
+            logger.debug("Selected artwork: %s (type: %s, score: %s)", artwork_name, best_artwork['type'], confidence)
         
         # Select the best artist
         if artist_candidates:
             artist_candidates.sort(key=lambda x: x['score'], reverse=True)
             artist_name = artist_candidates[0]['name']
-            print(f"Selected artist: {artist_name}")
+            logger.debug("Selected artist: %s", artist_name)
         
         # If no specific artwork title found, tell user we couldn't identify it
         if not artwork_name:
             if analysis_type == "architecture":
                 artwork_name = "Unable to identify building"
-                print("No specific building found - showing 'Unable to identify building'")
+                logger.debug("No specific building found - showing 'Unable to identify building'")
             else:
                 artwork_name = "Unable to identify artwork"
-                print("No specific artwork title found - showing 'Unable to identify artwork'")
+                logger.debug("No specific artwork title found - showing 'Unable to identify artwork'")
             confidence = 0
         
         # Extract artist name from artwork name (common patterns)
         if artwork_name and not artist_name:
             artwork_lower = artwork_name.lower()
-            print(f"Trying to extract artist from: {artwork_name}")
+            logger.debug("Trying to extract artist from: %s", artwork_name)
             
             # Pattern 1: "Artwork Name by Artist Name"
             if ' by ' in artwork_lower:
@@ -237,7 +466,7 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
                 if len(parts) == 2:
                     artwork_name = parts[0].strip()
                     artist_name = parts[1].strip()
-                    print(f"Extracted artist from 'by': {artist_name}")
+                    logger.debug("Extracted artist from 'by': %s", artist_name)
             
             # Pattern 2: "Artist Name - Artwork Name"
             elif ' - ' in artwork_lower:
@@ -245,14 +474,14 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
                 if len(parts) == 2:
                     artist_name = parts[0].strip()
                     artwork_name = parts[1].strip()
-                    print(f"Extracted artist from '-': {artist_name}")
+                    logger.debug("Extracted artist from '-': %s", artist_name)
             
             # Pattern 3: Look for common artist names in the artwork name
-            elif any(name in artwork_lower for name in ['van gogh', 'picasso', 'monet', 'da vinci', 'michelangelo', 'rembrandt', 'warhol', 'dali', 'kandinsky', 'pollock']):
-                for name in ['van gogh', 'picasso', 'monet', 'da vinci', 'michelangelo', 'rembrandt', 'warhol', 'dali', 'kandinsky', 'pollock']:
+            elif artist_name_in_title_matcher.matches(artwork_lower):
+                for name in ARTIST_NAMES_IN_TITLES:
                     if name in artwork_lower:
                         artist_name = name.title()
-                        print(f"Found artist name in artwork: {artist_name}")
+                        logger.debug("Found artist name in artwork: %s", artist_name)
                         break
         
         # If still no artist found, look in web entities again with lower threshold
@@ -260,9 +489,9 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
             for entity in web_entities:
                 entity_desc = entity.description.lower()
                 if entity.score > 0.4:  # Lower threshold
-                    if any(term in entity_desc for term in ['artist', 'painter', 'sculptor', 'creator']):
+                    if artist_hint_matcher.matches(entity_desc):
                         artist_name = entity.description
-                        print(f"Found artist in web entities: {artist_name}")
+                        logger.debug("Found artist in web entities: %s", artist_name)
                         break
         
         # Clean up the names
@@ -270,6 +499,7 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
             artwork_name = artwork_name.strip()
         if artist_name:
             artist_name = artist_name.strip()
+        metrics.observe('classification', time.perf_counter() - classification_start, media_type=analysis_type)
         
         # Store the detected artwork name in a separate variable (not displayed)
         detected_artwork_name = artwork_name or 'Unknown Artwork'
@@ -278,9 +508,9 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
         try:
             artwork_agent = Agent("artwork", detected_artwork_name)
             artwork_agent.add_artwork_to_prompt()
-            print(f"Agent initialized with artwork: {detected_artwork_name}")
+            logger.debug("Agent initialized with artwork: %s", detected_artwork_name)
         except Exception as e:
-            print(f"Failed to initialize Agent: {str(e)}")
+            logger.exception("Failed to initialize Agent: %s", e)
             artwork_agent = None
         
         result = {
@@ -293,16 +523,14 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
         }
         
         # Log the detected artwork name for debugging/logging purposes
-        print(f"Detected artwork name (stored in variable): {detected_artwork_name}")
+        logger.debug("Detected artwork name (stored in variable): %s", detected_artwork_name)
         
-        print(f"Analysis complete: {result}")
+        logger.debug("Analysis complete: %s", result)
+        analysis_cache.set(cache_key, result)
         return result
         
     except Exception as e:
-        print(f"Error in analyze_image_with_vision: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in analyze_image_with_vision: %s", e)
         return {
             'artwork_name': 'Analysis Failed',
             'artist_name': 'Unknown Artist',
@@ -312,14 +540,13 @@ def analyze_image_with_vision(image_path, analysis_type="artwork"):
             'web_entities': []
         }
 
-def analyze_food_with_vision(image_path):
-    """Analyze food image using Google Vision API"""
+def analyze_food_with_vision(content):
+    """Analyze food image bytes using Google Vision API"""
     try:
-        print(f"Starting food analysis for: {image_path}")
+        logger.debug("Starting food analysis for: %s bytes", len(content))
         
-        # Check credentials
-        creds_path = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
-        if not os.path.exists(creds_path) or 'placeholder' in open(creds_path).read():
+        # Check credentials (validated once at startup)
+        if not vision_clients.credentials_configured:
             return {
                 'food_name': 'Mock Food Analysis',
                 'food_type': 'Unknown Food',
@@ -329,22 +556,19 @@ def analyze_food_with_vision(image_path):
                 'mock_analysis': True
             }
         
-        # Initialize Vision API
-        client = vision.ImageAnnotatorClient()
-        
-        # Read image
-        with io.open(image_path, 'rb') as image_file:
-            content = image_file.read()
+        cache_key = analysis_cache_key(content, "food")
+        cached_result = analysis_cache.get(cache_key)
+        if cached_result is not None:
+            logger.debug("♻️ Food analysis cache hit for %s", cache_key)
+            return cached_result
         
-        image = vision.Image(content=content)
-        
-        # Get labels
-        response = client.label_detection(image=image)
+        # Get labels and web detection in a single request, on an oriented, downscaled copy
+        with metrics.time('image_preprocess'):
+            vision_content = prepare_for_vision(content)
+        response = vision_clients.annotate(vision_content, "food")
         labels = response.label_annotations
-        
-        # Get web detection
-        web_response = client.web_detection(image=image)
-        web_entities = web_response.web_detection.web_entities if web_response.web_detection else []
+        web_entities = response.web_detection.web_entities if response.web_detection else []
+        classification_start = time.perf_counter()
         
         # Simple: pick highest confidence from labels (skip generic terms)
         generic_terms = ['food', 'meal', 'dish', 'ingredient', 'pasta', 'noodle', 'noodles', 
@@ -367,6 +591,7 @@ def analyze_food_with_vision(image_path):
             best_score = 0.0
         else:
             food_name = best_label.description
+        metrics.observe('classification', time.perf_counter() - classification_start, media_type='food')
         
         result = {
             'food_name': food_name,
@@ -376,10 +601,11 @@ def analyze_food_with_vision(image_path):
             'web_entities': [{'description': e.description, 'score': e.score} for e in web_entities[:5]]
         }
         
+        analysis_cache.set(cache_key, result)
         return result
         
     except Exception as e:
-        print(f"Error in analyze_food_with_vision: {str(e)}")
+        logger.exception("Error in analyze_food_with_vision: %s", e)
         return {
             'food_name': 'Analysis Failed',
             'food_type': 'Unknown',
@@ -392,47 +618,52 @@ def analyze_food_with_vision(image_path):
 @app.route('/')
 def index():
     """Serve the home page"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'index.html')
+    return frontend_assets.response('index.html', request)
 
 @app.route('/art')
 def art():
     """Serve the art recognition page"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'art.html')
+    return frontend_assets.response('art.html', request)
 
 @app.route('/food')
 def food():
     """Serve the food recognition page"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'food.html')
+    return frontend_assets.response('food.html', request)
 
 @app.route('/architecture')
 def architecture():
     """Serve the architecture recognition page"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'architecture.html')
+    return frontend_assets.response('architecture.html', request)
 
 @app.route('/styles.css')
 def styles():
     """Serve CSS file"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'styles.css')
+    return frontend_assets.response('styles.css', request)
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted frontend asset; its URL changes whenever its content does"""
+    return frontend_assets.fingerprinted_response(filename, request)
 
 @app.route('/logo/<filename>')
 def serve_logo(filename):
     """Serve logo files"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'logo'), filename)
+    return frontend_assets.response(f'logo/{filename}', request)
 
 @app.route('/script.js')
 def script():
     """Serve JavaScript file"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'script.js')
+    return frontend_assets.response('script.js', request)
 
 @app.route('/food.js')
 def food_script():
     """Serve food JavaScript file"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'food.js')
+    return frontend_assets.response('food.js', request)
 
 @app.route('/architecture.js')
 def architecture_script():
     """Serve architecture JavaScript file"""
-    return send_from_directory(os.path.join(os.path.dirname(__file__), '..', 'frontend'), 'architecture.js')
+    return frontend_assets.response('architecture.js', request)
 
 @app.route('/upload', methods=['POST'])
 def upload_files():
@@ -448,6 +679,7 @@ def upload_files():
         
         uploaded_files = []
         failed_uploads = []
+        image_jobs = []
         
         for file in files:
             if file and allowed_file(file.filename):
@@ -456,72 +688,43 @@ def upload_files():
                 file_extension = original_filename.rsplit('.', 1)[1].lower()
                 unique_filename = f"{uuid.uuid4()}.{file_extension}"
                 
-                # Save file
+                # Read the upload once; analysis uses these bytes and the disk copy is written in the background
+                content = file.read()
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                file.save(file_path)
                 
                 # Store file info
                 file_info = {
                     'original_name': original_filename,
                     'saved_name': unique_filename,
-                    'size': os.path.getsize(file_path),
+                    'size': len(content),
                     'upload_time': datetime.now().isoformat()
                 }
                 
                 # Analyze image for artwork if it's an image file
-                print(f"File extension: {file_extension}")
-                print(f"Checking if {file_extension} is in {['jpg', 'jpeg', 'png', 'gif']}")
+                logger.debug("File extension: %s", file_extension)
+                logger.debug("Checking if %s is in %s", file_extension, ['jpg', 'jpeg', 'png', 'gif'])
                 if file_extension in ['jpg', 'jpeg', 'png', 'gif']:
-                    print(f"✅ Image file detected! Analyzing: {original_filename}")
-                    print(f"File path: {file_path}")
-                    try:
-                        analysis_result = analyze_image_with_vision(file_path)
-                        print(f"Analysis result: {analysis_result}")
-                        file_info['artwork_analysis'] = analysis_result
-                        
-                        # Keep the image for display - cleanup will handle old images
-                        print(f"📸 Keeping image for display: {file_path}")
-                            
-                    except Exception as e:
-                        print(f"❌ Error analyzing image: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        file_info['artwork_analysis'] = {
-                            'artwork_name': 'Analysis Error',
-                            'confidence': 0,
-                            'error': str(e)
-                        }
-                        
-                        # Keep the image even if analysis failed
-                        print(f"📸 Keeping image despite analysis error: {file_path}")
+                    logger.debug("✅ Image file detected! Queued for analysis: %s", original_filename)
+                    logger.debug("File path: %s", file_path)
+                    # Keep the image for display - the upload store evicts old images
+                    save_upload_async(file_path, content)
+                    image_jobs.append((file_info, content))
                 else:
-                    print(f"❌ Not an image file: {file_extension}")
-                    # Delete non-image files immediately
-                    try:
-                        os.remove(file_path)
-                        print(f"🗑️ Deleted non-image file: {file_path}")
-                    except Exception as delete_error:
-                        print(f"⚠️ Could not delete file: {delete_error}")
+                    logger.warning("❌ Not an image file: %s", file_extension)
+                    # Non-image files are never written to disk
                 
                 uploaded_files.append(file_info)
                 
             else:
                 failed_uploads.append(file.filename if file else 'Unknown file')
         
-        response_data = {
-            'message': 'Upload completed',
-            'uploadedCount': len(uploaded_files),
-            'uploadedFiles': uploaded_files
-        }
-        
-        if failed_uploads:
-            response_data['failedFiles'] = failed_uploads
-            response_data['message'] += f' ({len(failed_uploads)} files failed)'
-        
-        # Clean up old images to maintain max of 20 images
-        cleanup_old_images(max_images=20)
-        
-        return jsonify(response_data)
+        finish = partial(
+            complete_upload, uploaded_files, failed_uploads, image_jobs,
+            analyze_image_with_vision,
+            lambda error: {'artwork_name': 'Analysis Error', 'confidence': 0, 'error': error},
+            'artwork_analysis'
+        )
+        return respond_to_upload('artwork_upload', finish, uploaded_files, failed_uploads)
         
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
@@ -529,8 +732,20 @@ def upload_files():
 @app.route('/uploads/<filename>')
 def serve_uploaded_image(filename):
     """Serve uploaded images"""
+    # Images still being written are served straight from memory
+    content = upload_store.pending(filename)
     try:
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        if content is not None:
+            response = Response(content, mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        else:
+            response = send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        # Upload names are random UUIDs, so the bytes behind a name never change and the
+        # name is the ETag whether the image is still in memory or already on disk
+        response.set_etag(filename)
+        response.cache_control.public = True
+        response.cache_control.max_age = UPLOAD_CACHE_MAX_AGE
+        response.cache_control.immutable = True
+        return response.make_conditional(request)
     except FileNotFoundError:
         return jsonify({'error': 'Image not found'}), 404
 
@@ -552,13 +767,18 @@ def get_artwork_themes(artwork_name):
         })
         
     except Exception as e:
-        print(f"Error getting themes for {artwork_name}: {str(e)}")
+        logger.exception("Error getting themes for %s: %s", artwork_name, e)
         return jsonify({
             'artwork_name': artwork_name,
             'themes': f"Error analyzing themes: {str(e)}",
             'success': False
         }), 500
 
+@app.route('/stream/get_themes/<artwork_name>')
+def stream_artwork_themes(artwork_name):
+    """Stream the artwork description over Server-Sent Events as it is generated"""
+    return stream_agent_details(partial(pipeline_agent, "artwork", artwork_name, ""), artwork_name)
+
 @app.route('/get_suggestions/<artwork_name>')
 def get_artwork_suggestions(artwork_name):
     """Get 6 similar artworks for a specific artwork using the Agent"""
@@ -567,11 +787,15 @@ def get_artwork_suggestions(artwork_name):
         artwork_agent = Agent("artwork", artwork_name)
         artwork_agent.add_artwork_to_prompt()
         
-        # Get themes first, as required by artwork_suggestions
-        themes = artwork_agent.get_themes()
-        
-        # Get suggestions from the agent, passing themes
-        suggestions = artwork_agent.artwork_suggestions(themes)
+        if use_single_shot_suggestions():
+            # Themes and suggestions from one generation
+            themes, suggestions = artwork_agent.themes_and_suggestions()
+        else:
+            # Get themes first, as required by artwork_suggestions
+            themes = artwork_agent.get_themes()
+            
+            # Get suggestions from the agent, passing themes
+            suggestions = artwork_agent.artwork_suggestions(themes)
         
         return jsonify({
             'artwork_name': artwork_name,
@@ -580,7 +804,7 @@ def get_artwork_suggestions(artwork_name):
         })
         
     except Exception as e:
-        print(f"Error getting suggestions for {artwork_name}: {str(e)}")
+        logger.exception("Error getting suggestions for %s: %s", artwork_name, e)
         return jsonify({
             'artwork_name': artwork_name,
             'suggestions': [],
@@ -602,6 +826,7 @@ def upload_food():
         
         uploaded_files = []
         failed_uploads = []
+        image_jobs = []
         
         for file in files:
             if file and allowed_file(file.filename):
@@ -610,67 +835,41 @@ def upload_food():
                 file_extension = original_filename.rsplit('.', 1)[1].lower()
                 unique_filename = f"{uuid.uuid4()}.{file_extension}"
                 
-                # Save file
+                # Read the upload once; analysis uses these bytes and the disk copy is written in the background
+                content = file.read()
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                file.save(file_path)
                 
                 # Store file info
                 file_info = {
                     'original_name': original_filename,
                     'saved_name': unique_filename,
-                    'size': os.path.getsize(file_path),
+                    'size': len(content),
                     'upload_time': datetime.now().isoformat()
                 }
                 
                 # Analyze image for food if it's an image file
-                print(f"File extension: {file_extension}")
+                logger.debug("File extension: %s", file_extension)
                 if file_extension in ['jpg', 'jpeg', 'png', 'gif']:
-                    print(f"✅ Image file detected! Analyzing for food: {original_filename}")
-                    print(f"File path: {file_path}")
-                    try:
-                        analysis_result = analyze_food_with_vision(file_path)
-                        print(f"Analysis result: {analysis_result}")
-                        file_info['food_analysis'] = analysis_result
-                        
-                        # Keep the image for display
-                        print(f"📸 Keeping image for display: {file_path}")
-                    except Exception as e:
-                        print(f"❌ Error analyzing food image: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        file_info['food_analysis'] = {
-                            'food_name': 'Analysis Error',
-                            'confidence': 0,
-                            'error': str(e)
-                        }
-                        print(f"📸 Keeping image despite analysis error: {file_path}")
+                    logger.debug("✅ Image file detected! Queued for food analysis: %s", original_filename)
+                    logger.debug("File path: %s", file_path)
+                    # Keep the image for display
+                    save_upload_async(file_path, content)
+                    image_jobs.append((file_info, content))
                 else:
-                    print(f"❌ Not an image file: {file_extension}")
-                    # Delete non-image files immediately
-                    try:
-                        os.remove(file_path)
-                        print(f"🗑️ Deleted non-image file: {file_path}")
-                    except Exception as delete_error:
-                        print(f"⚠️ Could not delete file: {delete_error}")
+                    logger.warning("❌ Not an image file: %s", file_extension)
+                    # Non-image files are never written to disk
                 
                 uploaded_files.append(file_info)
             else:
                 failed_uploads.append(file.filename if file else 'Unknown file')
         
-        response_data = {
-            'message': 'Upload completed',
-            'uploadedCount': len(uploaded_files),
-            'uploadedFiles': uploaded_files
-        }
-        
-        if failed_uploads:
-            response_data['failedFiles'] = failed_uploads
-            response_data['message'] += f' ({len(failed_uploads)} files failed)'
-        
-        # Clean up old images to maintain max of 20 images
-        cleanup_old_images(max_images=20)
-        
-        return jsonify(response_data)
+        finish = partial(
+            complete_upload, uploaded_files, failed_uploads, image_jobs,
+            analyze_food_with_vision,
+            lambda error: {'food_name': 'Analysis Error', 'confidence': 0, 'error': error},
+            'food_analysis'
+        )
+        return respond_to_upload('food_upload', finish, uploaded_files, failed_uploads)
         
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
@@ -693,13 +892,18 @@ def get_food_details(food_name):
         })
         
     except Exception as e:
-        print(f"Error getting details for {food_name}: {str(e)}")
+        logger.exception("Error getting details for %s: %s", food_name, e)
         return jsonify({
             'food_name': food_name,
             'details': f"Error analyzing food: {str(e)}",
             'success': False
         }), 500
 
+@app.route('/stream/get_food_details/<food_name>')
+def stream_food_details(food_name):
+    """Stream the food description over Server-Sent Events as it is generated"""
+    return stream_agent_details(partial(pipeline_agent, "food", food_name, ""), food_name)
+
 @app.route('/get_food_suggestions/<food_name>')
 def get_food_suggestions(food_name):
     """Get restaurant suggestions for a specific food using the Agent"""
@@ -711,11 +915,15 @@ def get_food_suggestions(food_name):
         food_agent = Agent("food", food_name)
         food_agent.add_food_to_prompt(location)
         
-        # Get themes first, as required by food_suggestions
-        themes = food_agent.get_themes()
-        
-        # Get suggestions from the agent, passing location and themes
-        suggestions = food_agent.food_suggestions(location, themes)
+        if use_single_shot_suggestions():
+            # Themes and suggestions from one generation
+            themes, suggestions = food_agent.themes_and_suggestions()
+        else:
+            # Get themes first, as required by food_suggestions
+            themes = food_agent.get_themes()
+            
+            # Get suggestions from the agent, passing location and themes
+            suggestions = food_agent.food_suggestions(location, themes)
         
         return jsonify({
             'food_name': food_name,
@@ -725,7 +933,7 @@ def get_food_suggestions(food_name):
         })
         
     except Exception as e:
-        print(f"Error getting suggestions for {food_name}: {str(e)}")
+        logger.exception("Error getting suggestions for %s: %s", food_name, e)
         return jsonify({
             'food_name': food_name,
             'suggestions': [],
@@ -733,6 +941,12 @@ def get_food_suggestions(food_name):
             'error': str(e)
         }), 500
 
+@app.route('/stream/get_food_suggestions/<food_name>')
+def stream_food_suggestions(food_name):
+    """Stream restaurant suggestions card by card over Server-Sent Events"""
+    location = request.args.get('location', 'New York')
+    return stream_agent_suggestions(partial(pipeline_agent, "food", food_name, location), food_name)
+
 @app.route('/upload_architecture', methods=['POST'])
 def upload_architecture():
     """Handle architecture image uploads and analysis"""
@@ -747,6 +961,7 @@ def upload_architecture():
         
         uploaded_files = []
         failed_uploads = []
+        image_jobs = []
         
         for file in files:
             if file and allowed_file(file.filename):
@@ -755,68 +970,41 @@ def upload_architecture():
                 file_extension = original_filename.rsplit('.', 1)[1].lower()
                 unique_filename = f"{uuid.uuid4()}.{file_extension}"
                 
-                # Save file
+                # Read the upload once; analysis uses these bytes and the disk copy is written in the background
+                content = file.read()
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                file.save(file_path)
                 
                 # Store file info
                 file_info = {
                     'original_name': original_filename,
                     'saved_name': unique_filename,
-                    'size': os.path.getsize(file_path),
+                    'size': len(content),
                     'upload_time': datetime.now().isoformat()
                 }
                 
                 # Analyze image for architecture if it's an image file
-                print(f"File extension: {file_extension}")
+                logger.debug("File extension: %s", file_extension)
                 if file_extension in ['jpg', 'jpeg', 'png', 'gif']:
-                    print(f"✅ Image file detected! Analyzing for architecture: {original_filename}")
-                    print(f"File path: {file_path}")
-                    try:
-                        analysis_result = analyze_image_with_vision(file_path, analysis_type="architecture")
-                        print(f"Analysis result: {analysis_result}")
-                        # Store as architecture_analysis for consistency with frontend
-                        file_info['architecture_analysis'] = analysis_result
-                        
-                        # Keep the image for display
-                        print(f"📸 Keeping image for display: {file_path}")
-                    except Exception as e:
-                        print(f"❌ Error analyzing architecture image: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        file_info['architecture_analysis'] = {
-                            'artwork_name': 'Analysis Error',
-                            'confidence': 0,
-                            'error': str(e)
-                        }
-                        print(f"📸 Keeping image despite analysis error: {file_path}")
+                    logger.debug("✅ Image file detected! Queued for architecture analysis: %s", original_filename)
+                    logger.debug("File path: %s", file_path)
+                    # Keep the image for display
+                    save_upload_async(file_path, content)
+                    image_jobs.append((file_info, content))
                 else:
-                    print(f"❌ Not an image file: {file_extension}")
-                    # Delete non-image files immediately
-                    try:
-                        os.remove(file_path)
-                        print(f"🗑️ Deleted non-image file: {file_path}")
-                    except Exception as delete_error:
-                        print(f"⚠️ Could not delete file: {delete_error}")
+                    logger.warning("❌ Not an image file: %s", file_extension)
+                    # Non-image files are never written to disk
                 
                 uploaded_files.append(file_info)
             else:
                 failed_uploads.append(file.filename if file else 'Unknown file')
         
-        response_data = {
-            'message': 'Upload completed',
-            'uploadedCount': len(uploaded_files),
-            'uploadedFiles': uploaded_files
-        }
-        
-        if failed_uploads:
-            response_data['failedFiles'] = failed_uploads
-            response_data['message'] += f' ({len(failed_uploads)} files failed)'
-        
-        # Clean up old images to maintain max of 20 images
-        cleanup_old_images(max_images=20)
-        
-        return jsonify(response_data)
+        finish = partial(
+            complete_upload, uploaded_files, failed_uploads, image_jobs,
+            partial(analyze_image_with_vision, analysis_type="architecture"),
+            lambda error: {'artwork_name': 'Analysis Error', 'confidence': 0, 'error': error},
+            'architecture_analysis'
+        )
+        return respond_to_upload('architecture_upload', finish, uploaded_files, failed_uploads)
         
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
@@ -839,13 +1027,18 @@ def get_architecture_details(building_name):
         })
         
     except Exception as e:
-        print(f"Error getting details for {building_name}: {str(e)}")
+        logger.exception("Error getting details for %s: %s", building_name, e)
         return jsonify({
             'building_name': building_name,
             'details': f"Error analyzing architecture: {str(e)}",
             'success': False
         }), 500
 
+@app.route('/stream/get_architecture_details/<building_name>')
+def stream_architecture_details(building_name):
+    """Stream the building description over Server-Sent Events as it is generated"""
+    return stream_agent_details(partial(pipeline_agent, "architecture", building_name, ""), building_name)
+
 @app.route('/get_architecture_suggestions/<building_name>')
 def get_architecture_suggestions(building_name):
     """Get similar architecture suggestions for a specific building using the Agent"""
@@ -854,11 +1047,15 @@ def get_architecture_suggestions(building_name):
         architecture_agent = Agent("architecture", building_name)
         architecture_agent.add_architecture_to_prompt()
         
-        # Get themes first, as required by architecture_suggestions
-        themes = architecture_agent.get_themes()
-        
-        # Get suggestions from the agent, passing themes
-        suggestions = architecture_agent.architecture_suggestions(themes)
+        if use_single_shot_suggestions():
+            # Themes and suggestions from one generation
+            themes, suggestions = architecture_agent.themes_and_suggestions()
+        else:
+            # Get themes first, as required by architecture_suggestions
+            themes = architecture_agent.get_themes()
+            
+            # Get suggestions from the agent, passing themes
+            suggestions = architecture_agent.architecture_suggestions(themes)
         
         return jsonify({
             'building_name': building_name,
@@ -867,7 +1064,7 @@ def get_architecture_suggestions(building_name):
         })
         
     except Exception as e:
-        print(f"Error getting suggestions for {building_name}: {str(e)}")
+        logger.exception("Error getting suggestions for %s: %s", building_name, e)
         return jsonify({
             'building_name': building_name,
             'suggestions': [],
@@ -875,12 +1072,214 @@ def get_architecture_suggestions(building_name):
             'error': str(e)
         }), 500
 
+@app.route('/stream/get_architecture_suggestions/<building_name>')
+def stream_architecture_suggestions(building_name):
+    """Stream similar architecture suggestions card by card over Server-Sent Events"""
+    return stream_agent_suggestions(partial(pipeline_agent, "architecture", building_name, ""), building_name)
+
+# media type -> (Vision analysis, key of its result in the file info, key of the recognized name)
+ANALYZE_PIPELINES = {
+    'artwork': (analyze_image_with_vision, 'artwork_analysis', 'artwork_name'),
+    'food': (analyze_food_with_vision, 'food_analysis', 'food_name'),
+    'architecture': (partial(analyze_image_with_vision, analysis_type="architecture"),
+                     'architecture_analysis', 'artwork_name')
+}
+# Names the analyses give when nothing was recognized, which are not worth describing
+UNRECOGNIZED_NAMES = {'Unable to identify artwork', 'Unable to identify building', 'Unable to identify food item',
+                      'Unknown Artwork', 'Analysis Failed', 'Analysis Error'}
+
+def pipeline_agent(media_type, name, location):
+    """One Agent serving both the details and the suggestions of a pipeline"""
+    agent = Agent(media_type, name)
+    if media_type == 'food':
+        agent.add_food_to_prompt(location)
+    elif media_type == 'architecture':
+        agent.add_architecture_to_prompt()
+    else:
+        agent.add_artwork_to_prompt()
+    return agent
+
+def pipeline_suggestions(agent, media_type, location, single_shot):
+    if single_shot:
+        # Themes and suggestions from one generation
+        _, suggestions = agent.themes_and_suggestions()
+        return suggestions
+    themes = agent.get_themes()
+    if media_type == 'food':
+        return agent.food_suggestions(location, themes)
+    if media_type == 'architecture':
+        return agent.architecture_suggestions(themes)
+    return agent.artwork_suggestions(themes)
+
+@app.route('/analyze/<media_type>', methods=['POST'])
+def analyze(media_type):
+    """Recognize one image, then describe it and suggest similar ones, all in a single request
+
+    The description is generated while the themes and suggestions are, instead of
+    after separate requests from the browser. Answers one JSON document, or with
+    ?stream=1 Server-Sent Events: 'analysis' first, then 'chunk' (description
+    text), 'suggestion' and 'patch' events as they are generated, 'details_done'
+    and 'suggestions_done' as each part finishes, and 'done' last.
+    """
+    if media_type not in ANALYZE_PIPELINES:
+        return jsonify({'error': f'Unknown media type: {media_type}'}), 404
+    analyze_image, result_key, name_key = ANALYZE_PIPELINES[media_type]
+
+    file = request.files.get('file') or next(iter(request.files.getlist('files')), None)
+    if not file or file.filename == '':
+        return jsonify({'error': 'No file provided'}), 400
+    original_filename = secure_filename(file.filename)
+    file_extension = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else ''
+    if file_extension not in ['jpg', 'jpeg', 'png', 'gif']:
+        return jsonify({'error': f'Not an image file: {file.filename}'}), 400
+
+    unique_filename = f"{uuid.uuid4()}.{file_extension}"
+    content = file.read()
+    file_info = {
+        'original_name': original_filename,
+        'saved_name': unique_filename,
+        'size': len(content),
+        'upload_time': datetime.now().isoformat()
+    }
+    save_upload_async(os.path.join(app.config['UPLOAD_FOLDER'], unique_filename), content)
+
+    analysis = run_image_analyses(
+        [(unique_filename, content)], analyze_image,
+        lambda error: {name_key: 'Analysis Error', 'confidence': 0, 'error': error}
+    )[0]
+    file_info[result_key] = analysis
+
+    location = request.values.get('location', 'New York') if media_type == 'food' else ''
+    name = analysis.get(name_key)
+    agent = pipeline_agent(media_type, name, location) if name and name not in UNRECOGNIZED_NAMES else None
+    single_shot = use_single_shot_suggestions()
+
+    response_data = {'media_type': media_type, 'file': file_info}
+    if media_type == 'food':
+        response_data['location'] = location
+    if wants_stream():
+        return stream_pipeline(response_data, agent, name, single_shot)
+
+    response_data.update({'details': None, 'suggestions': [], 'success': True})
+    if agent is None:
+        return jsonify(response_data)
+
+    suggestions = pipeline_pool.submit(pipeline_suggestions, agent, media_type, location, single_shot)
+    errors = {}
+    try:
+        response_data['details'] = agent.get_details()
+    except Exception as e:
+        logger.exception("Error getting details for %s: %s", name, e)
+        errors['details'] = str(e)
+    try:
+        response_data['suggestions'] = suggestions.result()
+    except Exception as e:
+        logger.exception("Error getting suggestions for %s: %s", name, e)
+        errors['suggestions'] = str(e)
+    if errors:
+        response_data.update({'success': False, 'errors': errors})
+    return jsonify(response_data)
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Poll an async upload job; the upload response is under 'result' once it is done"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Follow an async upload job over Server-Sent Events until it finishes"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def generate():
+        version = None
+        while True:
+            current = job.wait_for_change(version, JOB_EVENTS_KEEPALIVE) if version is not None else job.version
+            if current == version:
+                # Nothing new; a comment line keeps proxies from closing the idle stream
+                yield ": keepalive\n\n"
+                continue
+            version = current
+            state = job.to_dict()
+            if state['status'] == 'done':
+                yield sse_event('done', state)
+                return
+            if state['status'] == 'failed':
+                yield sse_event('error', state)
+                return
+            yield sse_event('status', state)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once prompts, vocabularies and assets are loaded, 503 while shutting down"""
+    if shutting_down.is_set():
+        return jsonify({'ready': False, 'reason': 'shutting down', 'pid': os.getpid()}), 503
+    return jsonify({
+        'ready': True,
+        'pid': os.getpid(),
+        'vision': vision_clients.status(),
+        'assets': frontend_assets.stats()['assets']
+    })
+
+@app.route('/vision_status')
+def vision_status():
+    """Report the shared Vision client state, including channel warm-up time"""
+    return jsonify(vision_clients.status())
+
+@app.route('/upstream_status')
+def upstream_status():
+    """Circuit breaker state, deadline and hedging counters for Gemini and Places"""
+    return jsonify({upstream.name: upstream.stats() for upstream in (gemini_upstream, places_upstream)})
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Report hit/miss counters for the server-side caches"""
+    return jsonify({
+        'analysis': analysis_cache.stats(),
+        'llm': llm_cache.stats(),
+        'llm_single_flight': llm_flights.stats(),
+        'places': places_cache.stats(),
+        'uploads': upload_store.stats(),
+        'logging': log_stats()
+    })
+
+def metric_counters():
+    """Counters kept by the caches and other components, reported alongside the stage timings"""
+    counters = []
+    for name, cache in (('analysis', analysis_cache), ('llm', llm_cache), ('places', places_cache)):
+        stats = cache.stats()
+        for result, counter in (('memory_hit', 'memory_hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses')):
+            counters.append(('cache_lookups_total', {'cache': name, 'result': result}, stats[counter]))
+    counters.append(('llm_coalesced_total', {}, llm_flights.stats()['shared']))
+    counters.append(('uploads_evicted_total', {}, upload_store.stats()['evicted']))
+    counters.append(('log_records_dropped_total', {}, log_stats()['dropped']))
+    for upstream in (gemini_upstream, places_upstream):
+        stats = upstream.stats()
+        for counter in ('calls', 'failures', 'timeouts', 'hedges', 'hedge_wins', 'rejected'):
+            counters.append((f'upstream_{counter}_total', {'upstream': upstream.name}, stats[counter]))
+    return counters
+
+metrics.add_collector(metric_counters)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Per-stage latency histograms, error counts and cache counters in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.errorhandler(413)
 def too_large(e):
     return jsonify({'error': 'File too large. Maximum size is 16MB.'}), 413
 
 if __name__ == '__main__':
-    print("Starting GatorHacks4 File Upload Server...")
-    print("Upload folder:", os.path.abspath(UPLOAD_FOLDER))
-    print("Access the upload page at: http://localhost:5000")
+    logger.info("Starting GatorHacks4 File Upload Server...")
+    logger.info("Upload folder: %s", os.path.abspath(UPLOAD_FOLDER))
+    logger.info("Access the upload page at: http://localhost:5000")
+    vision_clients.warm_up()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,230 @@
+from term_matcher import TermMatcher
+
+# Vocabularies are kept as tuples (deduplicated, first occurrence wins) and
+# compiled into matchers once at import instead of on every web entity.
+
+# Vision labels that mark an image as art-related
+ART_LABEL_TERMS = (
+    'art', 'painting', 'drawing', 'sculpture', 'artwork', 'portrait', 'landscape', 'still life',
+    'masterpiece'
+)
+
+# Famous artworks and artists for better classification of web entities
+FAMOUS_ARTWORKS = (
+    'starry night', 'mona lisa', 'the scream', 'guernica', 'the persistence of memory',
+    'water lilies', 'the last supper', 'the birth of venus', 'american gothic', 'the great wave',
+    'david', 'the creation of adam', 'the sistine chapel', 'the school of athens',
+    'girl with a pearl earring', 'the night watch', 'the kiss', 'the thinker',
+    "les demoiselles d'avignon", 'the blue rider', 'composition vii', 'no. 5',
+    "campbell's soup cans", 'marilyn diptych', 'the great wave off kanagawa',
+    'girl before a mirror', 'the old guitarist', 'the weeping woman', 'three musicians',
+    'the blue period', 'rose period', 'cubism'
+)
+
+FAMOUS_ARTISTS = (
+    'michelangelo', 'leonardo da vinci', 'vincent van gogh', 'pablo picasso', 'claude monet',
+    'edvard munch', 'salvador dali', 'rembrandt', 'andy warhol', 'jackson pollock',
+    'wassily kandinsky', 'henri matisse', 'auguste rodin', 'gustav klimt', 'paul gauguin',
+    'paul cezanne', 'edgar degas', 'mary cassatt', 'frida kahlo', "georgia o'keeffe",
+    'mark rothko', 'willem de kooning', 'leonardo', 'picasso', 'van gogh', 'monet', 'dali',
+    'warhol', 'pollock', 'kandinsky', 'matisse', 'rodin', 'klimt', 'gauguin', 'cezanne', 'degas'
+)
+
+# Generic terms we want to avoid picking as an artwork title
+GENERIC_TERMS = (
+    'painting', 'sculpture', 'artwork', 'masterpiece', 'statue', 'bust', 'portrait', 'landscape',
+    'still life', 'art', 'image', 'picture', 'photo', 'photograph', 'drawing', 'sketch', 'canvas',
+    'oil painting', 'watercolor', 'acrylic', 'mixed media', 'collage', 'print', 'etching',
+    'lithograph', 'fresco', 'mural', 'relief', 'installation', 'performance art', 'digital art',
+    'conceptual art', 'abstract art', 'figurative art', 'contemporary art', 'modern art',
+    'classical art', 'fine art', 'visual art', 'graphic art', 'decorative art', 'applied art',
+    'folk art', 'naive art', 'primitive art', 'cave painting', 'rock art', 'street art',
+    'graffiti', 'mosaic', 'tapestry', 'ceramic', 'pottery', 'glass art', 'metalwork',
+    'wood carving', 'stone carving', 'bronze', 'marble', 'plaster', 'clay', 'textile', 'fiber art',
+    'jewelry', 'furniture', 'architecture', 'design', 'illustration', 'poster', 'book cover',
+    'album cover', 'logo', 'symbol', 'icon', 'emblem', 'badge', 'medal', 'coin', 'stamp',
+    'postcard', 'calendar', 'magazine', 'newspaper', 'advertisement', 'billboard', 'sign',
+    'banner', 'flag', 'pennant', 'streamer', 'decoration', 'ornament', 'accessory', 'gift',
+    'souvenir', 'keepsake', 'memento', 'relic', 'artifact', 'antique', 'vintage', 'collectible',
+    'curio', 'trinket', 'bauble', 'knickknack', 'bric-a-brac', 'gewgaw', 'gimcrack', 'novelty',
+    'toy', 'game', 'puzzle', 'model', 'miniature', 'replica', 'copy', 'reproduction', 'facsimile',
+    'duplicate', 'clone', 'imitation', 'fake', 'forgery', 'counterfeit', 'knockoff', 'bootleg',
+    'pirate', 'unauthorized', 'illegal', 'stolen', 'looted', 'smuggled', 'contraband',
+    'black market', 'underground', 'secret', 'hidden', 'concealed', 'camouflaged', 'disguised',
+    'masked', 'veiled', 'covered', 'wrapped', 'packaged', 'boxed', 'crated', 'shipped',
+    'delivered', 'transported', 'moved', 'relocated', 'transferred', 'sold', 'bought', 'purchased',
+    'acquired', 'obtained', 'gained', 'earned', 'won', 'lost', 'taken', 'removed', 'destroyed',
+    'damaged', 'broken', 'fixed', 'repaired', 'restored', 'conserved', 'preserved', 'maintained',
+    'cleaned', 'polished', 'refinished', 'refurbished', 'renovated', 'updated', 'modernized',
+    'improved', 'enhanced', 'upgraded', 'modified', 'altered', 'changed', 'transformed',
+    'converted', 'adapted', 'adjusted', 'customized', 'personalized', 'tailored', 'fitted',
+    'sized', 'scaled', 'proportioned', 'balanced', 'harmonized', 'coordinated', 'matched',
+    'paired', 'grouped', 'categorized', 'classified', 'sorted', 'organized', 'arranged',
+    'displayed', 'exhibited', 'shown', 'presented', 'demonstrated', 'explained', 'described',
+    'documented', 'recorded', 'catalogued', 'indexed', 'referenced', 'cited', 'quoted',
+    'mentioned', 'noted', 'observed', 'noticed', 'spotted', 'seen', 'viewed', 'looked', 'watched',
+    'studied', 'examined', 'analyzed', 'evaluated', 'assessed', 'judged', 'critiqued', 'reviewed',
+    'rated', 'ranked', 'scored', 'graded', 'marked', 'labeled', 'tagged', 'named', 'titled',
+    'captioned', 'subtitled', 'legend', 'inscription', 'text', 'writing', 'script', 'font',
+    'typeface', 'typography', 'calligraphy', 'handwriting', 'signature', 'autograph', 'monogram',
+    'initial', 'letter', 'word', 'phrase', 'sentence', 'paragraph', 'passage', 'excerpt', 'quote',
+    'citation', 'reference', 'footnote', 'endnote', 'bibliography', 'source', 'origin',
+    'provenance', 'history', 'background', 'context', 'setting', 'environment', 'atmosphere',
+    'mood', 'feeling', 'emotion', 'sentiment', 'attitude', 'opinion', 'viewpoint', 'perspective',
+    'angle', 'approach', 'method', 'technique', 'style', 'manner', 'way', 'fashion', 'trend',
+    'movement', 'school', 'tradition', 'convention', 'standard', 'norm', 'rule', 'principle',
+    'guideline', 'criterion', 'measure', 'yardstick', 'benchmark', 'reference point', 'baseline',
+    'starting point', 'foundation', 'basis', 'ground', 'reason', 'cause', 'purpose', 'goal',
+    'objective', 'aim', 'target', 'destination', 'end', 'result', 'outcome', 'consequence',
+    'effect', 'impact', 'influence', 'significance', 'importance', 'value', 'worth', 'merit',
+    'quality', 'excellence', 'superiority', 'greatness', 'brilliance', 'genius', 'talent', 'skill',
+    'ability', 'capability', 'competence', 'proficiency', 'expertise', 'mastery', 'virtuosity',
+    'artistry', 'craftsmanship', 'workmanship', 'mode', 'form', 'format', 'structure',
+    'organization', 'arrangement', 'composition', 'layout', 'pattern', 'motif', 'theme', 'subject',
+    'topic', 'content', 'material', 'medium', 'substance', 'matter', 'stuff', 'thing', 'object',
+    'item', 'piece', 'work', 'creation', 'production', 'output', 'product', 'specimen', 'sample',
+    'example', 'instance', 'case', 'occurrence', 'event', 'happening', 'incident', 'episode',
+    'scene', 'moment', 'instant', 'second', 'minute', 'hour', 'day', 'week', 'month', 'year',
+    'decade', 'century', 'millennium', 'era', 'period', 'age', 'time', 'date', 'chronology',
+    'timeline', 'past', 'present', 'future', 'now', 'then', 'when', 'where', 'why', 'how', 'what',
+    'who', 'which', 'whose', 'whom', 'that', 'this', 'these', 'those', 'here', 'there',
+    'everywhere', 'nowhere', 'somewhere', 'anywhere', 'always', 'never', 'sometimes', 'often',
+    'rarely', 'usually', 'normally', 'typically', 'generally', 'commonly', 'frequently',
+    'occasionally', 'seldom', 'hardly', 'barely', 'scarcely', 'almost', 'nearly', 'quite', 'very',
+    'extremely', 'highly', 'greatly', 'significantly', 'substantially', 'considerably',
+    'remarkably', 'notably', 'particularly', 'especially', 'specifically'
+)
+
+# Terms that suggest an entity names a person or role rather than an artwork
+ARTIST_TERMS = (
+    'artist', 'painter', 'sculptor', 'creator', 'maker', 'designer', 'illustrator', 'draftsman',
+    'cartoonist', 'animator', 'photographer', 'filmmaker', 'director', 'producer', 'writer',
+    'author', 'poet', 'novelist', 'playwright', 'screenwriter', 'composer', 'musician', 'singer',
+    'performer', 'actor', 'actress', 'dancer', 'choreographer', 'architect', 'engineer',
+    'scientist', 'inventor', 'discoverer', 'explorer', 'adventurer', 'traveler', 'tourist',
+    'visitor', 'guest', 'host', 'owner', 'collector', 'curator', 'critic', 'reviewer',
+    'journalist', 'reporter', 'editor', 'publisher', 'agent', 'manager', 'dealer', 'gallery',
+    'museum', 'exhibition', 'show', 'display', 'collection', 'archive', 'library', 'database',
+    'catalog', 'inventory', 'stock', 'supply', 'store', 'shop', 'market', 'fair', 'auction',
+    'sale', 'purchase', 'buy', 'sell', 'trade', 'exchange', 'barter', 'negotiate', 'deal',
+    'contract', 'agreement', 'arrangement', 'plan', 'scheme', 'project', 'program', 'initiative',
+    'campaign', 'movement', 'organization', 'institution', 'foundation', 'trust', 'fund',
+    'endowment', 'grant', 'scholarship', 'award', 'prize', 'honor', 'recognition', 'accolade',
+    'commendation', 'praise', 'compliment', 'tribute', 'memorial', 'monument', 'statue',
+    'sculpture', 'bust', 'relief', 'plaque', 'inscription', 'epitaph', 'tombstone', 'gravestone',
+    'headstone', 'marker', 'sign', 'symbol', 'emblem', 'badge', 'medal', 'ribbon', 'certificate',
+    'diploma', 'degree', 'title', 'rank', 'position', 'status', 'standing', 'reputation', 'fame',
+    'celebrity', 'star', 'icon', 'legend', 'myth', 'hero', 'heroine', 'champion', 'winner',
+    'victor', 'conqueror', 'leader', 'ruler', 'king', 'queen', 'emperor', 'empress', 'president',
+    'prime minister', 'governor', 'mayor', 'chief', 'boss', 'supervisor', 'executive',
+    'administrator', 'official', 'representative', 'ambassador', 'delegate', 'spokesperson',
+    'spokesman', 'spokeswoman', 'advocate', 'supporter', 'fan', 'follower', 'admirer', 'devotee',
+    'enthusiast', 'lover', 'friend', 'companion', 'partner', 'associate', 'colleague', 'teammate',
+    'ally', 'helper', 'assistant', 'aide', 'secretary', 'clerk', 'employee', 'worker', 'staff',
+    'personnel', 'crew', 'team', 'group', 'company', 'corporation', 'business', 'enterprise',
+    'firm', 'agency', 'bureau', 'office', 'department', 'division', 'section', 'unit', 'branch',
+    'subsidiary', 'affiliate', 'member', 'participant', 'contributor', 'donor', 'sponsor',
+    'patron', 'benefactor', 'backer', 'investor', 'shareholder', 'stakeholder', 'proprietor',
+    'landlord', 'tenant', 'resident', 'inhabitant', 'citizen', 'national', 'native', 'local',
+    'foreigner', 'immigrant', 'emigrant', 'refugee', 'exile', 'outcast', 'pariah', 'reject',
+    'failure', 'loser', 'victim', 'casualty', 'survivor', 'witness', 'observer', 'spectator',
+    'audience', 'crowd', 'mob', 'gang', 'band', 'squad', 'force', 'army', 'navy', 'air force',
+    'marines', 'coast guard', 'police', 'sheriff', 'marshal', 'detective', 'inspector', 'officer',
+    'soldier', 'sailor', 'pilot', 'captain', 'commander', 'general', 'admiral', 'colonel', 'major',
+    'lieutenant', 'sergeant', 'corporal', 'private', 'cadet', 'recruit', 'veteran', 'retiree',
+    'pensioner', 'senior', 'elder', 'adult', 'teenager', 'youth', 'child', 'baby', 'infant',
+    'toddler', 'preschooler', 'kindergartener', 'student', 'pupil', 'scholar', 'academic',
+    'professor', 'teacher', 'instructor', 'tutor', 'mentor', 'coach', 'trainer', 'guide', 'head',
+    'chairman', 'chairwoman', 'chairperson', 'speaker', 'moderator', 'facilitator', 'mediator',
+    'arbitrator', 'judge', 'justice', 'magistrate', 'commissioner', 'envoy', 'messenger',
+    'courier', 'delivery', 'mail', 'post', 'package', 'parcel', 'envelope', 'letter', 'note',
+    'message', 'communication', 'correspondence', 'email', 'text', 'call', 'phone', 'telephone',
+    'mobile', 'cell', 'smartphone', 'tablet', 'computer', 'laptop', 'desktop', 'server', 'network',
+    'internet', 'web', 'website', 'page', 'site', 'link', 'url', 'address', 'location', 'place',
+    'spot', 'point', 'coordinate', 'latitude', 'longitude', 'altitude', 'elevation', 'depth',
+    'height', 'width', 'length', 'size', 'dimension', 'measurement', 'scale', 'proportion',
+    'ratio', 'percentage', 'fraction', 'decimal', 'number', 'digit', 'figure', 'statistic', 'data',
+    'information', 'fact', 'detail', 'particular', 'specific', 'universal', 'global', 'worldwide',
+    'international', 'regional', 'municipal', 'city', 'town', 'village', 'hamlet', 'settlement',
+    'community', 'neighborhood', 'district', 'ward', 'precinct', 'zone', 'area', 'region',
+    'territory', 'country', 'nation', 'state', 'province', 'county', 'parish', 'borough', 'canton',
+    'prefecture', 'governorate', 'emirate', 'sultanate', 'kingdom', 'empire', 'republic',
+    'democracy', 'monarchy', 'dictatorship', 'autocracy', 'oligarchy', 'aristocracy', 'plutocracy',
+    'theocracy', 'anarchy', 'chaos', 'order', 'law', 'rule', 'regulation', 'policy', 'procedure',
+    'protocol', 'standard', 'norm', 'convention', 'tradition', 'custom', 'habit', 'practice',
+    'routine', 'ritual', 'ceremony', 'celebration', 'festival', 'holiday', 'vacation', 'break',
+    'rest', 'relaxation', 'leisure', 'entertainment', 'amusement', 'fun', 'enjoyment', 'pleasure',
+    'happiness', 'joy', 'delight', 'satisfaction', 'contentment', 'fulfillment', 'achievement',
+    'success', 'accomplishment', 'victory', 'triumph', 'conquest', 'domination', 'control',
+    'power', 'authority', 'influence', 'impact', 'effect', 'result', 'outcome', 'consequence',
+    'implication', 'significance', 'importance', 'value', 'worth', 'merit', 'quality',
+    'excellence', 'superiority', 'greatness', 'brilliance', 'genius', 'talent', 'skill', 'ability',
+    'capability', 'competence', 'proficiency', 'expertise', 'mastery', 'virtuosity', 'artistry',
+    'craftsmanship', 'workmanship', 'technique', 'method', 'approach', 'style', 'manner', 'way',
+    'fashion', 'mode', 'form', 'format', 'structure', 'composition', 'design', 'layout', 'pattern',
+    'motif', 'theme', 'subject', 'topic', 'content', 'material', 'medium', 'substance', 'matter',
+    'stuff', 'thing', 'object', 'item', 'piece', 'work', 'creation', 'production', 'output',
+    'product', 'artifact', 'specimen', 'sample', 'example', 'instance', 'case', 'occurrence',
+    'event', 'happening', 'incident', 'episode', 'scene', 'moment', 'instant', 'second', 'minute',
+    'hour', 'day', 'week', 'month', 'year', 'decade', 'century', 'millennium', 'era', 'period',
+    'age', 'time', 'date', 'chronology', 'timeline', 'history', 'past', 'present', 'future', 'now',
+    'then', 'when', 'where', 'why', 'how', 'what', 'who', 'which', 'whose', 'whom', 'that', 'this',
+    'these', 'those', 'here', 'there', 'everywhere', 'nowhere', 'somewhere', 'anywhere', 'always',
+    'never', 'sometimes', 'often', 'rarely', 'usually', 'normally', 'typically', 'generally',
+    'commonly', 'frequently', 'occasionally', 'seldom', 'hardly', 'barely', 'scarcely', 'almost',
+    'nearly', 'quite', 'very', 'extremely', 'highly', 'greatly', 'significantly', 'substantially',
+    'considerably', 'remarkably', 'notably', 'particularly', 'especially', 'specifically'
+)
+
+# Terms used for the low-threshold artist fallback
+ARTIST_HINT_TERMS = (
+    'artist', 'painter', 'sculptor', 'creator'
+)
+
+# Artist names looked for inside artwork titles, in priority order
+ARTIST_NAMES_IN_TITLES = (
+    'van gogh', 'picasso', 'monet', 'da vinci', 'michelangelo', 'rembrandt', 'warhol', 'dali',
+    'kandinsky', 'pollock'
+)
+
+art_label_matcher = TermMatcher(ART_LABEL_TERMS)
+famous_artwork_matcher = TermMatcher(FAMOUS_ARTWORKS)
+famous_artist_matcher = TermMatcher(FAMOUS_ARTISTS)
+generic_term_matcher = TermMatcher(GENERIC_TERMS)
+artist_term_matcher = TermMatcher(ARTIST_TERMS)
+artist_hint_matcher = TermMatcher(ARTIST_HINT_TERMS)
+artist_name_in_title_matcher = TermMatcher(ARTIST_NAMES_IN_TITLES)
+
+
+def classify_web_entities(web_entities):
+    """Split Vision web entities into artwork and artist candidates
+
+    Returns (artwork_candidates, artist_candidates), each a list of
+    {'name', 'score', 'type'} dicts in web entity order.
+    """
+    artwork_candidates = []
+    artist_candidates = []
+
+    for entity in web_entities:
+        if entity.score <= 0.2:  # Low threshold to catch everything
+            continue
+        entity_desc = entity.description.lower()
+
+        is_famous_artwork = famous_artwork_matcher.matches(entity_desc)
+        is_famous_artist = famous_artist_matcher.matches(entity_desc)
+
+        if is_famous_artwork and not is_famous_artist:
+            artwork_candidates.append({'name': entity.description, 'score': entity.score, 'type': 'famous_artwork'})
+        elif is_famous_artist and not is_famous_artwork:
+            artist_candidates.append({'name': entity.description, 'score': entity.score, 'type': 'famous_artist'})
+        else:
+            is_generic = generic_term_matcher.matches(entity_desc)
+            is_artist = artist_term_matcher.matches(entity_desc)
+
+            # Only add to candidates if it's NOT generic and NOT clearly an artist
+            if not is_generic and not is_artist and entity.score > 0.4:
+                artwork_candidates.append({'name': entity.description, 'score': entity.score, 'type': 'unknown'})
+            elif is_artist and not is_generic and entity.score > 0.6:
+                artist_candidates.append({'name': entity.description, 'score': entity.score, 'type': 'generic_artist'})
+
+    return artwork_candidates, artist_candidates
@@ -0,0 +1,188 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+from flask import Response, abort
+
+from log_config import get_logger
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = get_logger(__name__)
+
+FRONTEND_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', 'frontend')
+
+# Images are already compressed, so only text assets get gzip/brotli variants
+COMPRESSIBLE_TYPES = ('text/html', 'text/css', 'text/javascript', 'application/javascript',
+                      'application/json', 'image/svg+xml', 'text/plain')
+MIN_COMPRESS_SIZE = 512
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year;
+# everything else is revalidated (a cheap 304) on each use
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# href="styles.css" / src="logo/1.png" style references rewritten in HTML pages
+ASSET_REFERENCE = re.compile(r'\b(href|src)="/?([\w./-]+)"')
+
+
+class Asset:
+    """One frontend file held in memory with its precompressed variants"""
+
+    def __init__(self, name, content, mtime):
+        self.name = name
+        self.mtime = mtime
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.digest = hashlib.sha256(content).hexdigest()[:16]
+        self.fingerprinted_name = fingerprint_name(name, self.digest[:10])
+        # encoding -> bytes; None is the identity encoding
+        self.variants = {None: content}
+        if self.mimetype.startswith(COMPRESSIBLE_TYPES) and len(content) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(content, quality=11)
+            self.variants['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+
+    def etag(self, encoding):
+        # Strong ETags must differ per encoding, since the bytes differ
+        return f"{self.digest}-{encoding}" if encoding else self.digest
+
+
+def fingerprint_name(name, fingerprint):
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{fingerprint}{extension}"
+
+
+class AssetPipeline:
+    """Serves frontend/ from memory with gzip/brotli variants, strong ETags and 304s
+
+    Every file is read and compressed once at startup. HTML pages have their
+    references to other assets rewritten to fingerprinted /assets/ URLs, which are
+    served as immutable. Files edited on disk are picked up within check_interval.
+    """
+
+    def __init__(self, directory=FRONTEND_DIRECTORY, url_prefix='/assets/', check_interval=2.0):
+        self.directory = os.path.abspath(directory)
+        self.url_prefix = url_prefix
+        self.check_interval = check_interval
+        self._assets = {}
+        self._fingerprinted = {}
+        self._mtimes = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.load_all()
+
+    def _scan(self):
+        mtimes = {}
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                mtimes[name] = os.stat(path).st_mtime_ns
+        return mtimes
+
+    def load_all(self):
+        start = time.perf_counter()
+        mtimes = self._scan()
+        contents = {}
+        for name in mtimes:
+            with open(os.path.join(self.directory, name), 'rb') as asset_file:
+                contents[name] = asset_file.read()
+
+        # Fingerprint everything else first, so pages can point at the final URLs
+        assets = {name: Asset(name, content, mtimes[name])
+                  for name, content in contents.items() if not name.endswith('.html')}
+        for name, content in contents.items():
+            if name.endswith('.html'):
+                html = self._rewrite_references(content.decode('utf-8'), assets)
+                assets[name] = Asset(name, html.encode('utf-8'), mtimes[name])
+
+        with self._lock:
+            self._assets = assets
+            self._fingerprinted = {asset.fingerprinted_name: asset for asset in assets.values()}
+            self._mtimes = mtimes
+            self._last_check = time.monotonic()
+        compressed = sum(len(asset.variants) > 1 for asset in assets.values())
+        logger.info("📦 Loaded %d frontend assets (%d precompressed, brotli %s) in %.0f ms",
+                    len(assets), compressed, 'on' if brotli else 'off', (time.perf_counter() - start) * 1000)
+
+    def _rewrite_references(self, html, assets):
+        def replace(match):
+            asset = assets.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f'{match.group(1)}="{self.url_prefix}{asset.fingerprinted_name}"'
+        return ASSET_REFERENCE.sub(replace, html)
+
+    def _reload_changed(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+        try:
+            changed = self._scan() != self._mtimes
+        except OSError as e:
+            logger.warning("⚠️ Could not check frontend assets: %s", e)
+            return
+        if changed:
+            logger.info("🔄 Frontend assets changed, reloading")
+            self.load_all()
+
+    def url_for(self, name):
+        """Fingerprinted URL for an asset, e.g. /assets/styles.1a2b3c4d5e.css"""
+        self._reload_changed()
+        asset = self._assets.get(name)
+        return self.url_prefix + asset.fingerprinted_name if asset else None
+
+    def response(self, name, request):
+        """Serve an asset by its plain name; browsers revalidate it on each use"""
+        self._reload_changed()
+        asset = self._assets.get(name)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, request, REVALIDATE_CACHE_CONTROL)
+
+    def fingerprinted_response(self, fingerprinted_name, request):
+        """Serve an asset by its fingerprinted name as immutable"""
+        self._reload_changed()
+        asset = self._fingerprinted.get(fingerprinted_name)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, request, IMMUTABLE_CACHE_CONTROL)
+
+    @staticmethod
+    def _respond(asset, request, cache_control):
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings[candidate] > 0:
+                encoding = candidate
+                break
+
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if len(asset.variants) > 1:
+            response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = cache_control
+        response.set_etag(asset.etag(encoding))
+        response.last_modified = asset.mtime / 1e9
+        # Answers If-None-Match / If-Modified-Since with a bodiless 304
+        return response.make_conditional(request)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'assets': len(self._assets),
+                'bytes': sum(len(asset.variants[None]) for asset in self._assets.values()),
+                'precompressed': sum(len(asset.variants) > 1 for asset in self._assets.values()),
+                'brotli': brotli is not None
+            }
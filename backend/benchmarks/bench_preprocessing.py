@@ -0,0 +1,167 @@
+"""Benchmark: Vision payload size and latency, original uploads vs downscaled re-encoded copies
+
+Run from the backend directory:
+    python benchmarks/bench_preprocessing.py [--fixtures DIR] [--vision] [--repeats 3]
+
+Without --vision only the local side is measured (payload bytes and preprocessing
+time). With --vision and real credentials in service-account-key.json, every
+fixture is annotated both ways to compare Vision latency and check that the
+labels and web entities still agree. If the fixture directory has an
+expected.json mapping file names to the subject in the photo (e.g.
+{"starry.jpg": "The Starry Night"}), the run also reports how often that
+subject is among the top web entities, for each variant.
+
+With no fixture images, synthetic phone-sized photos are generated, which is
+enough for payload numbers but not for the accuracy check.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_preprocessing import (  # noqa: E402
+    EXIF_ORIENTATION_TAG, VISION_JPEG_QUALITY, VISION_MAX_DIMENSION, Image, prepare_for_vision
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURES = os.path.join(BACKEND_DIR, 'benchmarks', 'fixtures')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+TOP_LABELS = 5
+
+
+def load_fixtures(directory):
+    if not os.path.isdir(directory):
+        return []
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(directory, filename), 'rb') as image_file:
+                fixtures.append((filename, image_file.read()))
+    return fixtures
+
+
+def synthetic_fixtures():
+    """Smooth random images at common phone resolutions, one tagged as rotated"""
+    fixtures = []
+    for name, size, image_format, orientation in [
+        ('synthetic_landscape.jpg', (4032, 3024), 'JPEG', 1),
+        ('synthetic_portrait_rotated.jpg', (4032, 3024), 'JPEG', 6),
+        ('synthetic_screenshot.png', (1170, 2532), 'PNG', 1),
+    ]:
+        channels = [Image.effect_noise((size[0] // 16, size[1] // 16), 80).resize(size, Image.BICUBIC) for _ in range(3)]
+        image = Image.merge('RGB', channels)
+        exif = Image.Exif()
+        if orientation != 1:
+            exif[EXIF_ORIENTATION_TAG] = orientation
+        output = io.BytesIO()
+        if image_format == 'JPEG':
+            image.save(output, format='JPEG', quality=92, exif=exif.tobytes())
+        else:
+            image.save(output, format='PNG')
+        fixtures.append((name, output.getvalue()))
+    return fixtures
+
+
+def time_call(fn, repeats):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def summarize(response):
+    labels = [label.description.lower() for label in response.label_annotations[:TOP_LABELS]]
+    entities = [entity.description.lower() for entity in response.web_detection.web_entities if entity.description]
+    return labels, entities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    parser.add_argument('--vision', action='store_true', help='also call Vision for latency and accuracy')
+    parser.add_argument('--analysis-type', default='artwork', choices=('artwork', 'food', 'architecture'))
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    if Image is None:
+        sys.exit("Pillow is not installed; preprocessing is disabled (pip install Pillow)")
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No images in {args.fixtures}, using synthetic photos (payload numbers only)")
+        fixtures = synthetic_fixtures()
+
+    print(f"max dimension {VISION_MAX_DIMENSION}px, JPEG quality {VISION_JPEG_QUALITY}")
+    print(f"{'image':34} {'original':>10} {'prepared':>10} {'saved':>6} {'prep ms':>8}")
+    prepared_fixtures = []
+    original_total = prepared_total = 0
+    for name, content in fixtures:
+        prepared, seconds = time_call(lambda: prepare_for_vision(content), args.repeats)
+        prepared_fixtures.append((name, content, prepared))
+        original_total += len(content)
+        prepared_total += len(prepared)
+        print(f"{name[:34]:34} {len(content) / 1024:9.0f}K {len(prepared) / 1024:9.0f}K "
+              f"{1 - len(prepared) / len(content):6.0%} {seconds * 1000:8.1f}")
+    print(f"{'total':34} {original_total / 1024:9.0f}K {prepared_total / 1024:9.0f}K "
+          f"{1 - prepared_total / original_total:6.0%}")
+
+    if not args.vision:
+        return
+
+    from vision_client import VisionClientManager
+    os.environ.setdefault('GOOGLE_APPLICATION_CREDENTIALS', os.path.join(BACKEND_DIR, 'service-account-key.json'))
+    vision = VisionClientManager(os.environ['GOOGLE_APPLICATION_CREDENTIALS'])
+    if not vision.credentials_configured:
+        sys.exit("Vision credentials are not configured; latency and accuracy need a real key")
+    vision.warm_up()
+
+    expected_path = os.path.join(args.fixtures, 'expected.json')
+    expected = {}
+    if os.path.exists(expected_path):
+        with open(expected_path, encoding='utf-8') as expected_file:
+            expected = {name: subject.lower() for name, subject in json.load(expected_file).items()}
+
+    original_latencies, prepared_latencies, label_overlaps = [], [], []
+    top_entity_matches = 0
+    expected_hits = {'original': 0, 'prepared': 0}
+    print(f"\n{'image':34} {'original ms':>12} {'prepared ms':>12} {'labels':>7} {'top entity':>11}")
+    for name, content, prepared in prepared_fixtures:
+        original_response, original_seconds = time_call(
+            lambda: vision.annotate(content, args.analysis_type), args.repeats)
+        prepared_response, prepared_seconds = time_call(
+            lambda: vision.annotate(prepared, args.analysis_type), args.repeats)
+        original_labels, original_entities = summarize(original_response)
+        prepared_labels, prepared_entities = summarize(prepared_response)
+
+        overlap = len(set(original_labels) & set(prepared_labels)) / max(len(set(original_labels) | set(prepared_labels)), 1)
+        same_top = original_entities[:1] == prepared_entities[:1]
+        original_latencies.append(original_seconds)
+        prepared_latencies.append(prepared_seconds)
+        label_overlaps.append(overlap)
+        top_entity_matches += same_top
+        if name in expected:
+            expected_hits['original'] += any(expected[name] in entity for entity in original_entities[:3])
+            expected_hits['prepared'] += any(expected[name] in entity for entity in prepared_entities[:3])
+        print(f"{name[:34]:34} {original_seconds * 1000:12.0f} {prepared_seconds * 1000:12.0f} "
+              f"{overlap:7.0%} {'same' if same_top else 'differs':>11}")
+
+    print(f"\nmedian Vision latency: original {statistics.median(original_latencies) * 1000:.0f} ms, "
+          f"prepared {statistics.median(prepared_latencies) * 1000:.0f} ms")
+    print(f"top-{TOP_LABELS} label agreement (mean Jaccard): {statistics.mean(label_overlaps):.0%}")
+    print(f"top web entity unchanged: {top_entity_matches}/{len(prepared_fixtures)}")
+    if expected:
+        print(f"expected subject in top 3 web entities: original {expected_hits['original']}/{len(expected)}, "
+              f"prepared {expected_hits['prepared']}/{len(expected)}")
+    vision.close()
+
+
+if __name__ == '__main__':
+    main()
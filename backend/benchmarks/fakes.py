@@ -0,0 +1,247 @@
+"""Local stand-ins for Vision, Gemini and Places, so the app can be load tested offline
+
+build_app() imports the real app and swaps in:
+- a fake Vision client (returned by the shared VisionClientManager),
+- a fake Gemini model (returned by agent.get_model()),
+- a local HTTP server answering Places findplacefromtext, which the real
+  PlacesClient calls over its real keep-alive session.
+Each fake sleeps for a lognormal latency and fails at a configurable rate, read
+from FAKE_* environment variables (see FakeOptions.from_env()).
+
+Serve the faked app with the development server:
+    python benchmarks/fakes.py [--port 5055]
+or under gunicorn, as in production:
+    gunicorn -c gunicorn.conf.py --pythonpath benchmarks 'fakes:build_app()'
+benchmarks/loadtest.py starts one of these for you.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import types
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from google.api_core import exceptions as google_exceptions  # noqa: E402
+
+
+class FakeOptions:
+    """Median latency (ms), lognormal spread and error rate of each fake service"""
+
+    def __init__(self, vision_ms=300, gemini_ms=1500, places_ms=150, sigma=0.4,
+                 vision_errors=0.0, gemini_errors=0.0, places_errors=0.0, stream_chunks=8):
+        self.vision = LatencyModel(vision_ms, sigma, vision_errors)
+        self.gemini = LatencyModel(gemini_ms, sigma, gemini_errors)
+        self.places = LatencyModel(places_ms, sigma, places_errors)
+        self.stream_chunks = stream_chunks
+
+    ENV = {
+        'vision_ms': 'FAKE_VISION_LATENCY_MS',
+        'gemini_ms': 'FAKE_GEMINI_LATENCY_MS',
+        'places_ms': 'FAKE_PLACES_LATENCY_MS',
+        'sigma': 'FAKE_LATENCY_SIGMA',
+        'vision_errors': 'FAKE_VISION_ERROR_RATE',
+        'gemini_errors': 'FAKE_GEMINI_ERROR_RATE',
+        'places_errors': 'FAKE_PLACES_ERROR_RATE',
+    }
+
+    @classmethod
+    def from_env(cls):
+        return cls(**{name: float(os.environ[variable]) for name, variable in cls.ENV.items() if variable in os.environ})
+
+    @classmethod
+    def to_env(cls, args):
+        """FAKE_* variables for the matching loadtest.py arguments"""
+        return {variable: str(getattr(args, name)) for name, variable in cls.ENV.items()}
+
+
+class LatencyModel:
+    """Lognormal latency around a median, plus a chance of failing after the wait"""
+
+    def __init__(self, median_ms, sigma, error_rate):
+        self.median = median_ms / 1000
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    def sample(self):
+        return self.median * math.exp(random.gauss(0, self.sigma)) if self.median > 0 else 0.0
+
+    def failed(self):
+        return random.random() < self.error_rate
+
+    def wait(self, service):
+        time.sleep(self.sample())
+        if self.failed():
+            raise google_exceptions.ServiceUnavailable(f"fake {service} error")
+
+
+# (label, score) and (web entity, score) in the shape of a real response. Every
+# analysis type requests the same features, so one answer serves all three.
+# {id} is filled in per call: the app only calls Vision for images missing from
+# its analysis cache, and each new image should be a new subject for Gemini.
+VISION_LABELS = [("Pizza {id}", 0.96), ("Painting", 0.95), ("Art", 0.9), ("Building", 0.88), ("Landmark", 0.8)]
+VISION_WEB_ENTITIES = [("The Starry Night {id}", 0.92), ("Vincent van Gogh", 0.81), ("Eiffel Tower {id}", 0.7),
+                       ("Post-Impressionism", 0.6)]
+
+
+class FakeVisionClient:
+    """Answers annotate_image() with canned labels and web entities after a simulated delay"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.transport = types.SimpleNamespace(close=lambda: None)
+
+    def annotate_image(self, request):
+        from google.cloud import vision
+
+        self.latency.wait("Vision")
+        subject_id = uuid.uuid4().hex[:8]
+        return vision.AnnotateImageResponse(
+            label_annotations=[vision.EntityAnnotation(description=description.format(id=subject_id), score=score)
+                               for description, score in VISION_LABELS],
+            web_detection=vision.WebDetection(web_entities=[
+                vision.WebDetection.WebEntity(description=description.format(id=subject_id), score=score)
+                for description, score in VISION_WEB_ENTITIES
+            ])
+        )
+
+
+DETAILS_PARAGRAPH = (
+    "This is a stand-in description produced by the load-test fake. It is long enough to look like "
+    "a real answer: a few paragraphs on history, context and style, with the occasional **bold** "
+    "heading and a list of points, so that serialization and streaming do realistic work.\n\n"
+)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.parts = [text] if text else []
+
+
+class FakeGenerativeModel:
+    """generate_content() with canned text, JSON suggestion rows and chunked streaming"""
+
+    def __init__(self, latency, stream_chunks=8):
+        self.latency = latency
+        self.stream_chunks = stream_chunks
+
+    def generate_content(self, prompt, generation_config=None, stream=False, request_options=None):
+        text = self._response_text(generation_config)
+        if stream:
+            return self._stream(text)
+        self.latency.wait("Gemini")
+        return FakeResponse(text)
+
+    def _stream(self, text):
+        total = self.latency.sample()
+        chunk_size = math.ceil(len(text) / self.stream_chunks)
+        for start in range(0, len(text), chunk_size):
+            time.sleep(total / self.stream_chunks)
+            yield FakeResponse(text[start:start + chunk_size])
+        if self.latency.failed():
+            raise google_exceptions.ServiceUnavailable("fake Gemini error")
+
+    @staticmethod
+    def _response_text(generation_config):
+        from agent import SINGLE_SHOT_CONFIG, SUGGESTION_CONFIGS, SUGGESTION_COUNT
+
+        # Unique names, so Places lookups miss its cache like new suggestions would
+        rows = [[f"Fake suggestion {uuid.uuid4().hex[:10]}", "Florence, Italy", "Renaissance", "Unknown",
+                 "https://en.wikipedia.org/wiki/Renaissance"] for _ in range(SUGGESTION_COUNT)]
+        if generation_config is SINGLE_SHOT_CONFIG:
+            return json.dumps({"themes": DETAILS_PARAGRAPH, "suggestions": rows})
+        if any(generation_config is config for config in SUGGESTION_CONFIGS.values()):
+            return json.dumps(rows)
+        return DETAILS_PARAGRAPH * 4
+
+
+class FakePlacesServer:
+    """findplacefromtext on 127.0.0.1, one thread per connection like a real HTTP backend"""
+
+    def __init__(self, latency, port=0):
+        latency_model = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, as with the real endpoint
+
+            def do_GET(self):
+                time.sleep(latency_model.sample())
+                if latency_model.failed():
+                    self._send(503, {"status": "UNKNOWN_ERROR"})
+                    return
+                place_id = "fake-" + hashlib.sha256(self.path.encode()).hexdigest()[:16]
+                self._send(200, {"candidates": [{"place_id": place_id, "rating": 4.4}], "status": "OK"})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/maps/api/place/findplacefromtext/json"
+        threading.Thread(target=self.server.serve_forever, name='fake-places', daemon=True).start()
+
+
+def install_config_stand_in():
+    """The app reads API keys from config.py; offline runs do not need real ones"""
+    try:
+        import config  # noqa: F401
+    except ImportError:
+        sys.modules['config'] = types.SimpleNamespace(
+            google_api_key='fake-key', google_places_api_key='fake-places-key', model_name='fake-model')
+
+
+def build_app(options=None):
+    """The real Flask app with every external service replaced by a local fake"""
+    options = options or FakeOptions.from_env()
+    install_config_stand_in()
+
+    import agent
+    import app as app_module
+    import places
+
+    places_server = FakePlacesServer(options.places)
+    places.FIND_PLACE_URL = places_server.url
+    original_places_client = places.PlacesClient.__init__
+
+    def places_client_init(self, *args, **kwargs):
+        original_places_client(self, *args, **kwargs)
+        # Same pooled, retrying adapter the real client mounts for https://
+        self.session.mount("http://", self.session.get_adapter("https://"))
+
+    places.PlacesClient.__init__ = places_client_init
+
+    model = FakeGenerativeModel(options.gemini, options.stream_chunks)
+    agent.get_model = lambda: model
+
+    vision_clients = app_module.vision_clients
+    vision_clients.credentials_configured = True
+    vision_clients._create_client = lambda: FakeVisionClient(options.vision)
+    return app_module.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+    build_app().run(host='127.0.0.1', port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""Load test: the upload, details, suggestions and analyze routes against local fakes of Vision, Gemini and Places
+
+Run from the backend directory:
+    python benchmarks/loadtest.py [--server dev|gunicorn] [--concurrency 1,16] [--duration 10]
+                                  [--scenarios upload,food_suggestions] [--json results.json]
+                                  [--baseline results.json --max-regression 0.2]
+
+Starts the app in a subprocess with every Google API replaced by the fakes in
+benchmarks/fakes.py, each with a lognormal latency (--vision-ms, --gemini-ms,
+--places-ms, spread --sigma) and an error rate (--vision-errors, ...). Each
+scenario is then driven by N closed-loop clients for --duration seconds per
+concurrency level, and p50/p95/p99 latency, errors and requests per second are
+reported. Every request uses a new subject name and new image bytes, so caches
+miss as they would for new content; --repeat-subjects measures the cached path.
+--url targets an already running faked server instead (fakes.py or gunicorn).
+
+With --baseline, the run exits with status 1 when any scenario's p95 rose or its
+throughput fell by more than --max-regression compared to that earlier --json.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import BACKEND_DIR, FakeOptions  # noqa: E402
+
+BENCHMARKS_DIR = os.path.join(BACKEND_DIR, 'benchmarks')
+
+# name -> (method, path); {subject} is filled in per request
+SCENARIOS = {
+    'upload': ('POST', '/upload'),
+    'upload_food': ('POST', '/upload_food'),
+    'upload_architecture': ('POST', '/upload_architecture'),
+    'details': ('GET', '/get_themes/{subject}'),
+    'food_details': ('GET', '/get_food_details/{subject}'),
+    'architecture_details': ('GET', '/get_architecture_details/{subject}'),
+    'suggestions': ('GET', '/get_suggestions/{subject}'),
+    'food_suggestions': ('GET', '/get_food_suggestions/{subject}?location=New York'),
+    'architecture_suggestions': ('GET', '/get_architecture_suggestions/{subject}'),
+    'analyze': ('POST', '/analyze/artwork'),
+    'analyze_food': ('POST', '/analyze/food?location=New York'),
+    'analyze_architecture': ('POST', '/analyze/architecture'),
+}
+SUBJECTS = {'details': 'Mona Lisa', 'suggestions': 'Mona Lisa', 'food_details': 'Margherita Pizza',
+            'food_suggestions': 'Margherita Pizza', 'architecture_details': 'Eiffel Tower',
+            'architecture_suggestions': 'Eiffel Tower'}
+READY_TIMEOUT = 60
+
+
+def make_image(size):
+    from PIL import Image
+
+    width, height = size
+    channels = [Image.effect_noise((max(width // 16, 1), max(height // 16, 1)), 80).resize(size, Image.BICUBIC)
+                for _ in range(3)]
+    output = io.BytesIO()
+    Image.merge('RGB', channels).save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+class RequestFactory:
+    """Builds each scenario's requests, with fresh subjects and image bytes unless repeating"""
+
+    def __init__(self, image, repeat_subjects):
+        self.image = image
+        self.repeat_subjects = repeat_subjects
+        self._counter = itertools.count()
+        self._run = os.urandom(4).hex()  # keeps names unique across runs sharing a cache
+
+    def __call__(self, scenario):
+        method, path = SCENARIOS[scenario]
+        unique = '' if self.repeat_subjects else f" {self._run}-{next(self._counter)}"
+        if method == 'POST':
+            # Bytes after the JPEG end marker change the cache key but not the decoded image
+            content = self.image + unique.encode()
+            return method, path, {'files': {'files': ('loadtest.jpg', content, 'image/jpeg')}}
+        return method, path.format(subject=SUBJECTS[scenario] + unique), {}
+
+
+def run_level(base_url, scenario, concurrency, duration, factory):
+    """N clients each sending requests back to back for duration seconds"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            method, path, kwargs = factory(scenario)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, timeout=120, **kwargs)
+                ok = response.ok and not (response.headers.get('Content-Type', '').startswith('application/json')
+                                          and response.json().get('success') is False)
+                error = None if ok else f"HTTP {response.status_code}"
+            except (requests.RequestException, ValueError) as e:
+                error = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if error:
+                    errors.append(error)
+        session.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return summarize(scenario, concurrency, latencies, errors, wall)
+
+
+def summarize(scenario, concurrency, latencies, errors, wall):
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_kinds': sorted(set(errors)),
+        'rps': len(latencies) / wall if wall else 0.0,
+        'p50_ms': p50 * 1000,
+        'p95_ms': p95 * 1000,
+        'p99_ms': p99 * 1000,
+        'max_ms': max(latencies, default=0.0) * 1000,
+    }
+
+
+def print_result(result):
+    print(f"{result['scenario']:25} {result['concurrency']:5} {result['requests']:9} {result['errors']:7} "
+          f"{result['rps']:8.1f} {result['p50_ms']:9.0f} {result['p95_ms']:9.0f} {result['p99_ms']:9.0f}"
+          + (f"  {', '.join(result['error_kinds'])}" if result['error_kinds'] else ''))
+
+
+def compare(results, baseline, max_regression):
+    """(number of results compared, regressions against an earlier run as printable lines)"""
+    previous = {(result['scenario'], result['concurrency']): result for result in baseline['results']}
+    compared = 0
+    regressions = []
+    for result in results:
+        before = previous.get((result['scenario'], result['concurrency']))
+        if before is None:
+            continue
+        compared += 1
+        label = f"{result['scenario']} at concurrency {result['concurrency']}"
+        if before['p95_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + max_regression):
+            regressions.append(f"{label}: p95 {before['p95_ms']:.0f} -> {result['p95_ms']:.0f} ms")
+        if before['rps'] and result['rps'] < before['rps'] * (1 - max_regression):
+            regressions.append(f"{label}: {before['rps']:.1f} -> {result['rps']:.1f} req/s")
+    return compared, regressions
+
+
+class FakeServer:
+    """The faked app in a subprocess, with its caches and uploads in a temporary directory"""
+
+    def __init__(self, kind, port, args):
+        self.directory = tempfile.mkdtemp(prefix='loadtest-')
+        self.url = f"http://127.0.0.1:{port}"
+        env = dict(os.environ, **FakeOptions.to_env(args))
+        env.update({
+            'PYTHONPATH': os.pathsep.join([BACKEND_DIR, BENCHMARKS_DIR, env.get('PYTHONPATH', '')]),
+            'LLM_CACHE_DB': os.path.join(self.directory, 'llm.sqlite3'),
+            'PLACES_CACHE_DB': os.path.join(self.directory, 'places.sqlite3'),
+            'JOB_DB': os.path.join(self.directory, 'jobs.sqlite3'),
+            'METRICS_DB': os.path.join(self.directory, 'metrics.sqlite3'),
+            # Failed requests are counted in the results; set LOG_LEVEL to see why they failed
+            'LOG_LEVEL': env.get('LOG_LEVEL', 'CRITICAL'),
+            # The development server logs every request otherwise
+            'LOG_LEVELS': env.get('LOG_LEVELS', 'werkzeug=WARNING'),
+            'WEB_ACCESS_LOG': env.get('WEB_ACCESS_LOG', '/dev/null'),
+        })
+        if kind == 'gunicorn':
+            command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'),
+                       '-b', f"127.0.0.1:{port}", '--log-level', 'warning', 'fakes:build_app()']
+        else:
+            command = [sys.executable, os.path.join(BENCHMARKS_DIR, 'fakes.py'), '--port', str(port)]
+        # Uploads are written relative to the working directory
+        self.process = subprocess.Popen(command, cwd=self.directory, env=env)
+
+    def wait_until_ready(self):
+        deadline = time.monotonic() + READY_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with status {self.process.returncode}")
+            try:
+                if requests.get(self.url + '/ready', timeout=1).ok:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"server not ready after {READY_TIMEOUT}s")
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', default='dev', choices=('dev', 'gunicorn'),
+                        help='development server or gunicorn with gunicorn.conf.py (WEB_CONCURRENCY, WEB_THREADS)')
+    parser.add_argument('--url', help='use an already running faked server instead of starting one')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument('--concurrency', default='1,16', help='comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario and concurrency level')
+    parser.add_argument('--repeat-subjects', action='store_true', help='reuse subjects and images (cache hits)')
+    parser.add_argument('--image-size', default='1600x1200', help='WIDTHxHEIGHT of the uploaded JPEG')
+    parser.add_argument('--vision-ms', type=float, default=300, help='median fake Vision latency')
+    parser.add_argument('--gemini-ms', type=float, default=1500, help='median fake Gemini latency')
+    parser.add_argument('--places-ms', type=float, default=150, help='median fake Places latency')
+    parser.add_argument('--sigma', type=float, default=0.4, help='lognormal spread of every fake latency')
+    parser.add_argument('--vision-errors', type=float, default=0.0, help='fraction of fake Vision calls that fail')
+    parser.add_argument('--gemini-errors', type=float, default=0.0, help='fraction of fake Gemini calls that fail')
+    parser.add_argument('--places-errors', type=float, default=0.0, help='fraction of fake Places calls that fail')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='results file of an earlier run to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='allowed p95 rise / throughput drop')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)}")
+    levels = [int(level) for level in args.concurrency.split(',')]
+    width, height = (int(part) for part in args.image_size.lower().split('x'))
+    factory = RequestFactory(make_image((width, height)), args.repeat_subjects)
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        server = FakeServer(args.server, args.port, args)
+        base_url = server.url
+    try:
+        if server:
+            server.wait_until_ready()
+        print(f"fakes: Vision {args.vision_ms:.0f} ms, Gemini {args.gemini_ms:.0f} ms, Places {args.places_ms:.0f} ms "
+              f"(sigma {args.sigma}); errors {args.vision_errors}/{args.gemini_errors}/{args.places_errors}")
+        print(f"{'scenario':25} {'conc':>5} {'requests':>9} {'errors':>7} {'req/s':>8} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        results = []
+        for scenario in scenarios:
+            for concurrency in levels:
+                result = run_level(base_url, scenario, concurrency, args.duration, factory)
+                print_result(result)
+                results.append(result)
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as results_file:
+            json.dump({'arguments': vars(args), 'results': results}, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            compared, regressions = compare(results, json.load(baseline_file), args.max_regression)
+        if regressions:
+            print(f"\nRegressions over {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.max_regression:.0%} in {compared} results compared with {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
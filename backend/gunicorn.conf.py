@@ -0,0 +1,52 @@
+"""gunicorn settings for the production entry point (gunicorn -c gunicorn.conf.py wsgi:app)
+
+The work is almost all waiting on Vision, Gemini and Places, so each process runs
+many threads. Add processes with WEB_CONCURRENCY for CPU headroom (image
+preprocessing, JSON). Per-process state (in-memory caches, single-flight,
+upload index) is not shared between workers; async job state is, through SQLite.
+"""
+import os
+import signal
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 16))
+
+# Load the app once in the master so workers fork with it already in memory
+preload_app = True
+
+# Streams (SSE) and uploads can run for a while; the worker heartbeat is separate
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+
+# Set WEB_MAX_REQUESTS to recycle workers now and then (0 keeps them running)
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-')
+
+
+def post_worker_init(worker):
+    """Connect this worker's Vision channel, and report not-ready as soon as shutdown starts"""
+    from app import begin_shutdown, vision_clients
+
+    vision_clients.warm_up()
+
+    handle_exit = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        # /ready answers 503 from here on while in-flight requests finish
+        begin_shutdown()
+        handle_exit(sig, frame)
+
+    # SIGTERM is gunicorn's graceful stop; INT and QUIT stay immediate
+    signal.signal(signal.SIGTERM, drain_then_exit)
+
+
+def worker_exit(server, worker):
+    # atexit handlers also run, but close the channel explicitly in case the worker is torn down
+    from app import vision_clients
+
+    vision_clients.close()
@@ -0,0 +1,76 @@
+import io
+import os
+
+from log_config import get_logger
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it images go to Vision unchanged
+    Image = None
+    ImageOps = None
+
+logger = get_logger(__name__)
+
+# Label and web detection do not need phone-camera resolution, so uploads are
+# shrunk to fit VISION_MAX_DIMENSION pixels and re-encoded as JPEG before annotation.
+# VISION_MAX_DIMENSION=0 turns preprocessing off.
+VISION_MAX_DIMENSION = int(os.environ.get('VISION_MAX_DIMENSION', 1600))
+VISION_JPEG_QUALITY = int(os.environ.get('VISION_JPEG_QUALITY', 85))
+
+# EXIF orientation values that mean the pixels are stored rotated or mirrored
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def preprocessing_enabled():
+    return Image is not None and VISION_MAX_DIMENSION > 0
+
+
+def prepare_for_vision(content, max_dimension=None, quality=None):
+    """Return the image bytes to send to Vision
+
+    Decodes the upload, applies its EXIF orientation, downsizes it to fit
+    max_dimension and re-encodes it as JPEG. The original bytes are returned
+    when Pillow is missing, the image cannot be decoded, it is animated, or the
+    result would not be any smaller for an image that needed no rotation.
+    """
+    max_dimension = VISION_MAX_DIMENSION if max_dimension is None else max_dimension
+    quality = VISION_JPEG_QUALITY if quality is None else quality
+    if Image is None or max_dimension <= 0:
+        return content
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if getattr(image, 'is_animated', False):
+                return content
+            rotated = image.getexif().get(EXIF_ORIENTATION_TAG, 1) != 1
+            resized = max(image.size) > max_dimension
+            if not rotated and not resized and image.format == 'JPEG':
+                return content
+
+            # Shrink before rotating: on a not-yet-decoded JPEG, thumbnail() lets the
+            # decoder skip to a reduced scale instead of decoding every pixel
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            prepared = _flatten(ImageOps.exif_transpose(image))
+
+            output = io.BytesIO()
+            prepared.save(output, format='JPEG', quality=quality)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning("⚠️ Could not preprocess image, sending original: %s", e)
+        return content
+
+    encoded = output.getvalue()
+    if len(encoded) >= len(content) and not rotated:
+        return content
+    return encoded
+
+
+def _flatten(image):
+    """JPEG has no alpha channel, so transparent images are composited onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
@@ -0,0 +1,178 @@
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+FINISHED_STATUSES = ('done', 'failed')
+
+
+class Job:
+    """One background task and its state, as reported by /jobs/<id>"""
+
+    def __init__(self, kind, on_change=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.version = 0  # bumped on every update so watchers can wait for the next one
+        self._changed = threading.Condition()
+        self._on_change = on_change
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    def update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+        if self._on_change:
+            self._on_change(self)
+
+    def wait_for_change(self, version, timeout):
+        """Block until the job moves past version or timeout passes; returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def to_dict(self):
+        with self._changed:
+            data = {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'progress': self.progress,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+            if self.status == 'done':
+                data['result'] = self.result
+            elif self.status == 'failed':
+                data['error'] = self.error
+            return data
+
+
+class StoredJob:
+    """Read-only view of a job running in another worker process, polled from the shared store"""
+
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, job_id, store, state):
+        self.id = job_id
+        self.version = 0
+        self._store = store
+        self._state = state
+
+    @property
+    def finished(self):
+        return self._state['status'] in FINISHED_STATUSES
+
+    def _refresh(self):
+        try:
+            state = self._store.get(self.id)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Could not read job %s: %s", self.id, e)
+            return
+        if state is not None and state != self._state:
+            self._state = state
+            self.version += 1
+
+    def wait_for_change(self, version, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            self._refresh()
+            remaining = deadline - time.monotonic()
+            if self.version != version or remaining <= 0:
+                return self.version
+            time.sleep(min(self.POLL_INTERVAL, remaining))
+
+    def to_dict(self):
+        self._refresh()
+        return dict(self._state)
+
+
+class JobManager:
+    """Runs jobs on a bounded pool and keeps finished ones around for a while to be collected
+
+    With a store (e.g. a SQLiteCache shared by every worker process), each job's
+    state is also written there on every update, so any worker can answer
+    /jobs/<id> for a job another worker is running.
+    """
+
+    def __init__(self, max_workers=4, ttl=600, max_jobs=1000, store=None):
+        self.ttl = ttl
+        self.store = store
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jobs')
+
+    def submit(self, kind, fn):
+        """Run fn(job) in the background; its return value becomes the job's result"""
+        job = Job(kind, on_change=self._persist if self.store is not None else None)
+        self._persist(job)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        job.update(status='running')
+        try:
+            result = fn(job)
+        except Exception as e:
+            logger.exception("❌ Job %s (%s) failed: %s", job.id, job.kind, e)
+            job.update(status='failed', error=str(e), finished_at=time.time())
+        else:
+            job.update(status='done', result=result, finished_at=time.time())
+
+    def _persist(self, job):
+        if self.store is None:
+            return
+        try:
+            self.store.set(job.id, job.to_dict(), self.ttl)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("⚠️ Could not store job %s: %s", job.id, e)
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        if job is not None or self.store is None:
+            return job
+        try:
+            state = self.store.get(job_id)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Could not read job %s: %s", job_id, e)
+            return None
+        return StoredJob(job_id, self.store, state) if state is not None else None
+
+    def _prune(self):
+        # Finished jobs expire after ttl; past max_jobs the oldest finished ones go first
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and (now - job.finished_at > self.ttl or len(self._jobs) > self.max_jobs):
+                del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
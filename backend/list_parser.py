@@ -0,0 +1,84 @@
+import ast
+import json
+
+OPENERS = {'[': ']', '{': '}'}
+CLOSERS = {']', '}'}
+QUOTES = {'"', "'"}
+
+
+def parse_item(text):
+    """Parse one list/object literal from model output, JSON first, then Python syntax"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+class IncrementalListParser:
+    """Pulls complete suggestion rows out of model text as it streams in
+
+    A row is a bracketed list or object that contains no nested list/object,
+    e.g. each ["name", "city", ...] inside the outer list. That holds whether the
+    model wraps the rows in an outer list or (as some prompts show) not, and
+    whatever code fence surrounds them. Rows that do not parse are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._stack = []  # [start offset, has nested group] per open bracket
+        self._quote = None
+        self._escaped = False
+
+    def feed(self, text):
+        """Add streamed text; return the rows completed by it, in order"""
+        self._buffer += text
+        rows = []
+        buffer = self._buffer
+        for index in range(self._position, len(buffer)):
+            char = buffer[index]
+            if self._quote:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+            elif char in QUOTES and self._stack:
+                self._quote = char
+            elif char in OPENERS:
+                if self._stack:
+                    self._stack[-1][1] = True
+                self._stack.append([index, False])
+            elif char in CLOSERS and self._stack:
+                start, has_nested = self._stack.pop()
+                if not has_nested:
+                    row = parse_item(buffer[start:index + 1])
+                    if row is not None:
+                        rows.append(row)
+        self._position = len(buffer)
+        return rows
+
+
+def parse_rows(text):
+    """All rows in a complete model response"""
+    return IncrementalListParser().feed(text)
+
+
+def parse_suggestion_rows(text):
+    """Rows of a suggestions response: strict JSON when it is well formed, salvaged rows when not
+
+    Schema-constrained output is normally a clean JSON array of arrays. If it
+    was cut off or has a broken row, the rows that did complete are kept.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return parse_rows(text)
+    if isinstance(data, list):
+        return [row for row in data if isinstance(row, (list, dict))]
+    return parse_rows(text)
@@ -0,0 +1,144 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+# LOG_LEVEL sets the default level; LOG_LEVELS overrides it per module, e.g.
+# "app=WARNING,agent=DEBUG,places=ERROR" (use OFF to silence a module).
+# Records at or below LOG_SAMPLE_LEVEL are kept with probability LOG_SAMPLE_RATE,
+# so per-label / per-entity chatter can stay on in production at a fraction of the cost.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # "text" or "json"
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+LOG_SAMPLE_LEVEL = os.environ.get('LOG_SAMPLE_LEVEL', 'DEBUG').upper()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+OFF = logging.CRITICAL + 10
+
+# LogRecord attributes that are not extra= fields
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including any extra= fields passed to the log call"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for name, value in vars(record).items():
+            if name not in RECORD_ATTRIBUTES and not name.startswith('_'):
+                data[name] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a random fraction of low-level records; higher levels always pass"""
+
+    def __init__(self, rate, max_level):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or self.rate >= 1 or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped and counted"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # The queue stays in this process, so formatting is left to the writer thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def parse_level(name):
+    name = name.strip().upper()
+    if name == 'OFF':
+        return OFF
+    level = logging.getLevelName(name)
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {name}")
+    return level
+
+
+def parse_module_levels(spec):
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        module, _, level = item.partition('=')
+        levels[module.strip()] = parse_level(level)
+    return levels
+
+
+_listener = None
+_queue_handler = None
+_output_handler = None
+_lock = threading.Lock()
+
+
+def _start_listener():
+    """Fresh queue and writer thread for this process; also used in a forked child"""
+    global _listener
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, _output_handler, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging():
+    """Route every logger through a non-blocking queue to one stdout writer thread (idempotent)"""
+    global _queue_handler, _output_handler
+    with _lock:
+        if _queue_handler is not None:
+            return
+        _output_handler = logging.StreamHandler(sys.stdout)
+        _output_handler.setFormatter(JSONFormatter() if LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT))
+
+        _queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        if LOG_SAMPLE_RATE < 1:
+            _queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE, parse_level(LOG_SAMPLE_LEVEL)))
+
+        root = logging.getLogger()
+        root.handlers = [_queue_handler]
+        root.setLevel(parse_level(LOG_LEVEL))
+        for module, level in parse_module_levels(LOG_LEVELS).items():
+            logging.getLogger(module).setLevel(level)
+
+        _start_listener()
+        # The writer thread does not survive fork(), so a forked worker starts its own
+        os.register_at_fork(after_in_child=_start_listener)
+        atexit.register(_stop_listener)
+
+
+def get_logger(name):
+    configure_logging()
+    return logging.getLogger(name)
+
+
+def log_stats():
+    return {'dropped': DroppingQueueHandler.dropped}
@@ -0,0 +1,247 @@
+import atexit
+import bisect
+import os
+import sqlite3
+import threading
+import time
+
+from cache import SQLiteCache
+from log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Each worker process keeps its own counters and, every METRICS_PUBLISH_INTERVAL
+# seconds, writes a snapshot of them to METRICS_DB. /metrics adds up the snapshots
+# of every worker, so a scrape answered by any one of them covers the whole server.
+# METRICS_PUBLISH_INTERVAL=0 reports only the answering process.
+METRICS_DB = os.environ.get('METRICS_DB', os.path.join(os.path.dirname(__file__), 'cache', 'metrics.sqlite3'))
+METRICS_PUBLISH_INTERVAL = float(os.environ.get('METRICS_PUBLISH_INTERVAL', 5))
+# Snapshots of workers that stopped publishing are dropped after this long
+SNAPSHOT_TTL = 24 * 3600
+
+METRIC_PREFIX = 'travelbuddy_'
+# Upper bounds in seconds; the spread covers both a template render and a slow Gemini call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_HISTOGRAM = 'stage_duration_seconds'
+STAGE_ERRORS = 'stage_errors_total'
+METRIC_HELP = {
+    STAGE_HISTOGRAM: 'Time spent in each stage of handling a request',
+    STAGE_ERRORS: 'Stage runs that raised an exception',
+    'cache_lookups_total': 'Server-side cache lookups by result',
+    'llm_coalesced_total': 'Gemini requests answered by an identical in-flight one',
+    'uploads_evicted_total': 'Uploaded images deleted to stay within the store quotas',
+    'log_records_dropped_total': 'Log records dropped because the log queue was full',
+    'upstream_calls_total': 'Calls to Gemini or Places, hedges not counted',
+    'upstream_failures_total': 'Upstream calls that failed or ran past their deadline',
+    'upstream_timeouts_total': 'Upstream calls that ran past their deadline',
+    'upstream_hedges_total': 'Duplicate requests sent for calls slower than their recent p95',
+    'upstream_hedge_wins_total': 'Hedged calls answered by the duplicate first',
+    'upstream_rejected_total': 'Calls failed fast because the upstream circuit was open',
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class _StageTimer:
+    """with metrics.time(stage): records the duration, and an error if the block raises"""
+
+    __slots__ = ('registry', 'key', 'start')
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # GeneratorExit and KeyboardInterrupt are not failures of the stage
+        failed = exc_type is not None and issubclass(exc_type, Exception)
+        self.registry._record(self.key, time.perf_counter() - self.start, failed)
+        return False
+
+
+class MetricsRegistry:
+    """Per-stage latency histograms and error counters, rendered in the Prometheus text format
+
+    Stages are timed with time(stage, **labels), or observe() for a duration
+    measured by hand. Counters owned by other objects (cache hit counts and so
+    on) are read at snapshot time from functions added with add_collector().
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, store=None, publish_interval=0):
+        self.buckets = tuple(buckets)
+        self.store = store
+        self.publish_interval = publish_interval
+        self._histograms = {}  # (stage, sorted label items) -> Histogram
+        self._errors = {}  # same key -> count
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._publisher_pid = None
+
+    @staticmethod
+    def _key(stage, labels):
+        return (stage, tuple(sorted(labels.items()))) if labels else (stage, ())
+
+    def time(self, stage, **labels):
+        return _StageTimer(self, self._key(stage, labels))
+
+    def time_iter(self, stage, open_iterable, **labels):
+        """Yield from the iterable returned by open_iterable(), e.g. a streaming response
+
+        Only opening it and waiting for each item count towards the stage; the
+        caller's work between items does not.
+        """
+        key = self._key(stage, labels)
+        waited = 0.0
+        failed = False
+        try:
+            start = time.perf_counter()
+            try:
+                iterator = iter(open_iterable())
+            finally:
+                waited += time.perf_counter() - start
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    waited += time.perf_counter() - start
+                yield item
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._record(key, waited, failed)
+
+    def observe(self, stage, seconds, error=False, **labels):
+        self._record(self._key(stage, labels), seconds, error)
+
+    def _record(self, key, seconds, error):
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+        self._ensure_publisher()
+
+    def add_collector(self, collect):
+        """collect() returns [(counter name, labels dict, value)], read on every snapshot"""
+        self._collectors.append(collect)
+
+    def snapshot(self):
+        """This process's metrics as JSON-friendly lists, so snapshots can be stored and summed"""
+        with self._lock:
+            histograms = [[stage, dict(labels), list(histogram.counts), histogram.sum]
+                          for (stage, labels), histogram in self._histograms.items()]
+            counters = [[STAGE_ERRORS, dict(labels, stage=stage), count]
+                        for (stage, labels), count in self._errors.items()]
+        for collect in self._collectors:
+            try:
+                counters.extend([name, labels, value] for name, labels, value in collect())
+            except Exception as e:
+                logger.warning("⚠️ Metrics collector failed: %s", e)
+        return {'buckets': list(self.buckets), 'histograms': histograms, 'counters': counters}
+
+    def _ensure_publisher(self):
+        # Started on first use in each process, like the upload evictor: threads do not survive fork()
+        if self.store is None or self.publish_interval <= 0 or self._publisher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._publisher_pid == os.getpid():
+                return
+            self._publisher_pid = os.getpid()
+        threading.Thread(target=self._publish_loop, name='metrics-publisher', daemon=True).start()
+        atexit.register(self.publish)
+
+    def _publish_loop(self):
+        while True:
+            time.sleep(self.publish_interval)
+            self.publish()
+
+    def publish(self):
+        try:
+            self.store.set(str(os.getpid()), self.snapshot(), SNAPSHOT_TTL)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Could not publish metrics: %s", e)
+
+    def _snapshots(self):
+        """This process's live snapshot plus the last one published by every other worker"""
+        snapshots = [self.snapshot()]
+        if self.store is None or self.publish_interval <= 0:
+            return snapshots
+        own_key = str(os.getpid())
+        try:
+            snapshots += [snapshot for key, snapshot in self.store.items() if key != own_key]
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Could not read worker metrics: %s", e)
+        return snapshots
+
+    def render(self):
+        """Every worker's metrics, summed, in the Prometheus text exposition format"""
+        histograms = {}
+        counters = {}
+        for snapshot in self._snapshots():
+            if snapshot['buckets'] != list(self.buckets):
+                continue  # published by a process with other buckets, e.g. before a deploy
+            for stage, labels, counts, total in snapshot['histograms']:
+                key = self._key(stage, labels)
+                merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+            for name, labels, value in snapshot['counters']:
+                key = self._key(name, labels)
+                counters[key] = counters.get(key, 0) + value
+
+        name = METRIC_PREFIX + STAGE_HISTOGRAM
+        lines = [f"# HELP {name} {METRIC_HELP[STAGE_HISTOGRAM]}", f"# TYPE {name} histogram"]
+        for (stage, labels), (counts, total) in sorted(histograms.items()):
+            base = (('stage', stage),) + labels
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(base + (('le', format_bound(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(base)} {total:.6f}")
+            lines.append(f"{name}_count{format_labels(base)} {cumulative}")
+
+        for counter_name in sorted({key[0] for key in counters}):
+            name = METRIC_PREFIX + counter_name
+            lines.append(f"# HELP {name} {METRIC_HELP.get(counter_name, counter_name)}")
+            lines.append(f"# TYPE {name} counter")
+            for (_, labels), value in sorted(item for item in counters.items() if item[0][0] == counter_name):
+                lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+metrics = MetricsRegistry(
+    store=SQLiteCache(METRICS_DB, max_entries=1000, ttl=SNAPSHOT_TTL) if METRICS_PUBLISH_INTERVAL > 0 else None,
+    publish_interval=METRICS_PUBLISH_INTERVAL
+)
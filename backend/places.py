@@ -0,0 +1,131 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cache import create_cache
+from log_config import get_logger
+from metrics import metrics
+from resilience import CircuitOpenError, DeadlineExceeded, Upstream
+
+logger = get_logger(__name__)
+
+FIND_PLACE_URL = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
+PLACE_FIELDS = "place_id,name,formatted_address,rating"
+
+PLACES_CONCURRENCY = int(os.environ.get('PLACES_CONCURRENCY', 6))
+PLACES_TIMEOUT = float(os.environ.get('PLACES_TIMEOUT', 5))  # seconds per lookup attempt
+PLACES_RETRIES = int(os.environ.get('PLACES_RETRIES', 2))
+# A lookup, retries and hedge included, gives up after PLACES_DEADLINE seconds
+PLACES_DEADLINE = float(os.environ.get('PLACES_DEADLINE', 8))
+PLACES_HEDGE = int(os.environ.get('PLACES_HEDGE', 1))  # 0 turns hedged lookups off
+places_upstream = Upstream('places', PLACES_DEADLINE, hedge=bool(PLACES_HEDGE), max_workers=PLACES_CONCURRENCY * 2)
+
+# Gemini keeps suggesting the same restaurants and landmarks, so lookups are cached
+# by normalized (name, location). "No candidates" answers are cached too, for less time.
+PLACES_CACHE_TTL = int(os.environ.get('PLACES_CACHE_TTL', 7 * 24 * 3600))
+PLACES_NEGATIVE_CACHE_TTL = int(os.environ.get('PLACES_NEGATIVE_CACHE_TTL', 6 * 3600))
+places_cache = create_cache(
+    max_entries=int(os.environ.get('PLACES_CACHE_SIZE', 2048)),
+    ttl=PLACES_CACHE_TTL,
+    disk_path=os.environ.get('PLACES_CACHE_DB', os.path.join(os.path.dirname(__file__), "cache", "places_cache.sqlite3")),
+    disk_max_entries=int(os.environ.get('PLACES_CACHE_DISK_SIZE', 50000))
+)
+NO_CANDIDATES = {}  # cached marker for a lookup that found nothing
+
+
+def place_cache_key(name, location):
+    return f"{' '.join(name.lower().split())}|{' '.join(location.lower().split())}"
+
+
+def maps_link(place_id):
+    return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
+
+
+class PlacesClient:
+    """Google Places lookups over one keep-alive session, fanned out on a bounded pool"""
+
+    def __init__(self, api_key, max_concurrency=PLACES_CONCURRENCY, timeout=PLACES_TIMEOUT, retries=PLACES_RETRIES):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",)
+        )
+        # One pooled connection per concurrent lookup, reused across requests
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry))
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="places")
+
+    def find_place(self, name, location):
+        """Return the first Places candidate for "name in location", or None"""
+        cache_key = place_cache_key(name, location)
+        cached = places_cache.get(cache_key)
+        if cached is not None:
+            return cached or None
+
+        params = {
+            "input": f"{name} in {location}",
+            "inputtype": "textquery",
+            "fields": PLACE_FIELDS,
+            "key": self.api_key
+        }
+        try:
+            with metrics.time('places_lookup'):
+                data = places_upstream.call(lambda timeout: self._request(params, timeout))
+        except CircuitOpenError as e:
+            logger.debug("Places lookup skipped for %s: %s", name, e)
+            return None
+        except (requests.RequestException, ValueError, DeadlineExceeded) as e:
+            logger.warning("⚠️ Places lookup failed for %s: %s", name, e)
+            return None
+
+        candidates = data.get("candidates")
+        if candidates:
+            # Only the fields we use, so cached entries stay small
+            place_info = {field: candidates[0][field] for field in ("place_id", "rating") if field in candidates[0]}
+            places_cache.set(cache_key, place_info)
+            return place_info
+        # Only a definite "nothing found" is cached; quota or key errors are retried next time
+        if data.get("status") == "ZERO_RESULTS":
+            places_cache.set(cache_key, NO_CANDIDATES, PLACES_NEGATIVE_CACHE_TTL)
+        return None
+
+    def _request(self, params, timeout):
+        response = self.session.get(FIND_PLACE_URL, params=params, timeout=min(self.timeout, timeout))
+        response.raise_for_status()
+        return response.json()
+
+    def submit(self, name, location):
+        """Start one lookup on the pool; the Future resolves to find_place()'s result"""
+        return self._pool.submit(self.find_place, name, location)
+
+    def find_places(self, lookups):
+        """Look up every (name, location) pair concurrently; results keep the input order"""
+        futures = [self.submit(name, location) for name, location in lookups]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_places_client(api_key):
+    """Shared client for this process; a forked worker gets its own session and pool"""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = PlacesClient(api_key)
+                _client_pid = os.getpid()
+    return _client
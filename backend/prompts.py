@@ -0,0 +1,109 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from log_config import get_logger
+from metrics import metrics
+
+logger = get_logger(__name__)
+
+PROMPTS_DIRECTORY = Path(__file__).parent / "Prompts"
+
+# (media type, prompt kind) -> template file in PROMPTS_DIRECTORY
+PROMPT_FILES = {
+    ("artwork", "themes"): "Artworks_Extracting_Themes_Prompt.txt",
+    ("artwork", "details"): "Artworks_Get_Details_Prompt.txt",
+    ("artwork", "suggestions"): "Artworks_Get_Suggestions_Prompt.txt",
+    ("food", "themes"): "Food_Extracting_Themes_Prompt.txt",
+    ("food", "details"): "Food_Get_Details_Prompt.txt",
+    ("food", "suggestions"): "Food_Get_Suggestions_Prompt.txt",
+    ("architecture", "themes"): "Architecture_Extracting_Themes_Prompt.txt",
+    ("architecture", "details"): "Architecture_Get_Details_Prompt.txt",
+    ("architecture", "suggestions"): "Architecture_Get_Suggestions_Prompt.txt",
+    # Wraps a media type's themes and suggestions prompts into one structured generation
+    ("shared", "single_shot"): "Single_Shot_Suggestions_Prompt.txt",
+    # Asks again for only the suggestion rows that were missing or malformed
+    ("shared", "repair"): "Repair_Suggestions_Prompt.txt",
+}
+
+
+class PromptTemplate:
+    """A prompt file parsed once into literal text and {placeholder} slots"""
+
+    PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+    def __init__(self, text):
+        self.text = text
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        self._segments = []  # (is_placeholder, text or placeholder name)
+        position = 0
+        for match in self.PLACEHOLDER.finditer(text):
+            self._segments.append((False, text[position:match.start()]))
+            self._segments.append((True, match.group(1)))
+            position = match.end()
+        self._segments.append((False, text[position:]))
+        self.placeholders = frozenset(name for is_placeholder, name in self._segments if is_placeholder)
+
+    def render(self, **values):
+        with metrics.time('prompt_render'):
+            missing = self.placeholders - values.keys()
+            if missing:
+                raise KeyError(f"Missing prompt values: {', '.join(sorted(missing))}")
+            return "".join(str(values[part]) if is_placeholder else part for is_placeholder, part in self._segments)
+
+
+class PromptRegistry:
+    """Loads every prompt template once and reloads a file when it changes on disk"""
+
+    def __init__(self, directory=PROMPTS_DIRECTORY, files=PROMPT_FILES, check_interval=2.0):
+        self.directory = Path(directory)
+        self.files = dict(files)
+        self.check_interval = check_interval
+        self._templates = {}
+        self._mtimes = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.load_all()
+
+    def load_all(self):
+        with self._lock:
+            for key in self.files:
+                self._load(key)
+            self._last_check = time.monotonic()
+
+    def _load(self, key):
+        path = self.directory / self.files[key]
+        self._mtimes[key] = os.stat(path).st_mtime_ns
+        # utf-8-sig drops the byte order mark some of the prompt files start with
+        self._templates[key] = PromptTemplate(path.read_text(encoding="utf-8-sig"))
+
+    def _reload_changed(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            for key, filename in self.files.items():
+                try:
+                    mtime = os.stat(self.directory / filename).st_mtime_ns
+                    if mtime != self._mtimes.get(key):
+                        self._load(key)
+                        logger.info("🔄 Reloaded prompt template %s", filename)
+                except OSError as e:
+                    # Keep serving the last good template if the file is mid-edit or missing
+                    logger.warning("⚠️ Could not reload prompt template %s: %s", filename, e)
+
+    def get(self, media_type, kind):
+        self._reload_changed()
+        return self._templates[(media_type, kind)]
+
+    def render(self, media_type, kind, **values):
+        return self.get(media_type, kind).render(**values)
+
+
+prompt_registry = PromptRegistry()
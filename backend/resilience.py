@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Consecutive failures that open an upstream's circuit, and seconds before it is tried again
+BREAKER_FAILURES = int(os.environ.get('BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.environ.get('BREAKER_RESET', 30))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an upstream call, hedges included, did not answer within its deadline"""
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after failure_threshold failures in a row
+
+    While open, calls fail at once. After reset_timeout seconds a single trial
+    call is let through (half-open): success closes the circuit again, failure
+    reopens it for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0  # in a row
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened += 1
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of recent call durations, for the latency past which a call is hedged"""
+
+    def __init__(self, window=200, quantile=0.95, min_samples=20):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._sorted = None
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self._sorted = None
+
+    def threshold(self):
+        """The quantile of the window, or None until there are min_samples"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._samples)
+            return self._sorted[min(int(len(self._sorted) * self.quantile), len(self._sorted) - 1)]
+
+
+class Upstream:
+    """Deadline, hedging and a circuit breaker around calls to one outbound service
+
+    call(fn, kind) runs fn(timeout) on this upstream's pool, where timeout is the
+    time left before the deadline, for clients that take one. If it has not
+    answered by the recent p95 latency of calls of the same kind, an identical
+    hedged call is sent and whichever answers first wins; the caller never waits
+    past the deadline. Only idempotent calls should go through here.
+    """
+
+    def __init__(self, name, deadline, hedge=True, hedge_min_delay=0.05, max_workers=32,
+                 failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET):
+        self.name = name
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._latencies = {}  # kind -> LatencyTracker
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._counter_lock = threading.Lock()
+        # Threads are started on demand, so a preloading master that never calls out has none when it forks
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-calls")
+
+    def _latency(self, kind):
+        tracker = self._latencies.get(kind)
+        if tracker is None:
+            tracker = self._latencies.setdefault(kind, LatencyTracker())
+        return tracker
+
+    def call(self, fn, kind=None):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is failing, not calling it for now")
+        self._count('calls')
+        latency = self._latency(kind)
+        start = time.monotonic()
+        try:
+            result = self._first_result(fn, start, latency.threshold() if self.hedge else None)
+        except Exception:
+            self._count('failures')
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        latency.add(time.monotonic() - start)
+        return result
+
+    def _first_result(self, fn, start, hedge_after):
+        deadline = start + self.deadline
+        hedge_at = start + max(hedge_after, self.hedge_min_delay) if hedge_after is not None else None
+        primary = self._submit(fn, deadline)
+        pending = {primary}
+        error = None
+        while pending:
+            wait_until = min(deadline, hedge_at) if hedge_at is not None else deadline
+            done, pending = wait(pending, timeout=max(0.0, wait_until - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count('hedge_wins')
+                    self._cancel(pending)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                break
+            now = time.monotonic()
+            if now >= deadline:
+                # Calls still queued are dropped; running ones finish on the pool, bounded by their timeout
+                self._cancel(pending)
+                self._count('timeouts')
+                raise DeadlineExceeded(f"{self.name} did not answer within {self.deadline:g}s")
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                self._count('hedges')
+                pending.add(self._submit(fn, deadline))
+        raise error
+
+    def _submit(self, fn, deadline):
+        """Queue fn on the pool; its timeout is what is left of the deadline when it actually starts"""
+        def run():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{self.name} call started after its deadline")
+            return fn(remaining)
+        return self._pool.submit(run)
+
+    @staticmethod
+    def _cancel(futures):
+        for future in futures:
+            future.cancel()
+
+    def stream(self, open_stream):
+        """Yield from open_stream(timeout) under the circuit breaker; streams are not hedged"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is failing, not calling it for now")
+        self._count('calls')
+        try:
+            yield from open_stream(self.deadline)
+        except GeneratorExit:
+            # The client went away; the upstream itself was answering
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self._count('failures')
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+    def _count(self, counter):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        hedge_after = {kind: tracker.threshold() for kind, tracker in list(self._latencies.items())}
+        return {
+            'state': self.breaker.state,
+            'calls': self.calls,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'rejected': self.breaker.rejected,
+            'circuit_opened': self.breaker.opened,
+            'deadline_s': self.deadline,
+            'hedge_after_ms': {str(kind): round(seconds * 1000, 1) if seconds is not None else None
+                               for kind, seconds in hedge_after.items()}
+        }
@@ -0,0 +1,100 @@
+import copy
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False  # a streaming leader whose reader went away before the end
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers with that key share its outcome
+
+    The first caller (the leader) runs the function. Callers arriving while it
+    is in flight wait for it and get a copy of its result, or the same exception
+    if it failed. Nothing is remembered once the call finishes, so later callers
+    start a fresh one; pair this with a cache for that.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0  # callers answered by another caller's in-flight call
+
+    def _join(self, key):
+        """The in-flight call for key, and whether this caller has just become its leader"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        return call, leader
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+        call.done.set()
+
+    def do(self, key, fn):
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+            call.done.wait()
+            if call.abandoned:
+                continue  # nothing to share; run it again, or wait on whoever does
+            if call.error is not None:
+                raise call.error
+            # Each waiter gets its own copy, since callers go on to mutate results
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    def stream(self, key, generate, replay):
+        """do() for a generator: the leader yields the items of generate() as they are produced
+
+        generate() returns the finished value at the end (the whole text, the
+        list of cards), which is what do() callers with the same key share.
+        Stream callers arriving meanwhile wait for it, then yield replay(value)
+        like a cache hit. If the leader's reader stops early, waiters start over.
+        """
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+            call.done.wait()
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            yield from replay(copy.deepcopy(call.result))
+            return
+
+        try:
+            call.result = yield from generate()
+        except GeneratorExit:
+            call.abandoned = True
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'leaders': self.leaders, 'shared': self.shared}
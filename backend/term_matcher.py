@@ -0,0 +1,48 @@
+import re
+
+
+class TermMatcher:
+    """Answers "does any of these terms occur in the text?" with one compiled regex
+
+    The vocabulary is deduplicated and folded into a character trie, so a scan
+    walks the text once instead of running a substring search per term. Matching
+    keeps the semantics of ``any(term in text for term in terms)``.
+    """
+
+    def __init__(self, terms):
+        self.terms = tuple(dict.fromkeys(terms))
+        self._pattern = re.compile(self._build_pattern(self.terms))
+
+    @staticmethod
+    def _build_pattern(terms):
+        if not terms:
+            return r'(?!)'  # an empty vocabulary never matches
+
+        end = object()
+        trie = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[end] = True
+
+        def build(node):
+            # Once a term has ended any longer continuation is redundant for "any match"
+            if end in node:
+                return ''
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+            if len(branches) == 1:
+                return branches[0]
+            return '(?:' + '|'.join(branches) + ')'
+
+        return build(trie)
+
+    def matches(self, text):
+        """True if any term is a substring of text"""
+        return self._pattern.search(text) is not None
+
+    def __contains__(self, text):
+        return self.matches(text)
+
+    def __len__(self):
+        return len(self.terms)
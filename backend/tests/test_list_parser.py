@@ -0,0 +1,34 @@
+from list_parser import IncrementalListParser, parse_rows, parse_suggestion_rows
+
+
+def test_clean_json_rows():
+    assert parse_suggestion_rows('[["a", "b"], ["c", "d"]]') == [["a", "b"], ["c", "d"]]
+
+
+def test_non_row_items_are_dropped_from_clean_json():
+    assert parse_suggestion_rows('[["a", "b"], "stray", 3]') == [["a", "b"]]
+
+
+def test_truncated_json_keeps_the_completed_rows():
+    assert parse_suggestion_rows('[["a", "b"], ["c", "d"], ["e", "f') == [["a", "b"], ["c", "d"]]
+
+
+def test_fenced_json():
+    text = '```json\n[\n  ["Mona Lisa", "Leonardo"],\n  ["The Last Supper", "Leonardo"]\n]\n```'
+    assert parse_suggestion_rows(text) == [["Mona Lisa", "Leonardo"], ["The Last Supper", "Leonardo"]]
+
+
+def test_python_syntax_and_broken_rows():
+    text = "[['a', 'b'], [\"c\", oops], ['e', 'f']]"
+    assert parse_rows(text) == [["a", "b"], ["e", "f"]]
+
+
+def test_brackets_and_escaped_quotes_inside_strings():
+    assert parse_rows(r'[["a ] b", "say \"[hi]\""]]') == [["a ] b", 'say "[hi]"']]
+
+
+def test_rows_split_across_chunks():
+    parser = IncrementalListParser()
+    chunks = ['[["Pal', 'azzo", "Rome"], ', '["Duomo", "Flor', 'ence"]', ']']
+    rows = [parser.feed(chunk) for chunk in chunks]
+    assert rows == [[], [["Palazzo", "Rome"]], [], [["Duomo", "Florence"]], []]
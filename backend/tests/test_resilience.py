@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, Upstream
+
+
+def test_deadline_drops_calls_queued_on_a_saturated_pool():
+    upstream = Upstream('test', deadline=0.3, hedge=False, max_workers=1, failure_threshold=100)
+    timeouts = []
+
+    def fn(timeout):
+        timeouts.append(timeout)
+        time.sleep(0.25)
+        return 'ok'
+
+    outcomes = []
+
+    def caller():
+        try:
+            outcomes.append(upstream.call(fn))
+        except DeadlineExceeded:
+            outcomes.append('deadline')
+
+    threads = [threading.Thread(target=caller) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    time.sleep(0.5)  # anything still queued would have run by now
+
+    assert outcomes.count('deadline') >= 2
+    # Calls that were still queued when their caller gave up never ran
+    assert len(timeouts) <= 2
+    # A call that started late was given only what was left of its deadline
+    assert all(timeout <= 0.3 for timeout in timeouts)
+    assert timeouts == sorted(timeouts, reverse=True)
+
+
+def test_timeout_is_measured_when_the_call_starts():
+    upstream = Upstream('test', deadline=1.0, hedge=False, max_workers=1)
+    release = threading.Event()
+    upstream._pool.submit(release.wait)  # occupies the only worker
+    timeouts = []
+    threading.Timer(0.4, release.set).start()
+
+    assert upstream.call(lambda timeout: timeouts.append(timeout) or 'ok') == 'ok'
+    assert timeouts[0] < 0.7
+
+
+def test_slow_call_is_hedged_and_the_duplicate_wins():
+    upstream = Upstream('test', deadline=2.0, hedge=True, hedge_min_delay=0.01)
+    for _ in range(20):
+        upstream._latency('read').add(0.02)
+    attempts = []
+
+    def fn(timeout):
+        attempts.append(timeout)
+        time.sleep(1.0 if len(attempts) == 1 else 0.01)
+        return len(attempts)
+
+    start = time.monotonic()
+    assert upstream.call(fn, kind='read') == 2
+    assert time.monotonic() - start < 0.5
+    assert (upstream.hedges, upstream.hedge_wins) == (1, 1)
+
+
+def test_circuit_opens_after_consecutive_failures():
+    upstream = Upstream('test', deadline=1.0, hedge=False, failure_threshold=2, reset_timeout=60)
+
+    def fail(timeout):
+        raise ConnectionError('down')
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            upstream.call(fail)
+    with pytest.raises(CircuitOpenError):
+        upstream.call(lambda timeout: 'never called')
+    assert upstream.stats()['state'] == 'open'
+    assert upstream.stats()['rejected'] == 1
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the trial
+    assert not breaker.allow()  # others are rejected while it is in flight
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow() and breaker.allow()
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def wait_for_waiters(flights, count):
+    deadline = time.monotonic() + 2
+    while flights.stats()['shared'] < count:
+        assert time.monotonic() < deadline, "waiters did not join the flight"
+        time.sleep(0.005)
+
+
+def run_waiters(count, target):
+    outcomes = []
+    threads = [threading.Thread(target=lambda: outcomes.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_waiters_share_the_leaders_result_as_copies():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait()
+        return {'cards': [1, 2]}
+
+    threads, outcomes = run_waiters(3, lambda: flights.do('key', fn))
+    wait_for_waiters(flights, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert outcomes == [{'cards': [1, 2]}] * 3
+    assert len({id(outcome) for outcome in outcomes}) == 3
+
+
+def test_waiters_receive_the_leaders_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+    error = ValueError('no usable suggestions')
+
+    def fn():
+        release.wait()
+        raise error
+
+    def call():
+        try:
+            return flights.do('key', fn)
+        except ValueError as e:
+            return e
+
+    threads, outcomes = run_waiters(3, call)
+    wait_for_waiters(flights, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes == [error] * 3
+    assert flights.stats()['in_flight'] == 0
+
+
+def test_later_calls_start_a_new_flight():
+    flights = SingleFlight()
+    assert flights.do('key', lambda: 1) == 1
+    assert flights.do('key', lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flights.do('other', lambda: {}['missing'])
+    assert flights.do('other', lambda: 3) == 3
+
+
+def test_stream_waiters_replay_the_leaders_result():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def generate():
+        yield 'Hello, '
+        release.wait()
+        yield 'world'
+        return 'Hello, world'
+
+    leader = flights.stream('key', generate, lambda text: [text])
+    assert next(leader) == 'Hello, '
+    threads, outcomes = run_waiters(2, lambda: list(flights.stream('key', generate, lambda text: [text])))
+    wait_for_waiters(flights, 2)
+    release.set()
+    assert list(leader) == ['world']
+    for thread in threads:
+        thread.join()
+
+    assert outcomes == [['Hello, world']] * 2
+
+
+def test_stream_waiters_start_over_when_the_leader_is_abandoned():
+    flights = SingleFlight()
+    leader_started = threading.Event()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        leader_started.set()
+        yield 'partial'
+        time.sleep(0.05)
+        yield 'rest'
+        return 'partial rest'
+
+    leader = flights.stream('key', generate, lambda text: [text])
+    assert next(leader) == 'partial'
+    threads, outcomes = run_waiters(1, lambda: list(flights.stream('key', generate, lambda text: [text])))
+    wait_for_waiters(flights, 1)
+    leader.close()  # its client went away
+    for thread in threads:
+        thread.join()
+
+    assert outcomes == [['partial', 'rest']]
+    assert len(calls) == 2
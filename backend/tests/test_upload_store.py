@@ -0,0 +1,52 @@
+import os
+import time
+
+from upload_store import UploadStore
+
+
+def images_in(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.jpg'))
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 2
+    while not condition():
+        assert time.monotonic() < deadline, "the evictor did not catch up"
+        time.sleep(0.01)
+
+
+def test_evicts_oldest_images_over_max_images(tmp_path):
+    store = UploadStore(str(tmp_path), max_images=3, writers=1)
+    for i in range(5):
+        store.save_async(f'{i}.jpg', b'x' * 10)
+    store.close()
+
+    wait_until(lambda: len(images_in(tmp_path)) <= 3)
+    assert images_in(tmp_path) == ['2.jpg', '3.jpg', '4.jpg']
+
+
+def test_max_images_covers_images_written_by_another_store(tmp_path):
+    # Two gunicorn workers each hold an UploadStore over the same directory
+    first = UploadStore(str(tmp_path), max_images=4, writers=1)
+    second = UploadStore(str(tmp_path), max_images=4, writers=1)
+    for i in range(6):
+        first.save_async(f'first-{i}.jpg', b'x' * 10)
+        second.save_async(f'second-{i}.jpg', b'x' * 10)
+    first.close()
+    second.close()
+
+    wait_until(lambda: first.stats()['evicted'] + second.stats()['evicted'] == 8)
+    assert len(images_in(tmp_path)) == 4
+
+
+def test_max_bytes_covers_images_written_by_another_store(tmp_path):
+    first = UploadStore(str(tmp_path), max_images=20, max_bytes=100, writers=1)
+    second = UploadStore(str(tmp_path), max_images=20, max_bytes=100, writers=1)
+    first.save_async('old.jpg', b'x' * 60)
+    first.close()
+    os.utime(tmp_path / 'old.jpg', (0, 0))
+    second.save_async('new.jpg', b'x' * 60)
+    second.close()
+
+    wait_until(lambda: images_in(tmp_path) == ['new.jpg'])
+    assert second.stats()['bytes'] == 60
@@ -0,0 +1,158 @@
+import atexit
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from log_config import get_logger
+from metrics import metrics
+
+logger = get_logger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+PARTIAL_SUFFIX = '.part'
+
+
+class UploadStore:
+    """Uploaded images on disk, indexed oldest first and kept within count/byte quotas
+
+    Images are written by a small writer pool and served from memory until their
+    write lands. Each finished write wakes a background thread that rescans the
+    directory and deletes the oldest images over a quota, so uploads never wait on a
+    directory scan. Rescanning rather than trusting this process's index keeps the
+    quotas over every image on disk when several workers share the directory.
+    """
+
+    def __init__(self, directory, max_images=20, max_bytes=0, writers=2):
+        self.directory = directory
+        self.max_images = max_images
+        self.max_bytes = max_bytes  # 0 means no byte limit
+        self.evicted = 0
+        self._index = OrderedDict()  # filename -> size in bytes, oldest first
+        self._bytes = 0
+        self._pending = {}  # filename -> bytes not yet on disk
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=writers, thread_name_prefix='image-writer')
+        self._evict_needed = threading.Event()
+        self._evictor_pid = None
+
+        os.makedirs(directory, exist_ok=True)
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(PARTIAL_SUFFIX):
+                # Left over from a write interrupted by a restart
+                self._remove(entry.name)
+        self.evict()
+        logger.info("📊 Upload store indexed %d images (%.1f MB)", len(self._index), self._bytes / 1024 / 1024)
+
+    def _rebuild_index(self):
+        images = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted meanwhile by another worker
+                images.append((stat.st_mtime, entry.name, stat.st_size))
+        index = OrderedDict((filename, size) for _, filename, size in sorted(images))
+        with self._lock:
+            self._index = index
+            self._bytes = sum(index.values())
+
+    def save_async(self, filename, content):
+        """Queue an image to be written; it is served from memory until then"""
+        with self._lock:
+            self._pending[filename] = content
+        self._writer.submit(self._write, filename, content)
+
+    def _write(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        try:
+            # Write under a temporary name so a half-written file is never served
+            with metrics.time('file_save'):
+                with open(path + PARTIAL_SUFFIX, 'wb') as image_file:
+                    image_file.write(content)
+                os.replace(path + PARTIAL_SUFFIX, path)
+        except OSError as e:
+            logger.warning("⚠️ Could not save image %s: %s", filename, e)
+            with self._lock:
+                self._pending.pop(filename, None)
+            return
+
+        with self._lock:
+            self._pending.pop(filename, None)
+            self._index[filename] = len(content)
+            self._bytes += len(content)
+        # Even under quota here: other workers' images are only seen by a rescan
+        self._ensure_evictor()
+        self._evict_needed.set()
+
+    def pending(self, filename):
+        """Bytes of an image whose write has not landed yet, or None"""
+        with self._lock:
+            return self._pending.get(filename)
+
+    def _over_quota(self):
+        return len(self._index) > self.max_images or (self.max_bytes and self._bytes > self.max_bytes)
+
+    def _ensure_evictor(self):
+        # Started on first need in each process: threads do not survive fork(), and a
+        # preloading server should not fork while one holds the index lock
+        if self._evictor_pid == os.getpid():
+            return
+        with self._lock:
+            if self._evictor_pid == os.getpid():
+                return
+            self._evictor_pid = os.getpid()
+        threading.Thread(target=self._evict_loop, name='upload-evictor', daemon=True).start()
+
+    def _evict_loop(self):
+        while True:
+            self._evict_needed.wait()
+            self._evict_needed.clear()
+            self.evict()
+
+    def evict(self):
+        """Rescan the directory, then delete the oldest images until it is within its quotas"""
+        self._rebuild_index()
+        victims = []
+        with self._lock:
+            while self._index and self._over_quota():
+                filename, size = self._index.popitem(last=False)
+                self._bytes -= size
+                victims.append(filename)
+        for filename in victims:
+            if self._remove(filename):
+                self.evicted += 1
+                logger.debug("🗑️ Cleaned up old image: %s", filename)
+        return len(victims)
+
+    def _remove(self, filename):
+        try:
+            os.remove(os.path.join(self.directory, filename))
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning("⚠️ Could not delete old image %s: %s", filename, e)
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'images': len(self._index),
+                'bytes': self._bytes,
+                'pending_writes': len(self._pending),
+                'max_images': self.max_images,
+                'max_bytes': self.max_bytes,
+                'evicted': self.evicted
+            }
+
+    def close(self):
+        """Finish queued writes, e.g. at interpreter exit"""
+        self._writer.shutdown(wait=True)
+
+
+def create_upload_store(directory, max_images=20, max_bytes=0, writers=2):
+    store = UploadStore(directory, max_images=max_images, max_bytes=max_bytes, writers=writers)
+    atexit.register(store.close)
+    return store
@@ -0,0 +1,145 @@
+import atexit
+import os
+import threading
+import time
+
+import grpc
+from google.api_core import exceptions as google_exceptions
+from google.cloud import vision
+
+from log_config import get_logger
+from metrics import metrics
+
+logger = get_logger(__name__)
+
+# Vision features requested for each analysis type, as (feature, max_results).
+# All of them go out in a single annotate call so the image is only sent once.
+ANALYSIS_FEATURES = {
+    "artwork": [(vision.Feature.Type.LABEL_DETECTION, 10), (vision.Feature.Type.WEB_DETECTION, 10)],
+    "architecture": [(vision.Feature.Type.LABEL_DETECTION, 10), (vision.Feature.Type.WEB_DETECTION, 10)],
+    "food": [(vision.Feature.Type.LABEL_DETECTION, 10), (vision.Feature.Type.WEB_DETECTION, 10)],
+}
+
+# Errors that mean the channel itself is broken and a fresh client may succeed
+RECONNECT_ERRORS = (google_exceptions.ServiceUnavailable, google_exceptions.DeadlineExceeded)
+
+
+class VisionClientManager:
+    """Owns the single Vision client (and its gRPC channel) for this worker process"""
+
+    def __init__(self, credentials_path, warmup_timeout=10):
+        self.credentials_path = credentials_path
+        self.warmup_timeout = warmup_timeout
+        self.warmup_seconds = None
+        self.reconnects = 0
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        # Validate credentials once instead of re-reading the key file on every image
+        self.credentials_configured = self._check_credentials()
+        logger.info("Vision credentials configured: %s", self.credentials_configured)
+
+    def _check_credentials(self):
+        if not self.credentials_path or not os.path.exists(self.credentials_path):
+            return False
+        try:
+            with open(self.credentials_path, encoding="utf-8") as creds_file:
+                return 'placeholder' not in creds_file.read()
+        except OSError as e:
+            logger.warning("⚠️ Could not read Vision credentials: %s", e)
+            return False
+
+    def get_client(self):
+        """Return the shared client, creating it on first use in this process"""
+        client = self._client
+        # gRPC channels do not survive fork(), so a forked worker builds its own
+        if client is not None and self._pid == os.getpid():
+            return client
+
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                self._client = self._create_client()
+                self._pid = os.getpid()
+            return self._client
+
+    def _create_client(self):
+        start = time.perf_counter()
+        client = vision.ImageAnnotatorClient()
+        try:
+            # Open the channel now so the TLS handshake is not paid by the first upload
+            grpc.channel_ready_future(client.transport.grpc_channel).result(timeout=self.warmup_timeout)
+        except grpc.FutureTimeoutError:
+            logger.warning("⚠️ Vision channel not ready after %ss, continuing lazily", self.warmup_timeout)
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info("Vision client created, channel warm-up took %.1f ms", self.warmup_seconds * 1000)
+        return client
+
+    def warm_up(self):
+        """Create the client and connect its channel ahead of the first request"""
+        if self.credentials_configured:
+            self.get_client()
+        return self.warmup_seconds
+
+    def reset(self, failed_client=None):
+        """Drop the current client so the next call reconnects"""
+        with self._lock:
+            # Another thread may already have replaced the broken client
+            if failed_client is not None and self._client is not failed_client:
+                return
+            client, self._client = self._client, None
+            self.reconnects += 1
+        if client is not None:
+            self._close_client(client)
+
+    def call(self, fn):
+        """Run fn(client), reconnecting once if the channel has gone bad"""
+        client = self.get_client()
+        try:
+            return fn(client)
+        except RECONNECT_ERRORS as e:
+            logger.warning("⚠️ Vision call failed (%s), reconnecting: %s", type(e).__name__, e)
+            self.reset(client)
+            return fn(self.get_client())
+
+    def annotate(self, content, analysis_type="artwork"):
+        """Run every feature configured for analysis_type in one annotate_image request"""
+        features = [
+            vision.Feature(type_=feature_type, max_results=max_results)
+            for feature_type, max_results in ANALYSIS_FEATURES[analysis_type]
+        ]
+        annotate_request = vision.AnnotateImageRequest(image=vision.Image(content=content), features=features)
+        with metrics.time('vision_annotate', analysis_type=analysis_type):
+            response = self.call(lambda client: client.annotate_image(annotate_request))
+        if response.error.message:
+            raise RuntimeError(f"Vision annotate failed: {response.error.message}")
+        return response
+
+    def close(self):
+        """Shut the channel down cleanly, e.g. at interpreter exit"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and self._pid == os.getpid():
+            self._close_client(client)
+            logger.info("Vision client closed")
+
+    @staticmethod
+    def _close_client(client):
+        try:
+            client.transport.close()
+        except Exception as e:
+            logger.warning("⚠️ Error closing Vision client: %s", e)
+
+    def status(self):
+        return {
+            'credentials_configured': self.credentials_configured,
+            'connected': self._client is not None,
+            'warmup_ms': round(self.warmup_seconds * 1000, 1) if self.warmup_seconds is not None else None,
+            'reconnects': self.reconnects
+        }
+
+
+def create_vision_manager(credentials_path):
+    manager = VisionClientManager(credentials_path)
+    atexit.register(manager.close)
+    return manager
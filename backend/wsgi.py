@@ -0,0 +1,17 @@
+"""Production entry point
+
+Run from the backend directory:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (the default in gunicorn.conf.py) this module is imported once in
+the master process before workers are forked, so every worker shares the
+already-loaded prompt templates, compiled vocabularies and precompressed assets.
+Network clients (Vision gRPC channel, Places session, SQLite connections) are
+created per worker after the fork, since none of them survive fork().
+"""
+from agent import get_model
+from app import app, vision_clients  # noqa: F401  (vision_clients is warmed up per worker)
+
+# Importing app loaded the prompts, matchers and assets. Configuring Gemini here does
+# not open a connection; the model creates its client lazily in each worker.
+get_model()
@@ -82,10 +82,9 @@ document.addEventListener('DOMContentLoaded', function() {
     async function uploadFiles() {
         if (selectedFiles.length === 0) return;
         
+        // Recognition, description and similar buildings all come back from one request
         const formData = new FormData();
-        selectedFiles.forEach(file => {
-            formData.append('files', file);
-        });
+        formData.append('file', selectedFiles[0]);
         
         uploadProgress.style.display = 'block';
         progressFill.style.width = '0%';
@@ -94,30 +93,11 @@ document.addEventListener('DOMContentLoaded', function() {
             progressFill.style.width = '30%';
             progressText.textContent = 'Uploading image...';
             
-            const response = await fetch('/upload_architecture', {
-                method: 'POST',
-                body: formData
-            });
-            
-            progressFill.style.width = '60%';
-            progressText.textContent = 'Analyzing architecture...';
-            
-            const data = await response.json();
-            
-            progressFill.style.width = '100%';
-            progressText.textContent = 'Complete!';
-            
-            if (response.ok && data.uploadedFiles && data.uploadedFiles.length > 0) {
-                const uploadedFile = data.uploadedFiles[0];
-                if (uploadedFile.architecture_analysis) {
-                    displayResults(uploadedFile);
-                }
-                uploadStatus.className = 'upload-status success';
-                uploadStatus.textContent = data.message;
+            if (window.ReadableStream && window.TextDecoder) {
+                await streamAnalysis(formData);
             } else {
-                throw new Error(data.error || 'Upload failed');
+                await fetchAnalysis(formData);
             }
-            
         } catch (error) {
             console.error('Upload error:', error);
             uploadStatus.className = 'upload-status error';
@@ -130,7 +110,84 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    async function displayResults(fileInfo) {
+    // POST a form and read the Server-Sent Events it answers with, calling handlers[event](data) for each.
+    // EventSource can only send GET requests, so the stream is read from fetch() instead.
+    async function postEventStream(url, formData, handlers) {
+        const response = await fetch(url, { method: 'POST', body: formData });
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.error || 'Upload failed');
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                let event = 'message';
+                let data = null;
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    if (line.startsWith('data: ')) data = line.slice(6);
+                });
+                // Comment-only blocks are keepalives and carry no data
+                if (data !== null && handlers[event]) handlers[event](JSON.parse(data));
+            }
+        }
+    }
+    
+    // Show the recognized building first, then the description and each similar building as they are generated
+    async function streamAnalysis(formData) {
+        let description = '';
+        const buildings = [];
+        await postEventStream('/analyze/architecture?stream=1', formData, {
+            analysis: (data) => showAnalysis(data.file),
+            chunk: (data) => {
+                description += data.text;
+                renderDescription(description);
+            },
+            suggestion: (data) => addBuilding(buildings, data.index, data.suggestion),
+            patch: (data) => patchBuilding(buildings, data.index, data.fields),
+            error: (data) => console.error(`Error generating ${data.part}:`, data.error),
+            done: () => {
+                // Parts that failed, or an image that was not recognized, leave these empty
+                if (!description) renderDescription('');
+                if (buildings.length === 0) showNoBuildings();
+            }
+        });
+    }
+    
+    async function fetchAnalysis(formData) {
+        const response = await fetch('/analyze/architecture', {
+            method: 'POST',
+            body: formData
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || 'Upload failed');
+        }
+        
+        showAnalysis(data.file);
+        renderDescription(data.details || '');
+        const buildings = [];
+        (data.suggestions || []).forEach((building, index) => addBuilding(buildings, index, building));
+        if (buildings.length === 0) showNoBuildings();
+    }
+    
+    function showAnalysis(fileInfo) {
+        progressFill.style.width = '100%';
+        progressText.textContent = 'Complete!';
+        uploadStatus.className = 'upload-status success';
+        uploadStatus.textContent = 'Upload completed';
+        displayResults(fileInfo);
+    }
+    
+    function displayResults(fileInfo) {
         const analysis = fileInfo.architecture_analysis;
         const imageUrl = `/uploads/${fileInfo.saved_name}`;
         
@@ -146,67 +203,45 @@ document.addEventListener('DOMContentLoaded', function() {
             architectureName.textContent = analysis.artwork_name || 'Unknown Building';
         }
         
-        // Display description - temporarily show loading
+        // Description and suggestions are still being generated
         const architectureDescription = document.getElementById('architectureDescription');
         if (architectureDescription) {
             architectureDescription.innerHTML = 'Loading description...';
         }
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (suggestionsContent) {
+            suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>Loading similar architecture...</p></div>';
+        }
         
         // Show results
         architectureResults.style.display = 'block';
         architectureResults.scrollIntoView({ behavior: 'smooth' });
-        
-        // Load detailed description from LLM
-        await loadArchitectureDetails(analysis.artwork_name);
-        
-        // Load architecture suggestions
-        loadArchitectureSuggestions(analysis.artwork_name);
     }
     
-    async function loadArchitectureDetails(buildingName) {
-        try {
-            const architectureDescription = document.getElementById('architectureDescription');
-            if (!architectureDescription) return;
-            
-            const response = await fetch(`/get_architecture_details/${encodeURIComponent(buildingName)}`);
-            const data = await response.json();
-            
-            if (data.success && data.details) {
-                // Display the LLM-generated description with proper line breaks and clickable URLs
-                let formattedText = data.details.split('\n').join('<br>');
-                
-                // Convert URLs to clickable links
-                const urlRegex = /(https?:\/\/[^\s]+)/g;
-                formattedText = formattedText.replace(urlRegex, (url) => {
-                    return `<a href="${url}" target="_blank" rel="noopener noreferrer" style="color: #0066cc; text-decoration: underline;">${url}</a>`;
-                });
-                
-                architectureDescription.innerHTML = formattedText;
-            } else {
-                architectureDescription.textContent = data.details || 'Unable to load description.';
-            }
-        } catch (error) {
-            console.error('Error loading architecture details:', error);
-            const architectureDescription = document.getElementById('architectureDescription');
-            if (architectureDescription) {
-                architectureDescription.textContent = 'Error loading description.';
-            }
+    function renderDescription(details) {
+        const architectureDescription = document.getElementById('architectureDescription');
+        if (!architectureDescription) return;
+        
+        if (!details) {
+            architectureDescription.textContent = 'Unable to load description.';
+            return;
         }
+        
+        // Display the LLM-generated description with proper line breaks and clickable URLs
+        let formattedText = details.split('\n').join('<br>');
+        
+        // Convert URLs to clickable links
+        const urlRegex = /(https?:\/\/[^\s]+)/g;
+        formattedText = formattedText.replace(urlRegex, (url) => {
+            return `<a href="${url}" target="_blank" rel="noopener noreferrer" style="color: #0066cc; text-decoration: underline;">${url}</a>`;
+        });
+        
+        architectureDescription.innerHTML = formattedText;
     }
     
-    async function loadArchitectureSuggestions(buildingName) {
-        try {
-            const suggestionsContent = document.getElementById('suggestionsContent');
-            if (!suggestionsContent) return;
-            
-            suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>Loading similar architecture...</p></div>';
-            
-            const response = await fetch(`/get_architecture_suggestions/${encodeURIComponent(buildingName)}`);
-            const data = await response.json();
-            
-            if (data.success && data.suggestions && data.suggestions.length > 0) {
-                const suggestionsHtml = data.suggestions.map((building, index) => `
-                    <div class="suggestion-item">
+    function buildingCardHtml(building, index) {
+        return `
+                    <div class="suggestion-item" data-index="${index}">
                         <div class="suggestion-number">${index + 1}</div>
                         <div class="suggestion-details">
                             <div class="suggestion-title">${building.Name || 'Unknown'}</div>
@@ -219,18 +254,31 @@ document.addEventListener('DOMContentLoaded', function() {
                             </div>
                         </div>
                     </div>
-                `).join('');
-                
-                suggestionsContent.innerHTML = suggestionsHtml;
-            } else {
-                suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>No architecture suggestions available</p></div>';
-            }
-        } catch (error) {
-            console.error('Error loading suggestions:', error);
-            const suggestionsContent = document.getElementById('suggestionsContent');
-            if (suggestionsContent) {
-                suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>Error loading suggestions</p></div>';
-            }
+                `;
+    }
+    
+    function addBuilding(buildings, index, building) {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (!suggestionsContent) return;
+        
+        if (buildings.length === 0) suggestionsContent.innerHTML = '';
+        buildings[index] = building;
+        suggestionsContent.insertAdjacentHTML('beforeend', buildingCardHtml(building, index));
+    }
+    
+    // A building's Maps link arrives after its card
+    function patchBuilding(buildings, index, fields) {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        const card = suggestionsContent && suggestionsContent.querySelector(`.suggestion-item[data-index="${index}"]`);
+        if (!card || !buildings[index]) return;
+        Object.assign(buildings[index], fields);
+        card.outerHTML = buildingCardHtml(buildings[index], index);
+    }
+    
+    function showNoBuildings() {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (suggestionsContent) {
+            suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>No architecture suggestions available</p></div>';
         }
     }
     
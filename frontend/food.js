@@ -82,10 +82,11 @@ document.addEventListener('DOMContentLoaded', function() {
     async function uploadFiles() {
         if (selectedFiles.length === 0) return;
         
+        // Recognition, description and restaurant suggestions all come back from one request
+        const locationInput = document.getElementById('locationInput');
         const formData = new FormData();
-        selectedFiles.forEach(file => {
-            formData.append('files', file);
-        });
+        formData.append('file', selectedFiles[0]);
+        formData.append('location', locationInput ? locationInput.value : 'New York');
         
         uploadProgress.style.display = 'block';
         progressFill.style.width = '0%';
@@ -94,30 +95,11 @@ document.addEventListener('DOMContentLoaded', function() {
             progressFill.style.width = '30%';
             progressText.textContent = 'Uploading image...';
             
-            const response = await fetch('/upload_food', {
-                method: 'POST',
-                body: formData
-            });
-            
-            progressFill.style.width = '60%';
-            progressText.textContent = 'Analyzing food...';
-            
-            const data = await response.json();
-            
-            progressFill.style.width = '100%';
-            progressText.textContent = 'Complete!';
-            
-            if (response.ok && data.uploadedFiles && data.uploadedFiles.length > 0) {
-                const uploadedFile = data.uploadedFiles[0];
-                if (uploadedFile.food_analysis) {
-                    displayResults(uploadedFile);
-                }
-                uploadStatus.className = 'upload-status success';
-                uploadStatus.textContent = data.message;
+            if (window.ReadableStream && window.TextDecoder) {
+                await streamAnalysis(formData);
             } else {
-                throw new Error(data.error || 'Upload failed');
+                await fetchAnalysis(formData);
             }
-            
         } catch (error) {
             console.error('Upload error:', error);
             uploadStatus.className = 'upload-status error';
@@ -130,7 +112,84 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    async function displayResults(fileInfo) {
+    // POST a form and read the Server-Sent Events it answers with, calling handlers[event](data) for each.
+    // EventSource can only send GET requests, so the stream is read from fetch() instead.
+    async function postEventStream(url, formData, handlers) {
+        const response = await fetch(url, { method: 'POST', body: formData });
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.error || 'Upload failed');
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                let event = 'message';
+                let data = null;
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    if (line.startsWith('data: ')) data = line.slice(6);
+                });
+                // Comment-only blocks are keepalives and carry no data
+                if (data !== null && handlers[event]) handlers[event](JSON.parse(data));
+            }
+        }
+    }
+    
+    // Show the recognized food first, then the description and each restaurant as they are generated
+    async function streamAnalysis(formData) {
+        let description = '';
+        const restaurants = [];
+        await postEventStream('/analyze/food?stream=1', formData, {
+            analysis: (data) => showAnalysis(data.file),
+            chunk: (data) => {
+                description += data.text;
+                renderDescription(description);
+            },
+            suggestion: (data) => addRestaurant(restaurants, data.index, data.suggestion),
+            patch: (data) => patchRestaurant(restaurants, data.index, data.fields),
+            error: (data) => console.error(`Error generating ${data.part}:`, data.error),
+            done: () => {
+                // Parts that failed, or an image that was not recognized, leave these empty
+                if (!description) renderDescription('');
+                if (restaurants.length === 0) showNoRestaurants();
+            }
+        });
+    }
+    
+    async function fetchAnalysis(formData) {
+        const response = await fetch('/analyze/food', {
+            method: 'POST',
+            body: formData
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || 'Upload failed');
+        }
+        
+        showAnalysis(data.file);
+        renderDescription(data.details || '');
+        const restaurants = [];
+        (data.suggestions || []).forEach((restaurant, index) => addRestaurant(restaurants, index, restaurant));
+        if (restaurants.length === 0) showNoRestaurants();
+    }
+    
+    function showAnalysis(fileInfo) {
+        progressFill.style.width = '100%';
+        progressText.textContent = 'Complete!';
+        uploadStatus.className = 'upload-status success';
+        uploadStatus.textContent = 'Upload completed';
+        displayResults(fileInfo);
+    }
+    
+    function displayResults(fileInfo) {
         const analysis = fileInfo.food_analysis;
         const imageUrl = `/uploads/${fileInfo.saved_name}`;
         
@@ -146,62 +205,36 @@ document.addEventListener('DOMContentLoaded', function() {
             foodName.textContent = analysis.food_name || 'Unknown Food';
         }
         
-        // Display description - temporarily show loading
+        // Description and suggestions are still being generated
         const foodDescription = document.getElementById('foodDescription');
         if (foodDescription) {
             foodDescription.innerHTML = 'Loading description...';
         }
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (suggestionsContent) {
+            suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>Loading restaurant suggestions...</p></div>';
+        }
         
         // Show results
         foodResults.style.display = 'block';
         foodResults.scrollIntoView({ behavior: 'smooth' });
-        
-        // Load detailed description from LLM
-        await loadFoodDetails(analysis.food_name);
-        
-        // Load restaurant suggestions with user's location
-        const locationInput = document.getElementById('locationInput');
-        const location = locationInput ? locationInput.value : 'New York';
-        loadRestaurantSuggestions(analysis.food_name, location);
     }
     
-    async function loadFoodDetails(foodName) {
-        try {
-            const foodDescription = document.getElementById('foodDescription');
-            if (!foodDescription) return;
-            
-            const response = await fetch(`/get_food_details/${encodeURIComponent(foodName)}`);
-            const data = await response.json();
-            
-            if (data.success && data.details) {
-                // Display the LLM-generated description with proper line breaks
-                const formattedText = data.details.split('\n').join('<br>');
-                foodDescription.innerHTML = formattedText;
-            } else {
-                foodDescription.textContent = data.details || 'Unable to load description.';
-            }
-        } catch (error) {
-            console.error('Error loading food details:', error);
-            const foodDescription = document.getElementById('foodDescription');
-            if (foodDescription) {
-                foodDescription.textContent = 'Error loading description.';
-            }
+    function renderDescription(text) {
+        const foodDescription = document.getElementById('foodDescription');
+        if (!foodDescription) return;
+        
+        if (text) {
+            // Display the LLM-generated description with proper line breaks
+            foodDescription.innerHTML = text.split('\n').join('<br>');
+        } else {
+            foodDescription.textContent = 'Unable to load description.';
         }
     }
     
-    async function loadRestaurantSuggestions(foodName, location = 'New York') {
-        try {
-            const suggestionsContent = document.getElementById('suggestionsContent');
-            if (!suggestionsContent) return;
-            
-            suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>Loading restaurant suggestions...</p></div>';
-            
-            const response = await fetch(`/get_food_suggestions/${encodeURIComponent(foodName)}?location=${encodeURIComponent(location)}`);
-            const data = await response.json();
-            
-            if (data.success && data.suggestions && data.suggestions.length > 0) {
-                const suggestionsHtml = data.suggestions.map((restaurant, index) => `
-                    <div class="suggestion-item">
+    function restaurantCardHtml(restaurant, index) {
+        return `
+                    <div class="suggestion-item" data-index="${index}">
                         <div class="suggestion-number">${index + 1}</div>
                         <div class="suggestion-details">
                             <div class="suggestion-title">${restaurant['Restaurant Name'] || 'Unknown'}</div>
@@ -211,18 +244,31 @@ document.addEventListener('DOMContentLoaded', function() {
                             ${restaurant['Address'] ? `<a href="${restaurant['Address']}" target="_blank" class="suggestion-link">View on Maps</a>` : ''}
                         </div>
                     </div>
-                `).join('');
-                
-                suggestionsContent.innerHTML = suggestionsHtml;
-            } else {
-                suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>No restaurant suggestions available</p></div>';
-            }
-        } catch (error) {
-            console.error('Error loading suggestions:', error);
-            const suggestionsContent = document.getElementById('suggestionsContent');
-            if (suggestionsContent) {
-                suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>Error loading suggestions</p></div>';
-            }
+                `;
+    }
+    
+    function addRestaurant(restaurants, index, restaurant) {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (!suggestionsContent) return;
+        
+        if (restaurants.length === 0) suggestionsContent.innerHTML = '';
+        restaurants[index] = restaurant;
+        suggestionsContent.insertAdjacentHTML('beforeend', restaurantCardHtml(restaurant, index));
+    }
+    
+    // A restaurant's Maps link and rating arrive after its card
+    function patchRestaurant(restaurants, index, fields) {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        const card = suggestionsContent && suggestionsContent.querySelector(`.suggestion-item[data-index="${index}"]`);
+        if (!card || !restaurants[index]) return;
+        Object.assign(restaurants[index], fields);
+        card.outerHTML = restaurantCardHtml(restaurants[index], index);
+    }
+    
+    function showNoRestaurants() {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (suggestionsContent) {
+            suggestionsContent.innerHTML = '<div class="suggestions-placeholder"><p>No restaurant suggestions available</p></div>';
         }
     }
     
@@ -1,3 +1,34 @@
+// POST a form and read the Server-Sent Events it answers with, calling handlers[event](data) for each.
+// EventSource can only send GET requests, so the stream is read from fetch() instead.
+async function postEventStream(url, formData, handlers) {
+    const response = await fetch(url, { method: 'POST', body: formData });
+    if (!response.ok) {
+        const error = await response.json().catch(() => ({}));
+        throw new Error(error.error || 'Upload failed');
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            let event = 'message';
+            let data = null;
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                if (line.startsWith('data: ')) data = line.slice(6);
+            });
+            // Comment-only blocks are keepalives and carry no data
+            if (data !== null && handlers[event]) handlers[event](JSON.parse(data));
+        }
+    }
+}
+
 // File upload functionality
 class FileUploader {
     constructor() {
@@ -133,26 +164,15 @@ class FileUploader {
         this.showProgress();
         this.hideStatus();
 
+        // Recognition, description and similar artworks all come back from one request
         const formData = new FormData();
-        this.selectedFiles.forEach(file => {
-            formData.append('files', file);
-        });
+        formData.append('file', this.selectedFiles.find(file => file.type.startsWith('image/')) || this.selectedFiles[0]);
 
         try {
-            const response = await fetch('/upload', {
-                method: 'POST',
-                body: formData
-            });
-
-            if (response.ok) {
-                const result = await response.json();
-                console.log('Upload result:', result); // Debug log
-                this.showStatus('success', `Successfully uploaded ${result.uploadedCount} file(s)!`);
-                this.displayArtworkResults(result.uploadedFiles);
-                this.clearFiles();
+            if (window.ReadableStream && window.TextDecoder) {
+                await this.streamAnalysis(formData);
             } else {
-                const error = await response.json();
-                this.showStatus('error', `Upload failed: ${error.message}`);
+                await this.fetchAnalysis(formData);
             }
         } catch (error) {
             this.showStatus('error', `Upload failed: ${error.message}`);
@@ -161,6 +181,44 @@ class FileUploader {
         }
     }
 
+    // Show the recognized artwork first, then the description and each similar artwork as they are generated
+    async streamAnalysis(formData) {
+        let description = '';
+        const suggestions = [];
+        await postEventStream('/analyze/artwork?stream=1', formData, {
+            analysis: (data) => this.showAnalysis(data.file),
+            chunk: (data) => {
+                description += data.text;
+                this.renderDescription(description);
+            },
+            suggestion: (data) => this.addSuggestion(suggestions, data.index, data.suggestion),
+            error: (data) => console.error(`Error generating ${data.part}:`, data.error),
+            done: () => {
+                // Parts that failed, or an artwork that was not recognized, leave these empty
+                if (!description) this.renderDescription('');
+                if (suggestions.length === 0) this.showNoSuggestions();
+            }
+        });
+    }
+
+    async fetchAnalysis(formData) {
+        const response = await fetch('/analyze/artwork', {
+            method: 'POST',
+            body: formData
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.error || 'Upload failed');
+        }
+
+        console.log('Analysis result:', result); // Debug log
+        this.showAnalysis(result.file);
+        this.renderDescription(result.details || '');
+        const suggestions = [];
+        (result.suggestions || []).forEach((suggestion, index) => this.addSuggestion(suggestions, index, suggestion));
+        if (suggestions.length === 0) this.showNoSuggestions();
+    }
+
     showProgress() {
         this.uploadProgress.style.display = 'block';
         this.uploadBtn.disabled = true;
@@ -206,234 +264,84 @@ class FileUploader {
         this.uploadStatus.style.display = 'none';
     }
 
-    displayArtworkResults(files) {
+    showAnalysis(fileInfo) {
+        this.hideProgress();
+        this.showStatus('success', `Successfully uploaded ${fileInfo.original_name}!`);
+        this.displayArtworkResults(fileInfo);
+        this.clearFiles();
+    }
+
+    displayArtworkResults(fileInfo) {
         // Get the results container and elements
         const resultsContainer = document.getElementById('artworkResults');
         const uploadedImage = document.getElementById('uploadedImage');
         const artworkName = document.getElementById('artworkName');
         const artworkDescription = document.getElementById('artworkDescription');
+        const suggestionsContent = document.getElementById('suggestionsContent');
 
-        // Find the first file with artwork analysis
-        const fileWithAnalysis = files.find(file => file.artwork_analysis);
-        
-        if (fileWithAnalysis && fileWithAnalysis.artwork_analysis) {
-            const analysis = fileWithAnalysis.artwork_analysis;
-            
-            // Display the uploaded image
-            if (fileWithAnalysis.original_name && uploadedImage) {
-                // Create a temporary URL for the uploaded image
-                const imageUrl = `/uploads/${fileWithAnalysis.saved_name}`;
-                uploadedImage.src = imageUrl;
-                uploadedImage.style.display = 'block';
-            }
-            
-            // Display artwork information
-            if (artworkName) {
-                artworkName.textContent = analysis.artwork_name || '-';
-            }
-            if (artworkDescription) {
-                artworkDescription.textContent = 'Loading AI analysis...';
-            }
-            
-            // Automatically load AI analysis into description
-            this.loadAIAnalysisIntoDescription(analysis.artwork_name);
-            
-            // Automatically load suggestions
-            this.loadSuggestions(analysis.artwork_name);
-
-            // Show results container
-            if (resultsContainer) {
-                resultsContainer.style.display = 'block';
-                
-                // Scroll to results
-                resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
-                
-                // Auto-hide after 60 seconds
-                setTimeout(() => {
-                    resultsContainer.style.display = 'none';
-                }, 60000);
-            }
+        const analysis = fileInfo.artwork_analysis;
+        if (!analysis) return;
+
+        // Display the uploaded image
+        if (fileInfo.original_name && uploadedImage) {
+            const imageUrl = `/uploads/${fileInfo.saved_name}`;
+            uploadedImage.src = imageUrl;
+            uploadedImage.style.display = 'block';
         }
-    }
 
-    async analyzeWithLLM(artworkName) {
-        const analyzeBtn = document.getElementById('analyzeBtn');
-        const analysisContent = document.getElementById('analysisContent');
-        
-        // Show loading state
-        analyzeBtn.disabled = true;
-        analyzeBtn.textContent = 'Analyzing...';
-        analysisContent.innerHTML = `
-            <div class="analysis-loading">
-                <div class="loading-spinner"></div>
-                <span>AI is analyzing the artwork...</span>
-            </div>
-        `;
-        
-        try {
-            // Call the backend LLM analysis endpoint
-            const response = await fetch(`/get_themes/${encodeURIComponent(artworkName)}`);
-            const data = await response.json();
-            
-            if (data.success) {
-                // Display the analysis result
-                analysisContent.innerHTML = `
-                    <div class="analysis-result">
-                        <h4>📋 Detailed Analysis</h4>
-                        <div style="white-space: pre-wrap; line-height: 1.6;">${data.themes}</div>
-                    </div>
-                `;
-            } else {
-                // Show error
-                analysisContent.innerHTML = `
-                    <div class="analysis-error">
-                        <h4>❌ Analysis Failed</h4>
-                        <p>${data.themes}</p>
-                    </div>
-                `;
-            }
-        } catch (error) {
-            // Show error
-            analysisContent.innerHTML = `
-                <div class="analysis-error">
-                    <h4>❌ Connection Error</h4>
-                    <p>Failed to connect to AI analysis service: ${error.message}</p>
-                </div>
-            `;
-        } finally {
-            // Reset button
-            analyzeBtn.disabled = false;
-            analyzeBtn.textContent = 'Analyze with AI';
+        // Display artwork information
+        if (artworkName) {
+            artworkName.textContent = analysis.artwork_name || '-';
         }
-    }
 
-    async getSuggestions(artworkName) {
-        const suggestionsBtn = document.getElementById('suggestionsBtn');
-        const suggestionsContent = document.getElementById('suggestionsContent');
-        
-        // Show loading state
-        suggestionsBtn.disabled = true;
-        suggestionsBtn.textContent = 'Finding Similar Artworks...';
-        suggestionsContent.innerHTML = `
-            <div class="suggestions-loading">
-                <div class="loading-spinner"></div>
-                <span>AI is finding similar artworks...</span>
-            </div>
-        `;
-        
-        try {
-            // Call the backend suggestions endpoint
-            const response = await fetch(`/get_suggestions/${encodeURIComponent(artworkName)}`);
-            const data = await response.json();
-            
-            if (data.success && data.suggestions && data.suggestions.length > 0) {
-                // Display the suggestions result as cards
-                const suggestionsHtml = data.suggestions.map((suggestion, index) => `
-                    <div class="suggestion-item">
-                        <div class="suggestion-number">${index + 1}</div>
-                        <div class="suggestion-details">
-                            <div class="suggestion-title">${suggestion.Name}</div>
-                            <div class="suggestion-artist">by ${suggestion.Artist}</div>
-                            <div class="suggestion-year">${suggestion.Year}</div>
-                            <div class="suggestion-location">📍 ${suggestion['Current Location']}</div>
-                            ${suggestion.Wikipedia ? `<a href="${suggestion.Wikipedia}" target="_blank" class="suggestion-link">🔗 Learn More</a>` : ''}
-                        </div>
-                    </div>
-                `).join('');
-                
-                suggestionsContent.innerHTML = suggestionsHtml;
-            } else {
-                // Show error or no results
-                suggestionsContent.innerHTML = `
-                    <div class="suggestions-error">
-                        <h4>❌ No Similar Artworks Found</h4>
-                        <p>Unable to find similar artworks for "${artworkName}". This might be because the artwork is not well-known or the AI couldn't identify it properly.</p>
-                    </div>
-                `;
-            }
-        } catch (error) {
-            // Show error
+        // Description and suggestions are still being generated
+        if (artworkDescription) {
+            artworkDescription.textContent = 'Loading AI analysis...';
+        }
+        if (suggestionsContent) {
             suggestionsContent.innerHTML = `
-                <div class="suggestions-error">
-                    <h4>❌ Connection Error</h4>
-                    <p>Failed to connect to suggestions service: ${error.message}</p>
+                <div class="suggestions-loading">
+                    <div class="loading-spinner"></div>
+                    <span>AI is finding similar artworks...</span>
                 </div>
             `;
-        } finally {
-            // Reset button
-            suggestionsBtn.disabled = false;
-            suggestionsBtn.textContent = 'Get Similar Artworks';
+        }
+
+        // Show results container
+        if (resultsContainer) {
+            resultsContainer.style.display = 'block';
+
+            // Scroll to results
+            resultsContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+
+            // Auto-hide after 60 seconds
+            setTimeout(() => {
+                resultsContainer.style.display = 'none';
+            }, 60000);
         }
     }
 
-    async loadAIAnalysisIntoDescription(artworkName) {
+    renderDescription(text) {
         const artworkDescription = document.getElementById('artworkDescription');
-        
         if (!artworkDescription) return;
-        
-        if (!artworkName || artworkName === 'Artwork could not be found') {
+
+        if (!text) {
             artworkDescription.textContent = 'Unable to analyze this artwork';
             return;
         }
-        
-        try {
-            // Call the backend LLM analysis endpoint
-            const response = await fetch(`/get_themes/${encodeURIComponent(artworkName)}`);
-            const data = await response.json();
-            
-            if (data.success) {
-                // Process the text to make Wikipedia links clickable
-                let processedText = data.themes;
-                
-                // Find Wikipedia URLs and make them clickable
-                const wikipediaRegex = /(https?:\/\/[^\s]+)/g;
-                processedText = processedText.replace(wikipediaRegex, (url) => {
-                    return `<a href="${url}" target="_blank" rel="noopener noreferrer">${url}</a>`;
-                });
-                
-                // Display the analysis result in description
-                artworkDescription.innerHTML = `<div style="white-space: pre-wrap; line-height: 1.5;">${processedText}</div>`;
-            } else {
-                // Show error
-                artworkDescription.textContent = `Analysis failed: ${data.themes}`;
-            }
-        } catch (error) {
-            // Show error
-            artworkDescription.textContent = `Connection error: ${error.message}`;
-        }
+
+        // Find Wikipedia URLs and make them clickable
+        const wikipediaRegex = /(https?:\/\/[^\s]+)/g;
+        const processedText = text.replace(wikipediaRegex, (url) => {
+            return `<a href="${url}" target="_blank" rel="noopener noreferrer">${url}</a>`;
+        });
+
+        // Display the analysis result in description
+        artworkDescription.innerHTML = `<div style="white-space: pre-wrap; line-height: 1.5;">${processedText}</div>`;
     }
 
-    async loadSuggestions(artworkName) {
-        const suggestionsContent = document.getElementById('suggestionsContent');
-        
-        if (!suggestionsContent) return;
-        
-        if (!artworkName || artworkName === 'Artwork could not be found') {
-            suggestionsContent.innerHTML = `
-                <div class="suggestions-error">
-                    <h4>❌ No Suggestions Available</h4>
-                    <p>Unable to find suggestions for this artwork.</p>
-                </div>
-            `;
-            return;
-        }
-        
-        // Show loading state
-        suggestionsContent.innerHTML = `
-            <div class="suggestions-loading">
-                <div class="loading-spinner"></div>
-                <span>AI is finding similar artworks...</span>
-            </div>
-        `;
-        
-        try {
-            // Call the backend suggestions endpoint
-            const response = await fetch(`/get_suggestions/${encodeURIComponent(artworkName)}`);
-            const data = await response.json();
-            
-            if (data.success && data.suggestions && data.suggestions.length > 0) {
-                // Display the suggestions result as cards
-                const suggestionsHtml = data.suggestions.map((suggestion, index) => `
+    artworkCardHtml(suggestion, index) {
+        return `
                     <div class="suggestion-item">
                         <div class="suggestion-number">${index + 1}</div>
                         <div class="suggestion-details">
@@ -444,27 +352,28 @@ class FileUploader {
                             ${suggestion.Wikipedia ? `<a href="${suggestion.Wikipedia}" target="_blank" class="suggestion-link">🔗 Learn More</a>` : ''}
                         </div>
                     </div>
-                `).join('');
-                
-                suggestionsContent.innerHTML = suggestionsHtml;
-            } else {
-                // Show error or no results
-                suggestionsContent.innerHTML = `
-                    <div class="suggestions-error">
-                        <h4>❌ No Similar Artworks Found</h4>
-                        <p>Unable to find similar artworks for "${artworkName}". This might be because the artwork is not well-known or the AI couldn't identify it properly.</p>
-                    </div>
                 `;
-            }
-        } catch (error) {
-            // Show error
-            suggestionsContent.innerHTML = `
-                <div class="suggestions-error">
-                    <h4>❌ Connection Error</h4>
-                    <p>Failed to connect to suggestions service: ${error.message}</p>
-                </div>
-            `;
-        }
+    }
+
+    addSuggestion(suggestions, index, suggestion) {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (!suggestionsContent) return;
+
+        if (suggestions.length === 0) suggestionsContent.innerHTML = '';
+        suggestions[index] = suggestion;
+        suggestionsContent.insertAdjacentHTML('beforeend', this.artworkCardHtml(suggestion, index));
+    }
+
+    showNoSuggestions() {
+        const suggestionsContent = document.getElementById('suggestionsContent');
+        if (!suggestionsContent) return;
+
+        suggestionsContent.innerHTML = `
+            <div class="suggestions-error">
+                <h4>❌ No Similar Artworks Found</h4>
+                <p>Unable to find similar artworks. This might be because the artwork is not well-known or the AI couldn't identify it properly.</p>
+            </div>
+        `;
     }
 }
 